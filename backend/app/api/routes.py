@@ -1,34 +1,81 @@
 #backend/app/api/routes.py
 
-from typing import Optional, Dict, Any, List
-from fastapi import APIRouter, File, UploadFile, Query, HTTPException
-from fastapi.responses import FileResponse
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Iterable
+from fastapi import APIRouter, File, UploadFile, Query, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from celery.result import AsyncResult
 
+from backend.app.config import settings
 from backend.app.core.pdf_parser import PDFParser
-from backend.app.core.async_queue import queue
-from backend.app.core.artifacts import PDFRenderer
+from backend.app.core.async_queue import queue, RESULT_EXPIRED
+from backend.app.core.artifacts import ArtifactRenderer
+from backend.app.core.artifact_store import artifact_store, StoredArtifact
+from backend.app.core.zip_stream import stream_zip
+from backend.app.core.metrics import metrics
+from backend.app.core.llm_pool import configured_pools
+from backend.app.core.residency import residency
+from backend.app.core.fast_scorer import fast_scorer
+from backend.app.core.jd_library import jd_library
+from backend.app.core.job_store import job_store, InvalidCursor
+from backend.app.core.cancellation import cancellation
+from backend.app.core.fair_scheduler import tenant_id
 from backend.app.models.job_models import(
     ResumeJDRequest,
     PDFUploadResponse,
     JobSubmitResponse,
     JobStatusResponse,
     JobResultResponse,
+    JobExportRequest,
+    BulkJobRequest,
+    BulkItemResult,
+    BulkSubmitResponse,
+    GroupStatusResponse,
+    JobsStatusRequest,
+    JobsStatusResponse,
+    FastMatchRequest,
+    FastMatchResponse,
+    JDCreateRequest,
+    JDCreateResponse,
+    JDRecord,
+    JDListResponse,
+    JobRecord,
+    JobListResponse,
+    JobCancelResponse,
 )
 from backend.worker.worker import celery_app
 
-import tempfile
-import os
 import json
-import datetime
 
 
 api_router = APIRouter()
-_pdf = PDFRenderer()
+JOB_TYPES = {"match", "enhance", "cover_letter"}
+_renderer = ArtifactRenderer()
 
 @api_router.get("/health", tags=["Health"])
 def health_check():
-    return {"status": "ok"}
+    """Liveness plus warm/cold state of the resident LLM models."""
+    return {"status": "ok", "residency": residency.snapshot()}
+
+@api_router.get("/llm-backends", tags=["Health"])
+def llm_backends():
+    """Health, circuit state, in-flight calls, latency and loaded models of each pooled LLM host."""
+    return {"pools": [pool.snapshot() for pool in configured_pools()]}
+
+@api_router.get("/metrics", tags=["Health"])
+def metrics_snapshot():
+    """Fleet-wide counters/gauges/latency summaries, plus result storage savings."""
+    snap = metrics.snapshot()
+    c = snap["counters"]
+    raw, stored = c.get("result_raw_bytes", 0.0), c.get("result_stored_bytes", 0.0)
+    snap["storage"] = {
+        "result_raw_bytes": raw,
+        "result_stored_bytes": stored,
+        "result_bytes_saved": raw - stored,
+        "result_compression_ratio": (raw / stored) if stored else None,
+        "results_archived": c.get("results_archived", 0.0),
+        "results_archived_bytes": c.get("results_archived_bytes", 0.0),
+    }
+    return snap
 
 @api_router.post("/parse-pdf", response_model=PDFUploadResponse, tags=["Parsing"])
 async def parse_pdf_endpoint(file: UploadFile = File(...)):
@@ -39,39 +86,203 @@ async def parse_pdf_endpoint(file: UploadFile = File(...)):
     return PDFUploadResponse(extracted_text=text)
 
 @api_router.post("/submit-job", response_model=JobSubmitResponse, tags=["Jobs"])
-async def submit_job(request: ResumeJDRequest):
-    """Submit a matching/enhancing/cover letter job."""
+def submit_job(
+    request: ResumeJDRequest,
+    x_tenant_id: Optional[str] = Header(default=None),
+    x_api_key: Optional[str] = Header(default=None),
+):
+    """Submit a matching/enhancing/cover letter job (interactive class, scheduled fairly per tenant)."""
 
     jt = (request.job_type or "").lower()
-    if jt not in {"match", "enhance", "cover_letter"}:
+    if jt not in JOB_TYPES:
         raise HTTPException(status_code=422, detail="job_type must be one of: match, enhance, cover_letter")
-    job_id = queue.submit_job(jt, request.dict())
+    payload = request.dict()
+    error = _pin_library_jd(payload)
+    if error:
+        raise HTTPException(status_code=404, detail=error)
+    job_id = queue.submit_job(jt, payload, tenant=tenant_id(x_tenant_id, x_api_key))
     return JobSubmitResponse(job_id=job_id)
 
+@api_router.post("/fast-match", response_model=FastMatchResponse, tags=["Jobs"])
+def fast_match(request: FastMatchRequest):
+    """
+    Instant, non-LLM match report from the skill taxonomy (same keys as a 'match' job's result).
+    Good for triage; submit a 'match' job for the full analysis.
+    """
+    return FastMatchResponse(**fast_scorer.score(request.resume, request.jd))
+
+# ------------ JD library ------------
+@api_router.post("/jds", response_model=JDCreateResponse, tags=["JD library"])
+def register_jd(request: JDCreateRequest):
+    """
+    Register a job description (or a new version of `jd_id`) and pre-parse it in the background.
+    Jobs then pass `jd_id` instead of the text and skip JD parsing. Re-registering the
+    latest text is a no-op.
+    """
+    record, created = jd_library.register(request.text, title=request.title, jd_id=request.jd_id)
+    parse_job_id = queue.submit_jd_parse(record["jd_id"], record["version"]) if created else None
+    return JDCreateResponse(jd=JDRecord(**record), created=created, parse_job_id=parse_job_id)
+
+@api_router.get("/jds", response_model=JDListResponse, tags=["JD library"])
+def list_jds(limit: int = Query(default=50, ge=1, le=500), offset: int = Query(default=0, ge=0)):
+    """Latest version of each registered JD, most recently updated first."""
+    items, total = jd_library.list(limit=limit, offset=offset)
+    return JDListResponse(total=total, items=[JDRecord(**item) for item in items])
+
+@api_router.get("/jds/{jd_id}", response_model=JDRecord, tags=["JD library"])
+def get_jd(jd_id: str, version: Optional[int] = Query(default=None, ge=1)):
+    """A JD version (latest by default) with its text and structured parse."""
+    record = jd_library.get(jd_id, version)
+    if record is None:
+        raise HTTPException(status_code=404, detail="JD not found")
+    return JDRecord(**record)
+
+@api_router.get("/jds/{jd_id}/versions", response_model=List[JDRecord], tags=["JD library"])
+def jd_versions(jd_id: str):
+    versions = jd_library.versions(jd_id)
+    if not versions:
+        raise HTTPException(status_code=404, detail="JD not found")
+    return [JDRecord(**v) for v in versions]
+
+@api_router.post("/submit-jobs", response_model=BulkSubmitResponse, tags=["Jobs"])
+def submit_jobs(
+    request: BulkJobRequest,
+    x_tenant_id: Optional[str] = Header(default=None),
+    x_api_key: Optional[str] = Header(default=None),
+):
+    """
+    Submit many jobs at once, as explicit items and/or a resumes × JDs matrix.
+    Valid items are enqueued as one Celery group (batch class: they yield to interactive
+    jobs and share workers fairly with other tenants); invalid ones are reported per index
+    without failing the batch. Track progress with /group/{group_id}.
+    """
+    candidates: List[Tuple[str, Dict[str, Any]]] = [(it.job_type, it.dict()) for it in request.items]
+    if request.matrix is not None:
+        m = request.matrix
+        scheduling = {"priority": m.priority, "slo_seconds": m.slo_seconds}
+        candidates += [
+            (jt, {"resume": resume, "jd": jd, **scheduling})
+            for resume in m.resumes for jd in m.jds for jt in m.job_types
+        ]
+        candidates += [
+            (jt, {"resume": resume, "jd_id": jd_id, **scheduling})
+            for resume in m.resumes for jd_id in m.jd_ids for jt in m.job_types
+        ]
+    if not candidates:
+        raise HTTPException(status_code=422, detail="Provide at least one item or a matrix")
+    if len(candidates) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many jobs ({len(candidates)} > {settings.BULK_MAX_ITEMS})")
+
+    results: List[BulkItemResult] = []
+    accepted: List[Tuple[int, str, Dict[str, Any]]] = []
+    for index, (job_type, payload) in enumerate(candidates):
+        jt = (job_type or "").lower()
+        error = _validate_item(jt, payload)
+        if error:
+            results.append(BulkItemResult(index=index, job_type=jt, error=error))
+        else:
+            accepted.append((index, jt, payload))
+
+    group_id = None
+    if accepted:
+        group_id, job_ids = queue.submit_group([(jt, payload) for _, jt, payload in accepted],
+                                               tenant=tenant_id(x_tenant_id, x_api_key))
+        results += [
+            BulkItemResult(index=index, job_type=jt, job_id=job_id)
+            for (index, jt, _), job_id in zip(accepted, job_ids)
+        ]
+    results.sort(key=lambda r: r.index)
+    return BulkSubmitResponse(group_id=group_id, submitted=len(accepted), rejected=len(results) - len(accepted), items=results)
+
+@api_router.get("/group/{group_id}", response_model=GroupStatusResponse, tags=["Jobs"])
+def group_status(group_id: str):
+    """Aggregate progress of a bulk submission, with results of the jobs finished so far."""
+    status = queue.get_group(group_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return GroupStatusResponse(**status)
+
 @api_router.get("/job-status/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
-async def job_status(job_id: str):
+def job_status(job_id: str):
+    # Sync like every handler that calls Redis: blocking calls run in the threadpool, not on the event loop
+    cancellation.touch([job_id])
     status = queue.get_status(job_id)
     return JobStatusResponse(**status)
 
+@api_router.post("/jobs/status", response_model=JobsStatusResponse, tags=["Jobs"])
+def jobs_status(request: JobsStatusRequest):
+    """
+    Compact status of many jobs in one call (single MGET on the result backend).
+    Pass the returned `cursor` back as `since` to receive only what changed.
+    """
+    job_ids = list(dict.fromkeys(request.job_ids))
+    if len(job_ids) > settings.BATCH_STATUS_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"Too many job ids ({len(job_ids)} > {settings.BATCH_STATUS_MAX_IDS})")
+    cancellation.touch(job_ids)
+    return JobsStatusResponse(**queue.get_statuses(job_ids, since=request.since))
+
+@api_router.get("/jobs", response_model=JobListResponse, tags=["Jobs"])
+def list_jobs(
+    limit: int = Query(default=50, ge=1),
+    cursor: Optional[str] = Query(default=None, description="`next_cursor` from the previous page"),
+    job_type: Optional[str] = None,
+    status: Optional[str] = None,
+    jd_id: Optional[str] = None,
+    resume_hash: Optional[str] = None,
+    jd_hash: Optional[str] = None,
+    group_id: Optional[str] = None,
+    parent_job_id: Optional[str] = None,
+    since: Optional[float] = Query(default=None, description="Submitted at or after (unix seconds)"),
+    until: Optional[float] = Query(default=None, description="Submitted before (unix seconds)"),
+    min_score: Optional[int] = Query(default=None, ge=0, le=100),
+):
+    """
+    Job history from the job store, newest first, with filters.
+    Keyset pagination: follow `next_cursor` until it is null.
+    """
+    try:
+        rows, next_cursor = job_store.list_jobs(
+            limit=min(limit, settings.JOBS_PAGE_MAX), cursor=cursor, since=since, until=until, min_score=min_score,
+            job_type=job_type, status=status.upper() if status else None, jd_id=jd_id, resume_hash=resume_hash,
+            jd_hash=jd_hash, group_id=group_id, parent_job_id=parent_job_id,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return JobListResponse(jobs=[JobRecord(**row) for row in rows], next_cursor=next_cursor)
+
 @api_router.get("/job/{job_id}", response_model=JobResultResponse, tags=["Jobs"])
-async def job_result(job_id:str):
+def job_result(job_id:str):
+    cancellation.touch([job_id])
     result = queue.get_result(job_id)
     return JobResultResponse(**result)
 
 @api_router.get("/job-wait/{job_id}", response_model=JobResultResponse, tags=["Jobs"])
-async def job_wait(job_id: str, timeout: Optional[float] = Query(default=30.0, ge=0.0, description="Seconds to wait")):
+def job_wait(job_id: str, timeout: Optional[float] = Query(default=30.0, ge=0.0, description="Seconds to wait")):
     """
     Blocks up to `timeout` seconds for the result, then returns current state/result.
     Good for Swagger testing or Streamlit 'long poll'.
+    Sync on purpose: the blocking wait runs in the threadpool, not on the event loop.
     """
+    cancellation.touch([job_id], ahead=timeout or 0.0)  # the client stays connected for the wait
     result = queue.wait_for_result(job_id, timeout=timeout)
     return JobResultResponse(**result)
 
+@api_router.post("/job/{job_id}/cancel", response_model=JobCancelResponse, tags=["Jobs"])
+def cancel_job(job_id: str):
+    """
+    Cancel a job. Queued jobs never start; running ones stop at their next stage boundary
+    or LLM-call check and release their worker. Finished jobs are left as they are.
+    """
+    outcome = queue.cancel(job_id)
+    if outcome is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobCancelResponse(**outcome)
+
 # ------------ Warmup endpoints ------------
 @api_router.post("/warmup", tags=["Health"])
 def warmup():
     """
-    Enqueue a warmup task for the active model.
+    Enqueue a warmup task for every model in use (one per distinct stage config).
     Returns a task id so we can /job-wait on it if desired.
     """
     async_res = celery_app.send_task("warmup_llm", queue="llm", routing_key="llm")
@@ -92,153 +303,110 @@ def warmup_wait(job_id: str, timeout: Optional[float] = Query(default=120.0, ge=
 # ---------------- Downloadable Artifacts ----------------
 
 @api_router.get("/job/{job_id}/download", tags=["Jobs"])
-async def job_download(
+def job_download(
     job_id: str,
     format: str = Query("md", pattern="^(md|json|pdf)$", description="Download format: md, json, or pdf"),
+    if_none_match: Optional[str] = Header(default=None),
 ):
     """
     Download the job's result as a Markdown (md), JSON (json), or PDF (pdf) file.
+    Artifacts are rendered once per (job, format) and served from the artifact store
+    with an ETag, so repeat downloads can be answered with 304 Not Modified.
+    """
+    stored, fresh = _load_artifact(job_id, format)
+    headers = {"ETag": stored.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, stored.etag):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="{stored.filename}"'
+    headers["Content-Length"] = str(stored.size)
+    body = iter([fresh]) if fresh is not None else artifact_store.iter_bytes(stored)
+    return StreamingResponse(body, media_type=stored.media_type, headers=headers)
+
+@api_router.post("/jobs/export", tags=["Jobs"])
+def jobs_export(request: JobExportRequest):
+    """
+    Stream a ZIP with the artifacts of many jobs (`<job_id>/<file>` per entry).
+    The archive is built incrementally while it is sent; jobs that are unknown,
+    unfinished or failed are listed in `manifest.json` instead of failing the export.
+    """
+    formats = [f for f in ArtifactRenderer.FORMATS if f in set(request.formats)]
+    if not formats:
+        raise HTTPException(status_code=422, detail="formats must include at least one of: md, json, pdf")
+    entries = _export_entries(list(dict.fromkeys(request.job_ids)), formats)
+    headers = {"Content-Disposition": 'attachment; filename="jobs_export.zip"'}
+    return StreamingResponse(stream_zip(entries), media_type="application/zip", headers=headers)
+
+# ---------------- Helpers ----------------
+
+def _validate_item(job_type: str, payload: Dict[str, Any]) -> Optional[str]:
+    if job_type not in JOB_TYPES:
+        return "job_type must be one of: match, enhance, cover_letter"
+    if payload.get("jd_id"):
+        return _pin_library_jd(payload) or (None if (payload.get("resume") or "").strip() else "'resume' text is required.")
+    if not (payload.get("resume") or "").strip() or not (payload.get("jd") or "").strip():
+        return "Both 'resume' and 'jd' text are required."
+    return None
+
+def _pin_library_jd(payload: Dict[str, Any]) -> Optional[str]:
+    """For a library JD: check it exists and pin the version, so later edits don't affect the job.
+    The JD text isn't sent with the job; the worker reads it (and its parse) from the library."""
+    if not payload.get("jd_id"):
+        return None
+    record = jd_library.get(payload["jd_id"], payload.get("jd_version"))
+    if record is None:
+        return f"Unknown jd_id/version: {payload['jd_id']}"
+    payload["jd_version"] = record["version"]
+    payload["jd"] = None
+    return None
+
+def _load_artifact(job_id: str, fmt: str) -> Tuple[StoredArtifact, Optional[bytes]]:
     """
+    Return the stored artifact for (job, format), rendering it on demand if the
+    worker hasn't. When freshly rendered, the bytes are returned too so the
+    response can be served from memory.
+    """
+    stored = artifact_store.get(job_id, fmt)
+    if stored is not None:
+        return stored, None
+
     jr = queue.get_result(job_id)
     status = jr.get("status")
-    raw_result = jr.get("result")
 
     if status is None:
         raise HTTPException(status_code=404, detail="Job not found")
+    if jr.get("error") == RESULT_EXPIRED:
+        raise HTTPException(status_code=410, detail=RESULT_EXPIRED)
     if status not in ("SUCCESS", "FAILURE"):
         raise HTTPException(status_code=202, detail=f"Job not finished yet (status={status})")
-    if status == "FAILURE":
+    if status == "FAILURE" and fmt != "json":
         err = jr.get("error") or "Unknown error"
-        if format == "json":
-            return _download_json({"job_id": job_id, "status": status, "error": err}, f"job_{job_id}_error.json")
         raise HTTPException(status_code=500, detail=f"Job failed: {err}")
 
-    # SUCCESS — unwrap nested shapes like {"status":"done","result":{...}}
-    result = _unwrap_result(raw_result)
-
-    # Detect job type by keys at the unwrapped level
-    if isinstance(result, dict) and "match_score" in result:
-        job_type = "match"
-        md = _markdown_for_match(result)
-        filename_md = f"match_report_{job_id}.md"
-        filename_json = f"match_report_{job_id}.json"
-        filename_pdf = f"match_report_{job_id}.pdf"
-        if format == "json":
-            return _download_json({"job_id": job_id, "status": status, "result": result, "job_type": job_type}, filename_json)
-        if format == "pdf":
-            tmp_path = _tmp_path(filename_pdf)
-            _pdf.build_match_pdf(tmp_path, result)
-            return FileResponse(tmp_path, media_type="application/pdf", filename=os.path.basename(tmp_path))
-        return _download_md(md, filename_md)
-
-    if isinstance(result, dict) and "resume_enhancement_md" in result:
-        job_type = "enhance"
-        md = _markdown_for_enhance(result)
-        filename_md = f"resume_enhancement_{job_id}.md"
-        filename_json = f"resume_enhancement_{job_id}.json"
-        filename_pdf = f"resume_enhancement_{job_id}.pdf"
-        if format == "json":
-            return _download_json({"job_id": job_id, "status": status, "result": result, "job_type": job_type}, filename_json)
-        if format == "pdf":
-            tmp_path = _tmp_path(filename_pdf)
-            _pdf.build_enhance_pdf(tmp_path, result)
-            return FileResponse(tmp_path, media_type="application/pdf", filename=os.path.basename(tmp_path))
-        return _download_md(md, filename_md)
-
-    if isinstance(result, dict) and "cover_letter_md" in result:
-        job_type = "cover_letter"
-        md = _markdown_for_cover_letter(result)
-        filename_md = f"cover_letter_{job_id}.md"
-        filename_json = f"cover_letter_{job_id}.json"
-        filename_pdf = f"cover_letter_{job_id}.pdf"
-        if format == "json":
-            return _download_json({"job_id": job_id, "status": status, "result": result, "job_type": job_type}, filename_json)
-        if format == "pdf":
-            tmp_path = _tmp_path(filename_pdf)
-            _pdf.build_cover_letter_pdf(tmp_path, result)
-            return FileResponse(tmp_path, media_type="application/pdf", filename=os.path.basename(tmp_path))
-        return _download_md(md, filename_md)
-
-    # Unknown structure → generic
-    if format == "json":
-        return _download_json({"job_id": job_id, "status": status, "result": result, "job_type": "unknown"}, f"job_{job_id}.json")
-    if format == "pdf":
-        tmp_path = _tmp_path(f"job_{job_id}.pdf")
-        pretty = _pretty_json(result)
-        _pdf.build_generic_pdf(tmp_path, "Job Result", pretty)
-        return FileResponse(tmp_path, media_type="application/pdf", filename=os.path.basename(tmp_path))
-    md = _markdown_from_unknown(result)
-    return _download_md(md, f"job_{job_id}.md")
-
-# ---------------- Helpers: Markdown & File responses ----------------
-
-def _unwrap_result(raw_result: Any) -> Any:
-    """
-    Accepts any structure. If it's a dict that looks like {'status': 'done', 'result': {...}},
-    return the inner .result; otherwise return as-is.
-    """
-    if isinstance(raw_result, dict) and "result" in raw_result and set(raw_result.keys()) <= {"status", "result"}:
-        return raw_result.get("result")
-    return raw_result
-
-def _download_md(markdown_text: str, filename: str) -> FileResponse:
-    tmp_path = _write_temp_file(markdown_text, filename)
-    return FileResponse(tmp_path, media_type="text/markdown", filename=os.path.basename(tmp_path))
-
-def _download_json(payload: Dict[str, Any], filename: str) -> FileResponse:
-    text = json.dumps(payload, indent=2, ensure_ascii=False)
-    tmp_path = _write_temp_file(text, filename)
-    return FileResponse(tmp_path, media_type="application/json", filename=os.path.basename(tmp_path))
-
-def _write_temp_file(content: str, filename: str) -> str:
-    tmp_path = _tmp_path(filename)
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        f.write(content)
-    return tmp_path
-
-def _tmp_path(filename: str) -> str:
-    tmp_dir = tempfile.mkdtemp(prefix="artifacts_")
-    return os.path.join(tmp_dir, filename)
-
-def _header(title: str) -> str:
-    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    return f"# {title}\n\n_Generated: {now}_\n\n"
-
-def _pretty_json(value: Any) -> str:
-    try:
-        return json.dumps(value, indent=2, ensure_ascii=False)
-    except Exception:
-        return str(value)
-
-def _markdown_for_match(result: Dict[str, Any]) -> str:
-    score = result.get("match_score", "N/A")
-    strengths: List[str] = result.get("strengths", []) or []
-    gaps: List[str] = result.get("gaps", []) or []
-    summary = result.get("summary", "")
-
-    md = _header("Resume ↔ JD Match Report")
-    md += f"## Overall Score\n**{score}%**\n\n"
-    md += "## Strengths\n"
-    md += "\n".join(f"- {s}" for s in strengths) + ("\n\n" if strengths else "_None_\n\n")
-    md += "## Gaps\n"
-    md += "\n".join(f"- {g}" for g in gaps) + ("\n\n" if gaps else "_None_\n\n")
-    md += "## Summary\n"
-    md += f"{summary or '_No summary provided._'}\n"
-    return md
-
-def _markdown_for_enhance(result: Dict[str, Any]) -> str:
-    body = result.get("resume_enhancement_md", "") or "_No suggestions generated._"
-    md = _header("Resume Enhancement Suggestions")
-    md += body
-    return md
-
-def _markdown_for_cover_letter(result: Dict[str, Any]) -> str:
-    body = result.get("cover_letter_md", "") or "_No cover letter generated._"
-    md = _header("Cover Letter")
-    md += body
-    return md
-
-def _markdown_from_unknown(result_any: Any) -> str:
-    md = _header("Job Result")
-    md += "```\n" + _pretty_json(result_any) + "\n```"
-    return md
+    data, filename, media_type = _renderer.render(job_id, jr, fmt)
+    return artifact_store.put(job_id, fmt, data, filename, media_type), data
+
+def _export_entries(job_ids: List[str], formats: List[str]) -> Iterator[Tuple[str, Iterable[bytes]]]:
+    manifest: Dict[str, Any] = {"exported": {}, "skipped": {}}
+    for job_id in job_ids:
+        for fmt in formats:
+            try:
+                stored, fresh = _load_artifact(job_id, fmt)
+            except HTTPException as e:
+                manifest["skipped"].setdefault(job_id, {})[fmt] = e.detail
+                continue
+            manifest["exported"].setdefault(job_id, []).append(stored.filename)
+            chunks = [fresh] if fresh is not None else artifact_store.iter_bytes(stored)
+            yield f"{job_id}/{stored.filename}", chunks
+    yield "manifest.json", [json.dumps(manifest, indent=2).encode("utf-8")]
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
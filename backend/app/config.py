@@ -1,11 +1,35 @@
 # backend/app/config.py
 
 from pydantic import BaseModel, Field
+from typing import List, Optional, Tuple
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Pipeline stages that can run on their own model (see Settings.llm_config)
+LLM_STAGES = ("parse", "match", "enhance", "cover_letter", "fallback")  # fallback: smaller model for jobs short on time
+# Stages each job type runs through
+JOB_STAGES = {
+    "match": ("parse", "match"),
+    "enhance": ("parse", "enhance"),
+    "cover_letter": ("parse", "cover_letter"),
+}
+
+
+class LLMStageConfig(BaseModel, frozen=True):
+    """Resolved LLM settings for one stage; hashable so equal configs share a client."""
+    model_id: str
+    base_url: str
+    base_urls: Tuple[str, ...] = ()  # >1 entries: calls are load-balanced over the pool
+    api_key: str
+    temperature: float
+    max_tokens: Optional[int] = None
+    timeout: int
+    hedge: bool = False  # duplicate slow calls (idempotent stages only)
+
+
 class Settings(BaseModel):
     # LLM config
     LLM_PROVIDER: str = Field(default=os.getenv("LLM_PROVIDER", "ollama"))
@@ -17,18 +41,164 @@ class Settings(BaseModel):
     LLM_TEMPERATURE: str = Field(default=float(os.getenv("LLM_TEMPERATURE", "0.0")))
     # Request timeout in seconds for LiteLLM → Ollama
     LLM_REQUEST_TIMEOUT: int = Field(default=int(os.getenv("LLM_REQUEST_TIMEOUT", "300")))  # For slower models
+    LLM_MAX_TOKENS: int = Field(default=int(os.getenv("LLM_MAX_TOKENS", "0")))  # 0 = provider default
+
+    # Several LLM hosts (comma-separated); when set, overrides LLM_BASE_URL and calls are load-balanced
+    LLM_BASE_URLS: str = Field(default=os.getenv("LLM_BASE_URLS", ""))
+    LLM_POOL_PROBE_INTERVAL: int = Field(default=int(os.getenv("LLM_POOL_PROBE_INTERVAL", "15")))  # seconds between health probes
+    LLM_POOL_PROBE_TIMEOUT: float = Field(default=float(os.getenv("LLM_POOL_PROBE_TIMEOUT", "2.0")))
+    LLM_POOL_FAILURE_THRESHOLD: int = Field(default=int(os.getenv("LLM_POOL_FAILURE_THRESHOLD", "3")))  # consecutive failures to open the circuit
+    LLM_POOL_COOLDOWN_SECONDS: int = Field(default=int(os.getenv("LLM_POOL_COOLDOWN_SECONDS", "30")))  # open circuit duration
+    LLM_POOL_AFFINITY_SLACK: int = Field(default=int(os.getenv("LLM_POOL_AFFINITY_SLACK", "2")))  # in-flight gap before spilling to a cold host
+
+    # Fleet-wide adaptive (AIMD) concurrency limit per LLM backend and model
+    LLM_LIMIT_ENABLED: bool = Field(default=os.getenv("LLM_LIMIT_ENABLED", "true").lower() == "true")
+    LLM_LIMIT_INITIAL: int = Field(default=int(os.getenv("LLM_LIMIT_INITIAL", "2")))
+    LLM_LIMIT_MIN: int = Field(default=int(os.getenv("LLM_LIMIT_MIN", "1")))
+    LLM_LIMIT_MAX: int = Field(default=int(os.getenv("LLM_LIMIT_MAX", "16")))
+    LLM_LIMIT_LATENCY_TOLERANCE: float = Field(default=float(os.getenv("LLM_LIMIT_LATENCY_TOLERANCE", "2.0")))  # x a stage's baseline latency = queueing: stop growing
+    LLM_LIMIT_DECREASE_FACTOR: float = Field(default=float(os.getenv("LLM_LIMIT_DECREASE_FACTOR", "0.5")))
+    LLM_LIMIT_ACQUIRE_TIMEOUT: float = Field(default=float(os.getenv("LLM_LIMIT_ACQUIRE_TIMEOUT", "300")))  # seconds waiting for a permit
+
+    # Request hedging: a call slower than the stage's latency percentile is duplicated, first answer wins
+    LLM_HEDGE_STAGES: str = Field(default=os.getenv("LLM_HEDGE_STAGES", ""))  # e.g. "parse,match"; empty = off
+    LLM_HEDGE_PERCENTILE: float = Field(default=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")))
+    LLM_HEDGE_MIN_DELAY: float = Field(default=float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0")))  # seconds
+    LLM_HEDGE_MAX_DELAY: float = Field(default=float(os.getenv("LLM_HEDGE_MAX_DELAY", "60.0")))  # also used until enough samples
+    LLM_HEDGE_BUDGET: float = Field(default=float(os.getenv("LLM_HEDGE_BUDGET", "0.1")))  # max hedges per call, fleet-wide
+
+    # Per-stage overrides; empty values fall back to the LLM_* settings above.
+    # e.g. a 1-3B model for parsing and the larger default model for generation.
+    LLM_PARSE_MODEL_NAME: str = Field(default=os.getenv("LLM_PARSE_MODEL_NAME", ""))
+    LLM_PARSE_BASE_URL: str = Field(default=os.getenv("LLM_PARSE_BASE_URL", ""))
+    LLM_PARSE_TEMPERATURE: str = Field(default=os.getenv("LLM_PARSE_TEMPERATURE", ""))
+    LLM_PARSE_MAX_TOKENS: str = Field(default=os.getenv("LLM_PARSE_MAX_TOKENS", ""))
+    LLM_PARSE_TIMEOUT: str = Field(default=os.getenv("LLM_PARSE_TIMEOUT", ""))
+    LLM_MATCH_MODEL_NAME: str = Field(default=os.getenv("LLM_MATCH_MODEL_NAME", ""))
+    LLM_MATCH_BASE_URL: str = Field(default=os.getenv("LLM_MATCH_BASE_URL", ""))
+    LLM_MATCH_TEMPERATURE: str = Field(default=os.getenv("LLM_MATCH_TEMPERATURE", ""))
+    LLM_MATCH_MAX_TOKENS: str = Field(default=os.getenv("LLM_MATCH_MAX_TOKENS", ""))
+    LLM_MATCH_TIMEOUT: str = Field(default=os.getenv("LLM_MATCH_TIMEOUT", ""))
+    LLM_ENHANCE_MODEL_NAME: str = Field(default=os.getenv("LLM_ENHANCE_MODEL_NAME", ""))
+    LLM_ENHANCE_BASE_URL: str = Field(default=os.getenv("LLM_ENHANCE_BASE_URL", ""))
+    LLM_ENHANCE_TEMPERATURE: str = Field(default=os.getenv("LLM_ENHANCE_TEMPERATURE", ""))
+    LLM_ENHANCE_MAX_TOKENS: str = Field(default=os.getenv("LLM_ENHANCE_MAX_TOKENS", ""))
+    LLM_ENHANCE_TIMEOUT: str = Field(default=os.getenv("LLM_ENHANCE_TIMEOUT", ""))
+    LLM_COVER_LETTER_MODEL_NAME: str = Field(default=os.getenv("LLM_COVER_LETTER_MODEL_NAME", ""))
+    LLM_COVER_LETTER_BASE_URL: str = Field(default=os.getenv("LLM_COVER_LETTER_BASE_URL", ""))
+    LLM_COVER_LETTER_TEMPERATURE: str = Field(default=os.getenv("LLM_COVER_LETTER_TEMPERATURE", ""))
+    LLM_COVER_LETTER_MAX_TOKENS: str = Field(default=os.getenv("LLM_COVER_LETTER_MAX_TOKENS", ""))
+    LLM_COVER_LETTER_TIMEOUT: str = Field(default=os.getenv("LLM_COVER_LETTER_TIMEOUT", ""))
+    LLM_FALLBACK_MODEL_NAME: str = Field(default=os.getenv("LLM_FALLBACK_MODEL_NAME", ""))  # empty = no model downgrade
+    LLM_FALLBACK_BASE_URL: str = Field(default=os.getenv("LLM_FALLBACK_BASE_URL", ""))
+    LLM_FALLBACK_TEMPERATURE: str = Field(default=os.getenv("LLM_FALLBACK_TEMPERATURE", ""))
+    LLM_FALLBACK_MAX_TOKENS: str = Field(default=os.getenv("LLM_FALLBACK_MAX_TOKENS", ""))
+    LLM_FALLBACK_TIMEOUT: str = Field(default=os.getenv("LLM_FALLBACK_TIMEOUT", ""))
 
     # Warmup
     WARMUP_ENABLED: bool = Field(default=os.getenv("WARMUP_ENABLED", "true").lower() == "true")
     WARMUP_PROMPT: str = Field(default=os.getenv("WARMUP_PROMPT", "Warm up. Reply with OK."))
 
+    # Model residency: keep models loaded during working hours (celery beat pings)
+    RESIDENCY_MODELS: str = Field(default=os.getenv("RESIDENCY_MODELS", ""))  # model names/ids; empty = every model in use
+    RESIDENCY_HOURS: str = Field(default=os.getenv("RESIDENCY_HOURS", ""))  # UTC, e.g. "07:00-19:00,21:00-23:00"; empty = always
+    RESIDENCY_KEEPALIVE_INTERVAL: int = Field(default=int(os.getenv("RESIDENCY_KEEPALIVE_INTERVAL", "240")))  # seconds; 0 = off
+    RESIDENCY_KEEP_ALIVE_SECONDS: int = Field(default=int(os.getenv("RESIDENCY_KEEP_ALIVE_SECONDS", "600")))  # Ollama keep_alive per ping
+    RESIDENCY_GATE_JOBS: bool = Field(default=os.getenv("RESIDENCY_GATE_JOBS", "false").lower() == "true")  # hold jobs until warm
+    RESIDENCY_GATE_RETRY_SECONDS: int = Field(default=int(os.getenv("RESIDENCY_GATE_RETRY_SECONDS", "15")))
+    RESIDENCY_GATE_MAX_WAIT: int = Field(default=int(os.getenv("RESIDENCY_GATE_MAX_WAIT", "300")))  # then run cold anyway
+
     # Celery/Redis
     REDIS_URL: str = Field(default=os.getenv("REDIS_URL", "redis://host.docker.internal:6379/0"))
     CELERY_SOFT_TIME_LIMIT: int = Field(default=int(os.getenv("CELERY_SOFT_TIME_LIMIT", "600")))  #10 min
     CELERY_HARD_TIME_LIMIT: int = Field(default=int(os.getenv("CELERY_HARD_TIME_LIMIT", "660")))  # soft + buffer
+    BATCH_STATUS_MAX_IDS: int = Field(default=int(os.getenv("BATCH_STATUS_MAX_IDS", "500")))  # per /jobs/status request
+    BULK_MAX_ITEMS: int = Field(default=int(os.getenv("BULK_MAX_ITEMS", "500")))  # per /submit-jobs request
+
+    # Result backend storage
+    RESULT_CODEC: str = Field(default=os.getenv("RESULT_CODEC", "json"))  # json | msgpack
+    RESULT_COMPRESSION: str = Field(default=os.getenv("RESULT_COMPRESSION", "zlib"))  # none | zlib | zstd
+    RESULT_COMPRESS_MIN_BYTES: int = Field(default=int(os.getenv("RESULT_COMPRESS_MIN_BYTES", "1024")))
+    RESULT_TTL_DEFAULT: int = Field(default=int(os.getenv("RESULT_TTL_DEFAULT", str(24 * 3600))))  # seconds in Redis
+    RESULT_TTLS: str = Field(default=os.getenv("RESULT_TTLS", ""))  # per job type, e.g. "match=86400,cover_letter=604800"
+    RESULT_ARCHIVE_DIR: str = Field(default=os.getenv("RESULT_ARCHIVE_DIR", ""))  # volume shared by the API and default worker; empty disables compaction
+    RESULT_ARCHIVE_AFTER_SECONDS: int = Field(default=int(os.getenv("RESULT_ARCHIVE_AFTER_SECONDS", str(6 * 3600))))
+    RESULT_COMPACT_INTERVAL: int = Field(default=int(os.getenv("RESULT_COMPACT_INTERVAL", "3600")))  # beat schedule, seconds
+
+    # Claim-check blob store for large payloads (resume/JD text, Markdown results)
+    BLOB_STORE_BACKEND: str = Field(default=os.getenv("BLOB_STORE_BACKEND", "redis"))  # redis | disk
+    BLOB_STORE_DIR: str = Field(default=os.getenv("BLOB_STORE_DIR", os.path.join(tempfile.gettempdir(), "jdm_blobs")))
+    BLOB_INLINE_MAX_BYTES: int = Field(default=int(os.getenv("BLOB_INLINE_MAX_BYTES", "2048")))  # larger strings become references
+    BLOB_TTL_SECONDS: int = Field(default=int(os.getenv("BLOB_TTL_SECONDS", str(7 * 24 * 3600))))
+
+    # Structured parse cache + job lineage (incremental re-analysis of edited resumes)
+    PARSE_CACHE_TTL_SECONDS: int = Field(default=int(os.getenv("PARSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))))
+    LINEAGE_TTL_SECONDS: int = Field(default=int(os.getenv("LINEAGE_TTL_SECONDS", str(7 * 24 * 3600))))
+    # Near-duplicate JD reuse (SimHash LSH): parses of almost identical JDs are reused, or topped up with a delta parse
+    NEAR_DUP_ENABLED: bool = Field(default=os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true")
+    NEAR_DUP_REUSE_DISTANCE: int = Field(default=int(os.getenv("NEAR_DUP_REUSE_DISTANCE", "3")))  # of 64 bits: reuse as is
+    NEAR_DUP_DELTA_DISTANCE: int = Field(default=int(os.getenv("NEAR_DUP_DELTA_DISTANCE", "8")))  # reuse + parse changed sections
+    NEAR_DUP_BANDS: int = Field(default=int(os.getenv("NEAR_DUP_BANDS", "4")))  # LSH bands; must divide 64
+    NEAR_DUP_MIN_FEATURES: int = Field(default=int(os.getenv("NEAR_DUP_MIN_FEATURES", "20")))  # shorter texts aren't indexed
+    # Long documents are parsed as section-aligned chunks, several at a time
+    PARSE_CHUNK_TOKENS: int = Field(default=int(os.getenv("PARSE_CHUNK_TOKENS", "0")))  # 0 = from the parse model's context window
+    PARSE_MAX_PARALLEL: int = Field(default=int(os.getenv("PARSE_MAX_PARALLEL", "4")))  # concurrent parse calls per job
 
+    # Skill taxonomy (bundled backend/app/data/skills.json + extra JSON files in the same format)
+    SKILLS_TAXONOMY_EXTRA: str = Field(default=os.getenv("SKILLS_TAXONOMY_EXTRA", ""))  # comma-separated paths
+    SKILLS_CACHE_DIR: str = Field(default=os.getenv("SKILLS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "jdm_skills")))  # compiled taxonomy (JSON); skipped unless the dir is private (0700) to this user
 
-    def full_model_id(self) -> str:
+    # Job metadata store (history, filters); API and workers must share it
+    JOB_STORE_URL: str = Field(default=os.getenv("JOB_STORE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "jdm_jobs.sqlite3")))  # or postgresql://...
+    JOBS_PAGE_MAX: int = Field(default=int(os.getenv("JOBS_PAGE_MAX", "200")))  # per GET /jobs page
+
+    # Cancellation: POST /job/{id}/cancel, and auto-cancel of interactive jobs nobody polls any more
+    JOB_ABANDON_SECONDS: int = Field(default=int(os.getenv("JOB_ABANDON_SECONDS", "0")))  # no status/result/wait call this long; 0 = off (default)
+    JOB_REAP_INTERVAL: int = Field(default=int(os.getenv("JOB_REAP_INTERVAL", "60")))  # beat schedule, seconds
+    JOB_CANCEL_POLL_SECONDS: float = Field(default=float(os.getenv("JOB_CANCEL_POLL_SECONDS", "0.5")))  # flag checks during an LLM call
+    LLM_CALL_THREADS: int = Field(default=int(os.getenv("LLM_CALL_THREADS", "32")))  # per worker process, for running and abandoned calls
+
+    # Deadlines / SLOs (ResumeJDRequest.deadline, slo_seconds, priority)
+    DEADLINE_ACTION: str = Field(default=os.getenv("DEADLINE_ACTION", "downgrade"))  # downgrade | drop, for jobs that can't finish in time
+    DEADLINE_ESTIMATE_PERCENTILE: float = Field(default=float(os.getenv("DEADLINE_ESTIMATE_PERCENTILE", "0.75")))  # of recent run times
+    DEADLINE_MIN_SAMPLES: int = Field(default=int(os.getenv("DEADLINE_MIN_SAMPLES", "5")))  # before that only expired jobs are dropped
+
+    # Fair scheduling of LLM jobs across tenants (X-Tenant-Id / X-API-Key)
+    FAIR_SCHEDULING_ENABLED: bool = Field(default=os.getenv("FAIR_SCHEDULING_ENABLED", "true").lower() == "true")
+    FAIR_DISPATCH_WINDOW: int = Field(default=int(os.getenv("FAIR_DISPATCH_WINDOW", "8")))  # jobs sent to the broker and not finished; ~ LLM worker processes
+    FAIR_TENANT_MAX_INFLIGHT: int = Field(default=int(os.getenv("FAIR_TENANT_MAX_INFLIGHT", "4")))  # per tenant, of the window
+    FAIR_TENANT_LIMITS: str = Field(default=os.getenv("FAIR_TENANT_LIMITS", ""))  # tenant=max in-flight overrides, comma-separated
+    FAIR_TENANT_WEIGHTS: str = Field(default=os.getenv("FAIR_TENANT_WEIGHTS", ""))  # tenant=weight (default 1), comma-separated
+    FAIR_QUANTUM_SECONDS: float = Field(default=float(os.getenv("FAIR_QUANTUM_SECONDS", "60")))  # estimated LLM seconds per tenant per round
+    FAIR_INFLIGHT_TTL: int = Field(default=int(os.getenv("FAIR_INFLIGHT_TTL", "1800")))  # a slot not released this long is freed (lost task)
+    FAIR_PUMP_INTERVAL: float = Field(default=float(os.getenv("FAIR_PUMP_INTERVAL", "5")))  # beat safety net; dispatch also runs on submit and finish
+
+    # Worker pool autoscaler (python -m backend.tools.autoscaler)
+    AUTOSCALE_QUEUES: str = Field(default=os.getenv("AUTOSCALE_QUEUES", "llm+llm_high+llm_low,pdf"))  # a+b: queues served by one pool
+    AUTOSCALE_LIMITS: str = Field(default=os.getenv("AUTOSCALE_LIMITS", "llm=1:8,pdf=1:4"))  # queue=min:max processes
+    AUTOSCALE_INTERVAL: float = Field(default=float(os.getenv("AUTOSCALE_INTERVAL", "15")))  # seconds between ticks
+    AUTOSCALE_TARGET_WAIT: float = Field(default=float(os.getenv("AUTOSCALE_TARGET_WAIT", "60")))  # drain the backlog within, seconds
+    AUTOSCALE_SCALE_DOWN_DELAY: float = Field(default=float(os.getenv("AUTOSCALE_SCALE_DOWN_DELAY", "300")))  # low demand this long before shrinking
+    AUTOSCALE_COOLDOWN: float = Field(default=float(os.getenv("AUTOSCALE_COOLDOWN", "30")))  # min seconds between resizes of a queue
+    AUTOSCALE_STEP_DOWN: int = Field(default=int(os.getenv("AUTOSCALE_STEP_DOWN", "1")))  # processes removed per shrink
+    AUTOSCALE_LLM_SATURATION: float = Field(default=float(os.getenv("AUTOSCALE_LLM_SATURATION", "0.9")))  # permits in use / limit: stop growing
+
+    # Rendered artifacts (md/json/pdf downloads)
+    ARTIFACT_STORE_DIR: str = Field(default=os.getenv("ARTIFACT_STORE_DIR", os.path.join(tempfile.gettempdir(), "jdm_artifacts")))
+    ARTIFACT_STORE_MAX_BYTES: int = Field(default=int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(256 * 1024 * 1024))))  # 256 MB
+    ARTIFACT_TTL_SECONDS: int = Field(default=int(os.getenv("ARTIFACT_TTL_SECONDS", str(7 * 24 * 3600))))  # 7 days
+    ARTIFACT_SWEEP_GRACE_SECONDS: int = Field(default=int(os.getenv("ARTIFACT_SWEEP_GRACE_SECONDS", "300")))  # unreferenced blobs younger than this are kept
+
+
+    def result_ttl(self, job_type: str) -> int:
+        """Redis TTL for a job type's result (RESULT_TTLS entry, else RESULT_TTL_DEFAULT)."""
+        for item in self.RESULT_TTLS.split(","):
+            name, _, value = item.partition("=")
+            if name.strip().lower() == (job_type or "").lower() and value.strip():
+                return int(value)
+        return self.RESULT_TTL_DEFAULT
+
+    def full_model_id(self, model_name: Optional[str] = None) -> str:
         """
         Return provider-prefixed model id for LiteLLM, e.g.:
         - 'ollama/llama3.2'
@@ -36,10 +206,36 @@ class Settings(BaseModel):
         - 'groq/llama3-8b-8192'
         """
         provider = self.LLM_PROVIDER.strip().lower()
+        name = (model_name or self.LLM_MODEL_NAME).strip()
         # If already prefixed, keep as is
-        if "/" in self.LLM_MODEL_NAME:
-            return self.LLM_MODEL_NAME
-        return f"{provider}/{self.LLM_MODEL_NAME}"
+        if "/" in name:
+            return name
+        return f"{provider}/{name}"
+
+    def llm_configs(self) -> List[LLMStageConfig]:
+        """Every distinct config used by a pipeline stage."""
+        return list(dict.fromkeys(self.llm_config(stage) for stage in LLM_STAGES))
+
+    def llm_config(self, stage: Optional[str] = None) -> LLMStageConfig:
+        """LLM settings for a pipeline stage (LLM_<STAGE>_* overrides on top of the LLM_* defaults)."""
+        def override(field: str) -> str:
+            if stage not in LLM_STAGES:
+                return ""
+            return str(getattr(self, f"LLM_{stage.upper()}_{field}", "") or "").strip()
+
+        max_tokens = int(override("MAX_TOKENS") or self.LLM_MAX_TOKENS)
+        urls = override("BASE_URL") or self.LLM_BASE_URLS or self.LLM_BASE_URL
+        base_urls = tuple(dict.fromkeys(u.strip().rstrip("/") for u in urls.split(",") if u.strip()))
+        return LLMStageConfig(
+            model_id=self.full_model_id(override("MODEL_NAME") or None),
+            base_url=base_urls[0],
+            base_urls=base_urls,
+            api_key=self.LLM_API_KEY,
+            temperature=float(override("TEMPERATURE") or self.LLM_TEMPERATURE),
+            max_tokens=max_tokens or None,
+            timeout=int(override("TIMEOUT") or self.LLM_REQUEST_TIMEOUT),
+            hedge=stage in {x.strip().lower() for x in self.LLM_HEDGE_STAGES.split(",")},
+        )
 
 
 settings = Settings()
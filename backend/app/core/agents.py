@@ -1,7 +1,7 @@
 # backend/app/core/agents.py
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Dict, Optional
 from crewai import Agent, LLM
 
 @dataclass
@@ -12,45 +12,58 @@ class MatcherAgents:
     enhancer: Agent
     cover_letter: Agent
 
+# Pipeline stage (see Settings.llm_config) whose model each agent runs on
+AGENT_STAGES = {
+    "resume_parser": "parse",
+    "jd_parser": "parse",
+    "matcher": "match",
+    "enhancer": "enhance",
+    "cover_letter": "cover_letter",
+}
+
 class AgentsFactory:
-    """Factory that builds all CrewAI agents with a shared LLM."""
-    def __init__(self, llm: LLM):
+    """Factory that builds all CrewAI agents; `stage_llms` overrides the shared LLM per stage."""
+    def __init__(self, llm: LLM, stage_llms: Optional[Dict[str, LLM]] = None):
         self.llm = llm
+        self.stage_llms = stage_llms or {}
+
+    def _llm_for(self, agent_name: str) -> LLM:
+        return self.stage_llms.get(AGENT_STAGES[agent_name], self.llm)
 
     def build(self) -> MatcherAgents:
         resume_parser = Agent(
             role="Resume Parsing Specialist",
             goal="Extract structured data (skills, experience, education, tools) from a resume.",
             backstory="You are meticulous and consistent. Output JSON only.",
-            llm=self.llm,
+            llm=self._llm_for("resume_parser"),
             verbose=False
         )
         jd_parser = Agent(
             role="Job Description Analyst",
             goal="Extract required skills, responsibilities, and must-haves from a JD.",
             backstory="You identify core requirements and hiring signals. Output JSON only.",
-            llm=self.llm,
+            llm=self._llm_for("jd_parser"),
             verbose=False
         )
         matcher = Agent(
             role="Resume-JD Matcher",
             goal="Compare parsed resume vs parsed JD. Score 0-100 and list strengths and gaps.",
             backstory="You are objective and concise. Output JSON only.",
-            llm=self.llm,
+            llm=self._llm_for("matcher"),
             verbose=False
         )
         enhancer = Agent(
             role="Resume Enhancer",
             goal="Suggest resume improvements aligned with the JD and rewrite 3–5 key bullets.",
             backstory="Keep it ATS-friendly and specific. Output Markdown.",
-            llm=self.llm,
+            llm=self._llm_for("enhancer"),
             verbose=False
         )
         cover_letter = Agent(
             role="Cover Letter Writer",
             goal="Draft a tailored one-page cover letter aligned with resume and JD.",
             backstory="Professional, concise, concrete achievements. Output Markdown.",
-            llm=self.llm,
+            llm=self._llm_for("cover_letter"),
             verbose=False
         )
 
@@ -0,0 +1,236 @@
+# backend/app/core/artifact_store.py
+
+from dataclasses import dataclass
+from typing import Optional, List, Tuple, Iterator
+from backend.app.config import settings
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+@dataclass
+class StoredArtifact:
+    job_id: str
+    fmt: str
+    digest: str
+    path: str
+    filename: str
+    media_type: str
+    size: int
+    created_at: float
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+
+class ArtifactStore:
+    """Content-addressed, size-capped store for rendered job artifacts.
+
+    Layout under `root`:
+    - blobs/<aa>/<sha256>    : artifact bytes, shared by every key with the same content
+    - index/<key>.json       : (job_id, format) -> digest + download metadata
+
+    The index file's mtime is the last-access time, so eviction is LRU across
+    processes sharing the directory. Entries older than `ttl_seconds` expire,
+    and once the blobs exceed `max_bytes` the least recently used entries go first.
+    put() writes (or touches) the blob before its index entry; blobs written or
+    touched in the last `sweep_grace_seconds` are never swept, so an evict() in
+    another process can't delete one between the two writes.
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl_seconds: int, sweep_grace_seconds: float = 300.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sweep_grace_seconds = sweep_grace_seconds
+        self._lock = threading.Lock()
+        self._blob_dir = os.path.join(root, "blobs")
+        self._index_dir = os.path.join(root, "index")
+        os.makedirs(self._blob_dir, exist_ok=True)
+        os.makedirs(self._index_dir, exist_ok=True)
+
+    # ---------- Public API ----------
+    def get(self, job_id: str, fmt: str) -> Optional[StoredArtifact]:
+        index_path = self._index_path(job_id, fmt)
+        meta = self._read_index(index_path)
+        if meta is None:
+            return None
+        if self._expired(meta):
+            self._remove_index(index_path)
+            return None
+        blob_path = self._blob_path(meta["digest"])
+        if not os.path.exists(blob_path):
+            self._remove_index(index_path)
+            return None
+        try:
+            os.utime(index_path, None)  # LRU touch
+        except OSError:
+            pass
+        return self._to_artifact(meta, blob_path)
+
+    def available(self, job_id: str, formats: Tuple[str, ...]) -> List[str]:
+        """Formats already rendered for `job_id` (no LRU touch; used by status endpoints)."""
+        ready = []
+        for fmt in formats:
+            meta = self._read_index(self._index_path(job_id, fmt))
+            if meta is not None and not self._expired(meta) and os.path.exists(self._blob_path(meta["digest"])):
+                ready.append(fmt)
+        return ready
+
+    def put(self, job_id: str, fmt: str, data: bytes, filename: str, media_type: str) -> StoredArtifact:
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        try:
+            os.utime(blob_path, None)  # same content already stored: restart its sweep grace period
+        except OSError:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._atomic_write(blob_path, data)
+
+        meta = {
+            "job_id": job_id,
+            "fmt": fmt,
+            "digest": digest,
+            "filename": filename,
+            "media_type": media_type,
+            "size": len(data),
+            "created_at": time.time(),
+        }
+        self._atomic_write(self._index_path(job_id, fmt), json.dumps(meta).encode("utf-8"))
+        self.evict()
+        return self._to_artifact(meta, blob_path)
+
+    def iter_bytes(self, artifact: StoredArtifact, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Stream a stored artifact in chunks."""
+        with open(artifact.path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def evict(self) -> int:
+        """Drop expired entries, then LRU entries until blobs fit `max_bytes`. Returns bytes freed."""
+        with self._lock:
+            entries: List[Tuple[float, str, dict]] = []
+            for name in os.listdir(self._index_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self._index_dir, name)
+                meta = self._read_index(path)
+                if meta is None:
+                    continue
+                if self._expired(meta):
+                    self._remove_index(path)
+                    continue
+                try:
+                    atime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                entries.append((atime, path, meta))
+
+            # Blob sizes are counted once even when several keys share content
+            live = {meta["digest"]: meta["size"] for _, _, meta in entries}
+            total = sum(live.values())
+            if total > self.max_bytes:
+                entries.sort(key=lambda e: e[0])  # oldest access first
+                refs = {}
+                for _, _, meta in entries:
+                    refs[meta["digest"]] = refs.get(meta["digest"], 0) + 1
+                for _, path, meta in entries:
+                    if total <= self.max_bytes:
+                        break
+                    self._remove_index(path)
+                    refs[meta["digest"]] -= 1
+                    if refs[meta["digest"]] == 0:
+                        live.pop(meta["digest"], None)
+                        total -= meta["size"]
+
+            return self._sweep_blobs(set(live))
+
+    # ---------- Internals ----------
+    def _sweep_blobs(self, live_digests: set) -> int:
+        freed = 0
+        young = time.time() - self.sweep_grace_seconds
+        for shard in os.listdir(self._blob_dir):
+            shard_dir = os.path.join(self._blob_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for digest in os.listdir(shard_dir):
+                if digest in live_digests or digest.endswith(".tmp"):
+                    continue
+                path = os.path.join(shard_dir, digest)
+                try:
+                    st = os.stat(path)
+                    if st.st_mtime > young:
+                        continue  # maybe a put() about to write its index entry
+                    os.remove(path)
+                    freed += st.st_size
+                except OSError:
+                    pass
+        return freed
+
+    def _expired(self, meta: dict) -> bool:
+        return self.ttl_seconds > 0 and time.time() - float(meta.get("created_at", 0)) > self.ttl_seconds
+
+    def _index_path(self, job_id: str, fmt: str) -> str:
+        # Hash the key so arbitrary job ids from the URL can never escape the store
+        key = hashlib.sha256(f"{job_id}:{fmt}".encode("utf-8")).hexdigest()[:40]
+        return os.path.join(self._index_dir, f"{key}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir, digest[:2], digest)
+
+    @staticmethod
+    def _read_index(path: str) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _remove_index(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _to_artifact(meta: dict, blob_path: str) -> StoredArtifact:
+        return StoredArtifact(
+            job_id=meta["job_id"],
+            fmt=meta["fmt"],
+            digest=meta["digest"],
+            path=blob_path,
+            filename=meta["filename"],
+            media_type=meta["media_type"],
+            size=int(meta["size"]),
+            created_at=float(meta["created_at"]),
+        )
+
+
+# Singleton
+artifact_store = ArtifactStore(
+    root=settings.ARTIFACT_STORE_DIR,
+    max_bytes=settings.ARTIFACT_STORE_MAX_BYTES,
+    ttl_seconds=settings.ARTIFACT_TTL_SECONDS,
+    sweep_grace_seconds=settings.ARTIFACT_SWEEP_GRACE_SECONDS,
+)
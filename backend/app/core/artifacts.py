@@ -1,290 +1,124 @@
 # backend/app/core/artifacts.py
 
-from typing import Dict, Any, List, Tuple
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable
-from reportlab.lib import colors
+from typing import Dict, Any, List, Tuple, Callable, Optional
 import datetime
-import re
+import io
+import json
 
-class PDFRenderer:
-    """Render job results as polished PDFs using ReportLab.
-
-    Improvements in this version:
-    - Consistent headers + timestamps
-    - Proper bullet lists (unordered + ordered)
-    - Basic Markdown-like rendering:
-        * '#', '##', '###' headings
-        * '- ' and '* ' bullets
-        * '1. ' numbered lists
-        * **bold** and *italic* inline
-        * Paragraph spacing and line breaks
-    - Normalization helpers for Enhance/Cover Letter content
-    """
-
-    def __init__(self):
-        styles = getSampleStyleSheet()
-        self.title_style = ParagraphStyle(
-            name="TitleCentered",
-            parent=styles["Title"],
-            alignment=TA_CENTER,
-            spaceAfter=12,
-        )
-        self.h1 = styles["Heading1"]
-        self.h2 = styles["Heading2"]
-        self.h3 = styles["Heading3"]
-        self.body = styles["BodyText"]
-
-        # Slightly tighter body text for letters
-        self.body_letter = ParagraphStyle(
-            name="BodyLetter",
-            parent=self.body,
-            leading=14
-        )
-
-    # ---------- Public API ----------
-    def build_match_pdf(self, path: str, result: Dict[str, Any]) -> None:
-        """Structured, sectioned report for matching results."""
-        doc = SimpleDocTemplate(
-            path, pagesize=A4,
-            topMargin=2 * cm, bottomMargin=2 * cm,
-            leftMargin=2 * cm, rightMargin=2 * cm
-        )
-        flow: List = []
-        flow += self._header("Resume ↔ JD Match Report")
+class MarkdownRenderer:
+    """Render job results as Markdown documents (mirrors PDFRenderer's sections in pdf_renderer.py)."""
 
+    def build_match_md(self, result: Dict[str, Any]) -> str:
         score = result.get("match_score", "N/A")
         strengths: List[str] = result.get("strengths", []) or []
         gaps: List[str] = result.get("gaps", []) or []
         summary = result.get("summary", "")
 
-        flow.append(Paragraph("Overall Score", self.h2))
-        flow.append(Paragraph(f"<b>{self._escape_html(str(score))}%</b>", self.body))
-        flow.append(Spacer(1, 0.3 * cm))
-
-        flow.append(Paragraph("Strengths", self.h2))
-        flow += self._bullet_list(strengths)
-        flow.append(Spacer(1, 0.3 * cm))
-
-        flow.append(Paragraph("Gaps", self.h2))
-        flow += self._bullet_list(gaps)
-        flow.append(Spacer(1, 0.3 * cm))
-
-        flow.append(Paragraph("Summary", self.h2))
-        flow.append(Paragraph(self._nl2br(self._escape_html(summary or "_No summary provided._")), self.body))
+        md = self._header("Resume ↔ JD Match Report")
+        md += f"## Overall Score\n**{score}%**\n\n"
+        md += "## Strengths\n"
+        md += "\n".join(f"- {s}" for s in strengths) + ("\n\n" if strengths else "_None_\n\n")
+        md += "## Gaps\n"
+        md += "\n".join(f"- {g}" for g in gaps) + ("\n\n" if gaps else "_None_\n\n")
+        md += "## Summary\n"
+        md += f"{summary or '_No summary provided._'}\n"
+        return md
 
-        doc.build(flow)
+    def build_enhance_md(self, result: Dict[str, Any]) -> str:
+        body = result.get("resume_enhancement_md", "") or "_No suggestions generated._"
+        return self._header("Resume Enhancement Suggestions") + body
 
-    def build_enhance_pdf(self, path: str, result: Dict[str, Any]) -> None:
-        """Render enhancement suggestions with clear sections and bullets."""
-        doc = SimpleDocTemplate(
-            path, pagesize=A4,
-            topMargin=2 * cm, bottomMargin=2 * cm,
-            leftMargin=2 * cm, rightMargin=2 * cm
-        )
-        flow: List = []
-        flow += self._header("Resume Enhancement Suggestions")
+    def build_cover_letter_md(self, result: Dict[str, Any]) -> str:
+        body = result.get("cover_letter_md", "") or "_No cover letter generated._"
+        return self._header("Cover Letter") + body
 
-        raw_md = result.get("resume_enhancement_md", "") or "_No suggestions generated._"
-        md = self._normalize_enhance_md(raw_md)
-        flow += self._markdown_to_flowables(md, use_letter_style=False)
+    def build_generic_md(self, result_any: Any) -> str:
+        return self._header("Job Result") + "```\n" + pretty_json(result_any) + "\n```"
 
-        doc.build(flow)
-
-    def build_cover_letter_pdf(self, path: str, result: Dict[str, Any]) -> None:
-        """Render the cover letter with readable paragraph spacing."""
-        doc = SimpleDocTemplate(
-            path, pagesize=A4,
-            topMargin=2 * cm, bottomMargin=2 * cm,
-            leftMargin=2 * cm, rightMargin=2 * cm
-        )
-        flow: List = []
-        flow += self._header("Cover Letter")
-
-        raw_md = result.get("cover_letter_md", "") or "_No cover letter generated._"
-        md = self._normalize_cover_letter_md(raw_md)
-        flow += self._markdown_to_flowables(md, use_letter_style=True)
-
-        doc.build(flow)
-
-    def build_generic_pdf(self, path: str, title: str, body_text_or_md: str) -> None:
-        """Fallback generic PDF with a title and markdown-ish body."""
-        doc = SimpleDocTemplate(
-            path, pagesize=A4,
-            topMargin=2 * cm, bottomMargin=2 * cm,
-            leftMargin=2 * cm, rightMargin=2 * cm
-        )
-        flow: List = []
-        flow += self._header(title)
-        flow += self._markdown_to_flowables(body_text_or_md or "_No content._", use_letter_style=False)
-        doc.build(flow)
-
-    # ---------- Section Builders ----------
-    def _header(self, title: str) -> List:
+    @staticmethod
+    def _header(title: str) -> str:
         now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-        return [
-            Paragraph(title, self.title_style),
-            Paragraph(f"<font size=9 color=grey>Generated: {self._escape_html(now)}</font>", self.body),
-            Spacer(1, 0.5 * cm),
-        ]
-
-    def _bullet_list(self, items: List[str]) -> List:
-        """Unordered bullet list with clean bullets."""
-        if not items:
-            return [Paragraph("<i>None</i>", self.body)]
-        paras = [Paragraph(self._inline_format(self._escape_html(x)), self.body) for x in items]
-        return [ListFlowable(
-            paras,
-            bulletType="bullet",
-            leftIndent=10,
-            bulletColor=colors.black,
-        )]
-
-    def _numbered_list(self, items: List[str]) -> List:
-        """Ordered list (1., 2., 3., ...)"""
-        if not items:
-            return [Paragraph("<i>None</i>", self.body)]
-        paras = [Paragraph(self._inline_format(self._escape_html(x)), self.body) for x in items]
-        return [ListFlowable(
-            paras,
-            bulletType="1",
-            leftIndent=10,
-            bulletColor=colors.black,
-        )]
+        return f"# {title}\n\n_Generated: {now}_\n\n"
 
-    # ---------- Markdown-lite Rendering ----------
-    def _markdown_to_flowables(self, text: str, use_letter_style: bool) -> List:
-        """
-        Very light-weight markdown-ish parser to make nice PDFs:
-        - '# ', '## ', '### ' headings
-        - '- ' or '* ' unordered bullets
-        - '1. ' ordered bullets
-        - Blank lines -> paragraph spacing
-        - Inline **bold** and *italic* supported
-        """
-        lines = text.splitlines()
-        flow: List = []
-        buffer_ul: List[str] = []
-        buffer_ol: List[str] = []
 
-        def flush_lists():
-            nonlocal buffer_ul, buffer_ol, flow
-            if buffer_ul:
-                flow += self._bullet_list(buffer_ul)
-                flow.append(Spacer(1, 0.2 * cm))
-                buffer_ul = []
-            if buffer_ol:
-                flow += self._numbered_list(buffer_ol)
-                flow.append(Spacer(1, 0.2 * cm))
-                buffer_ol = []
+class ArtifactRenderer:
+    """Turn a finished job (as returned by the job queue) into downloadable artifacts.
 
-        p_style = self.body_letter if use_letter_style else self.body
-
-        for raw in lines:
-            line = raw.rstrip()
-
-            # Blank line separates blocks
-            if not line.strip():
-                flush_lists()
-                flow.append(Spacer(1, 0.2 * cm))
-                continue
-
-            # Headings
-            if line.startswith("### "):
-                flush_lists()
-                flow.append(Paragraph(self._escape_html(line[4:]), self.h3))
-                continue
-            if line.startswith("## "):
-                flush_lists()
-                flow.append(Paragraph(self._escape_html(line[3:]), self.h2))
-                continue
-            if line.startswith("# "):
-                flush_lists()
-                flow.append(Paragraph(self._escape_html(line[2:]), self.h1))
-                continue
-
-            # Ordered list "1. ", "2. ", etc.
-            m_num = re.match(r"^\s*\d+\.\s+(.*)$", line)
-            if m_num:
-                buffer_ol.append(m_num.group(1))
-                continue
-
-            # Unordered bullets "- " or "* "
-            if line.lstrip().startswith("- "):
-                buffer_ul.append(line.lstrip()[2:])
-                continue
-            if line.lstrip().startswith("* "):
-                buffer_ul.append(line.lstrip()[2:])
-                continue
-
-            # Normal paragraph
-            flush_lists()
-            flow.append(Paragraph(self._nl2br(self._inline_format(self._escape_html(line))), p_style))
-
-        flush_lists()
-        return flow
-
-    # ---------- Normalizers for specific job types ----------
-    def _normalize_enhance_md(self, md: str) -> str:
-        """Ensure standard sections exist for Enhance output."""
-        text = md.strip()
-        if not text:
-            return "_No suggestions generated._"
-
-        # If it doesn't contain an H2, add standard headings
-        has_h2 = any(line.startswith("## ") for line in text.splitlines())
-        if not has_h2:
-            # Heuristic split: first paragraph as intro, then bullets become "Improvements"
-            parts = text.splitlines()
-            bullets = [p[2:] for p in parts if p.lstrip().startswith("- ")]
-            intro = "\n".join(p for p in parts if not p.lstrip().startswith("- "))
-            rebuilt = "## Improvements\n"
-            if bullets:
-                rebuilt += "\n".join(f"- {b}" for b in bullets)
-            else:
-                rebuilt += "_No bullet suggestions found._"
-            if intro.strip():
-                rebuilt = f"## Notes\n{intro.strip()}\n\n" + rebuilt
-            return rebuilt
-
-        return text
+    Shared by the API (on-demand fallback) and the worker (pre-rendering at completion).
+    ReportLab is only imported the first time a PDF is rendered.
+    """
 
-    def _normalize_cover_letter_md(self, md: str) -> str:
-        """Make sure the letter reads well; add minimal structure if missing."""
-        text = md.strip()
-        if not text:
-            return "_No cover letter generated._"
+    FORMATS = ("md", "json", "pdf")
 
-        # If there are no headings at all, just return as paragraphs
-        has_heading = any(line.startswith("#") for line in text.splitlines())
-        if not has_heading:
-            return text
+    def __init__(self):
+        self._pdf = None
+        self.md = MarkdownRenderer()
+
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            from backend.app.core.pdf_renderer import PDFRenderer
+            self._pdf = PDFRenderer()
+        return self._pdf
+
+    def render(self, job_id: str, jr: Dict[str, Any], fmt: str) -> Tuple[bytes, str, str]:
+        """Return (bytes, filename, media_type) for a SUCCESS/FAILURE job result."""
+        status = jr.get("status")
+        if status == "FAILURE":
+            err = jr.get("error") or "Unknown error"
+            payload = {"job_id": job_id, "status": status, "error": err}
+            return _json_bytes(payload), f"job_{job_id}_error.json", "application/json"
+
+        # SUCCESS — unwrap nested shapes like {"status":"done","result":{...}}
+        result = unwrap_result(jr.get("result"))
+        job_type, stem, to_md, pdf_builder = self._pick(job_id, result)
+
+        if fmt == "json":
+            payload = {"job_id": job_id, "status": status, "result": result, "job_type": job_type}
+            return _json_bytes(payload), f"{stem}.json", "application/json"
+        if fmt == "pdf":
+            return self._render_pdf(pdf_builder, result), f"{stem}.pdf", "application/pdf"
+        return to_md(result).encode("utf-8"), f"{stem}.md", "text/markdown"
+
+    def _pick(self, job_id: str, result: Any) -> Tuple[str, str, Callable, Optional[str]]:
+        """(job_type, file stem, Markdown builder, PDFRenderer method name or None for generic)."""
+        # Detect job type by keys at the unwrapped level
+        if isinstance(result, dict) and "match_score" in result:
+            return "match", f"match_report_{job_id}", self.md.build_match_md, "build_match_pdf"
+        if isinstance(result, dict) and "resume_enhancement_md" in result:
+            return "enhance", f"resume_enhancement_{job_id}", self.md.build_enhance_md, "build_enhance_pdf"
+        if isinstance(result, dict) and "cover_letter_md" in result:
+            return "cover_letter", f"cover_letter_{job_id}", self.md.build_cover_letter_md, "build_cover_letter_pdf"
+
+        # Unknown structure → generic
+        return "unknown", f"job_{job_id}", self.md.build_generic_md, None
+
+    def _render_pdf(self, builder: Optional[str], result: Any) -> bytes:
+        # ReportLab renders straight into memory; nothing touches the filesystem
+        buf = io.BytesIO()
+        if builder is None:
+            self.pdf.build_generic_pdf(buf, "Job Result", pretty_json(result))
+        else:
+            getattr(self.pdf, builder)(buf, result)
+        return buf.getvalue()
+
+
+def unwrap_result(raw_result: Any) -> Any:
+    """
+    Accepts any structure. If it's a dict that looks like {'status': 'done', 'result': {...}},
+    return the inner .result; otherwise return as-is.
+    """
+    if isinstance(raw_result, dict) and "result" in raw_result and set(raw_result.keys()) <= {"status", "result"}:
+        return raw_result.get("result")
+    return raw_result
 
-        return text
 
-    # ---------- Inline helpers ----------
-    @staticmethod
-    def _nl2br(text: str) -> str:
-        """Convert newlines to <br/> for ReportLab Paragraph."""
-        return text.replace("\n", "<br/>")
+def pretty_json(value: Any) -> str:
+    try:
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    except Exception:
+        return str(value)
 
-    @staticmethod
-    def _escape_html(text: str) -> str:
-        """Minimal XML/HTML escaping for ReportLab Paragraph."""
-        return (
-            text.replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-        )
 
-    @staticmethod
-    def _inline_format(text: str) -> str:
-        """Convert **bold** and *italic* markdown to HTML for ReportLab."""
-        # Bold: **text**
-        text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
-        # Italic: *text*
-        text = re.sub(r"(?<!\*)\*(?!\s)(.+?)(?<!\s)\*(?!\*)", r"<i>\1</i>", text)
-        return text
+def _json_bytes(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
@@ -1,9 +1,23 @@
 # backend/app/core/async_queue.py
 
-from typing import Dict, Any
-from celery.result import AsyncResult
-from backend.app.core.tasks import run_agent_job
+from typing import Dict, Any, List, Tuple, Optional
+from datetime import datetime, timezone
+from celery import group, states
+from celery.result import AsyncResult, GroupResult
+from celery.utils import uuid
+from backend.app.core.artifacts import ArtifactRenderer
+from backend.app.core.artifact_store import artifact_store
+from backend.app.core.blob_store import blob_store, BlobNotFound
+from backend.app.core.cancellation import cancellation
+from backend.app.core.deadlines import CLASS_QUEUES, message_priority, resolve_deadline
+from backend.app.core.fair_scheduler import fair_scheduler, INTERACTIVE, BATCH, ANONYMOUS
+from backend.app.core.result_archive import result_archive, date_done_timestamp
+from backend.app.core.job_store import job_store
+from backend.app.core.metrics import metrics
 from backend.worker.worker import celery_app
+from backend.app.config import settings
+import hashlib
+import time
 
 class AsyncJobQueueCelery:
     """Async job queue using Celery with queue routing."""
@@ -11,43 +25,219 @@ class AsyncJobQueueCelery:
     def _pick_queue(self, job_type: str, payload: Dict[str, Any]) -> str:
         """
         Decide which queue to use based on job_type/payload.
-        - LLM-heavy jobs → 'llm'
+        - LLM-heavy jobs → 'llm_high' | 'llm' | 'llm_low' by priority class
         - Future: add 'pdf' for large PDF parse tasks, etc.
         """
         jt = (job_type or "").lower()
         if jt in {"match", "enhance", "cover_letter"}:
-            return "llm"
+            return CLASS_QUEUES.get(payload.get("priority") or "normal", "llm")
         return "default"
     
-    def submit_job(self, job_type: str, payload: dict) -> str:
+    def _signature(self, job_type: str, payload: dict, job_class: str = INTERACTIVE, tenant: str = ANONYMOUS):
+        """Build the routed run_agent_job signature (with its render step linked), plus its job store row."""
         # Ensure we don't pass 'job_type' twice (in task arg and inside payload)
         clean_payload = dict(payload or {})
         clean_payload.pop("job_type", None)
+        # For the per-tenant wait metrics, taken when the job starts
+        clean_payload.update(tenant=tenant, job_class=job_class, submitted_at=time.time())
+        # The worker only needs the absolute deadline
+        clean_payload["deadline"] = resolve_deadline(clean_payload.get("deadline"), clean_payload.pop("slo_seconds", None))
 
         queue_name = self._pick_queue(job_type, clean_payload)
+        priority = message_priority(clean_payload.get("priority") or "normal", clean_payload["deadline"])
+        row = {
+            "job_type": job_type,
+            "resume_hash": _text_hash(clean_payload.get("resume")),
+            "jd_hash": _text_hash(clean_payload.get("jd")),
+            "jd_id": clean_payload.get("jd_id"),
+            "jd_version": clean_payload.get("jd_version"),
+            "parent_job_id": clean_payload.get("parent_job_id"),
+        }
+        # Claim-check: large texts go to the blob store, the message carries references
+        clean_payload = blob_store.offload(clean_payload)
 
-        # Route to the selected queue via apply_async; use positional args
-        async_result = run_agent_job.apply_async(
+        # The job id is fixed up front so the render step (linked on success,
+        # runs on the 'pdf' queue) knows where to store the artifacts.
+        # Tasks are referenced by name (sent like send_task): the API never imports the worker code.
+        job_id = uuid()
+        sig = celery_app.signature(
+            "run_agent_job",
             args=[job_type, clean_payload],
             queue=queue_name,
             routing_key=queue_name,
+            priority=priority,
+            task_id=job_id,
         )
-        return async_result.id    
+        sig.link(celery_app.signature("render_artifacts", args=[job_id], queue="pdf", routing_key="pdf"))
+        row["job_id"] = job_id
+        return sig, row
+
+    def _send(self, sig, job_type: str, job_class: str, tenant: str) -> None:
+        """LLM jobs go through the tenant's fair-scheduling queue; anything else straight to the broker."""
+        if settings.FAIR_SCHEDULING_ENABLED and sig.options.get("queue") in CLASS_QUEUES.values():
+            fair_scheduler.enqueue(sig, job_class, tenant, job_type, priority=sig.options.get("priority") or 0)
+        else:
+            sig.apply_async()
+
+    def submit_job(self, job_type: str, payload: dict, tenant: str = ANONYMOUS) -> str:
+        sig, row = self._signature(job_type, payload, INTERACTIVE, tenant)
+        job_store.record_submitted([row])  # before sending, so the worker's updates find the row
+        # Interactive job: auto-cancelled if its client stops polling (bulk jobs are collected later, never)
+        cancellation.watch(row["job_id"])
+        self._send(sig, job_type, INTERACTIVE, tenant)
+        if settings.FAIR_SCHEDULING_ENABLED:
+            fair_scheduler.pump()
+        return row["job_id"]
+
+    def submit_jd_parse(self, jd_id: str, version: int) -> str:
+        """Pre-parse a library JD on the LLM workers (background work: lowest class, last in it)."""
+        sig = celery_app.signature("parse_jd", args=[jd_id, version], queue="llm_low", routing_key="llm_low",
+                                   priority=message_priority("low", None))
+        return sig.apply_async().id
+
+    def submit_group(self, items: List[Tuple[str, dict]], tenant: str = ANONYMOUS) -> Tuple[str, List[str]]:
+        """
+        Enqueue many (job_type, payload) items as one Celery group (batch class).
+        Each item is an independent task, so one failure doesn't affect the others.
+        Returns (group_id, job_ids) with job_ids in item order.
+        """
+        built = [self._signature(job_type, payload, BATCH, tenant) for job_type, payload in items]
+        group_id = uuid()
+        job_store.record_submitted([dict(row, group_id=group_id) for _, row in built])
+        if not settings.FAIR_SCHEDULING_ENABLED:
+            group_result = group([sig for sig, _ in built]).apply_async(task_id=group_id)
+        else:
+            # Members are dispatched one by one as the tenant's turn comes; the group is only their id list
+            group_result = GroupResult(group_id, [AsyncResult(row["job_id"], app=celery_app) for _, row in built], app=celery_app)
+            for (sig, _), (job_type, _) in zip(built, items):
+                self._send(sig, job_type, BATCH, tenant)
+            fair_scheduler.pump()
+        group_result.save()  # so /group/{id} can restore it from the result backend
+        return group_result.id, [child.id for child in group_result.results]
+
+    def cancel(self, job_id: str, reason: str = "user") -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job: a queued one is revoked and never starts; a running one stops at its
+        next cancellation check (between stages, or within JOB_CANCEL_POLL_SECONDS during
+        an LLM call). The job reads REVOKED at once. None for an unknown job id.
+        """
+        status = self._fetch_metas([job_id])[0].get("status") or states.PENDING
+        if status in states.READY_STATES:
+            cancellation.forget(job_id)
+            return {"job_id": job_id, "status": status, "cancelled": False}
+        row = job_store.get(job_id)
+        if status == states.PENDING and row is None:
+            return None
+        cancellation.request(job_id, reason)
+        held = fair_scheduler.discard(job_id)  # still waiting for its tenant's turn: never reached the broker
+        if not held and (not row or row["status"] != states.STARTED):
+            # Running jobs stop on the flag; a revoke would make the worker overwrite the reason
+            celery_app.control.revoke(job_id)
+            fair_scheduler.release(job_id)
+        celery_app.backend.mark_as_revoked(job_id, f"cancelled ({reason})")
+        job_store.record_finished(job_id, states.REVOKED, error=f"cancelled ({reason})")
+        metrics.incr("jobs_cancelled", labels={"reason": reason})
+        return {"job_id": job_id, "status": states.REVOKED, "cancelled": True}
+
+    def get_group(self, group_id: str) -> Optional[Dict[str, Any]]:
+        """Aggregate progress of a group plus the results of its finished jobs."""
+        group_result = GroupResult.restore(group_id, app=celery_app)
+        if group_result is None:
+            return None
+        child_ids = [child.id for child in group_result.results]
+        jobs = [self._result_from_meta(jid, meta) for jid, meta in zip(child_ids, self._fetch_metas(child_ids))]
+        counts = {"SUCCESS": 0, "FAILURE": 0, "REVOKED": 0}
+        for job in jobs:
+            if job["status"] in counts:
+                counts[job["status"]] += 1
+        total = len(jobs)
+        completed = sum(counts.values())
+        return {
+            "group_id": group_id,
+            "total": total,
+            "completed": completed,
+            "succeeded": counts["SUCCESS"],
+            "failed": counts["FAILURE"] + counts["REVOKED"],
+            "pending": total - completed,
+            "progress": (completed / total) if total else 1.0,
+            "jobs": jobs,
+        }
     
     def get_status(self, job_id: str) -> Dict[str, Any]:
-        result = AsyncResult(job_id, app=celery_app)
-        status = result.status
-        value = result.result if result.successful() else None
-        return {"job_id": job_id, "status": status, "info": None}
+        status = self._fetch_metas([job_id])[0].get("status") or states.PENDING
+        return {"job_id": job_id, "status": status, "info": None, **self._artifact_info(job_id, status)}
     
     def get_result(self, job_id: str) -> Dict[str, Any]:
-        result = AsyncResult(job_id, app=celery_app)
-        state = result.status
-        if state == "SUCCESS":
-            return {"job_id": job_id, "status": state, "result": result.result, "error": None}
-        if state == "FAILURE":
-            return {"job_id": job_id, "status": state, "result": None, "error": str(result.result)}
+        return self._result_from_meta(job_id, self._fetch_metas([job_id])[0])
+
+    def get_statuses(self, job_ids: List[str], since: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Resolve many job states with a single MGET against the result backend.
+        With `since` (a cursor from a previous call), finished jobs whose result
+        was stored at or before the cursor are omitted; unfinished ones are
+        always returned since they carry no timestamp.
+        """
+        cursor = datetime.now(timezone.utc).timestamp()
+        if since is not None:
+            # date_done comes from the worker's clock; keep a margin for skew
+            since -= _CURSOR_SKEW_SECONDS
+        records, unchanged = [], 0
+        for job_id, meta in zip(job_ids, self._fetch_metas(job_ids)):
+            status = meta.get("status") or states.PENDING
+            updated_at = date_done_timestamp(meta.get("date_done"))
+            if since is not None and status in states.READY_STATES and updated_at is not None and updated_at <= since:
+                unchanged += 1
+                continue
+            error = str(meta.get("result")) if status == states.FAILURE else None
+            records.append({"job_id": job_id, "status": status, "updated_at": updated_at, "error": error})
+        return {"cursor": cursor, "jobs": records, "unchanged": unchanged}
+
+    def _fetch_metas(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        """Raw result-backend metadata for each id (PENDING placeholder when absent)."""
+        backend = celery_app.backend
+        if not job_ids:
+            return []
+        if not (hasattr(backend, "mget") and hasattr(backend, "get_key_for_task")):
+            # Backends without key/value access: fall back to one lookup per id
+            return [backend.get_task_meta(job_id) for job_id in job_ids]
+
+        keys = [backend.get_key_for_task(job_id) for job_id in job_ids]
+        values = backend.mget(keys)
+        if isinstance(values, dict):  # cache backends return a mapping
+            values = [values.get(k, values.get(k.decode() if isinstance(k, bytes) else k)) for k in keys]
+        metas = []
+        for job_id, value in zip(job_ids, values):
+            if value:
+                metas.append(backend.decode_result(value))
+                continue
+            # Not in Redis: it may have been compacted into the on-disk archive
+            archived = result_archive.get_meta(backend, job_id)
+            metas.append(archived or {"status": states.PENDING, "result": None})
+        return metas
+
+    def _result_from_meta(self, job_id: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+        state = meta.get("status") or states.PENDING
+        if state == states.SUCCESS:
+            return self._success(job_id, meta.get("result"))
+        if state in (states.FAILURE, states.REVOKED):
+            return {"job_id": job_id, "status": state, "result": None, "error": str(meta.get("result"))}
         return {"job_id": job_id, "status": state, "result": None, "error": None}
+
+    def _success(self, job_id: str, stored: Any) -> Dict[str, Any]:
+        """A successful job's result with its blobs fetched; FAILURE (RESULT_EXPIRED) if they expired."""
+        try:
+            result = blob_store.resolve(stored)
+        except BlobNotFound:
+            return {"job_id": job_id, "status": states.FAILURE, "result": None, "error": RESULT_EXPIRED}
+        return {"job_id": job_id, "status": states.SUCCESS, "result": result, "error": None,
+                **self._artifact_info(job_id, states.SUCCESS)}
+
+    def _artifact_info(self, job_id: str, state: str) -> Dict[str, Any]:
+        """Which pre-rendered download formats are ready for a finished job."""
+        if state != "SUCCESS":
+            return {"artifacts": [], "artifacts_ready": False}
+        ready = artifact_store.available(job_id, ArtifactRenderer.FORMATS)
+        return {"artifacts": ready, "artifacts_ready": len(ready) == len(ArtifactRenderer.FORMATS)}
         
     
     def wait_for_result(self, job_id:str, timeout: float | None = None) -> Dict[str, Any]:
@@ -55,6 +245,10 @@ class AsyncJobQueueCelery:
         Block until job finishes or timeout (seconds).
         Returns same shape as get_result().
         """
+        current = self.get_result(job_id)
+        if current["status"] in states.READY_STATES:
+            return current  # finished (or archived): no need to subscribe and wait
+
         ar = AsyncResult(job_id, app=celery_app)
         try:
             val = ar.get(timeout=timeout, propagate=False)
@@ -63,11 +257,24 @@ class AsyncJobQueueCelery:
             return {"job_id": job_id, "status": state, "result": None, "error": str(e) if str(e) else "Timeout"}
         state = ar.status
         if state == "SUCCESS":
-            return {"job_id": job_id, "status": state, "result": val, "error": None}
+            return self._success(job_id, val)
         if state == "FAILURE":
             return {"job_id": job_id, "status": state, "result": None, "error": str(ar.result)}
         return {"job_id": job_id, "status": state, "result": None, "error": None}
 
     
+_CURSOR_SKEW_SECONDS = 30.0
+
+# Error of a finished job whose large result fields (claim-check blobs) are no longer stored
+RESULT_EXPIRED = "Result expired: its stored content is no longer available"
+
+
+def _text_hash(text: Optional[str]) -> Optional[str]:
+    """Input fingerprint for the job store (whitespace-insensitive, like the parse cache)."""
+    if not isinstance(text, str) or not text.strip():
+        return None
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
 # Singleton
 queue = AsyncJobQueueCelery()
@@ -0,0 +1,285 @@
+# backend/app/core/autoscaler.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from backend.app.config import settings
+from backend.app.core.deadlines import CLASS_QUEUES
+from backend.app.core.fair_scheduler import fair_scheduler
+from backend.app.core.metrics import metrics
+from backend.worker.worker import celery_app
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+GROW, SHRINK, HOLD = "grow", "shrink", "hold"
+
+
+@dataclass
+class QueueSignals:
+    queue: str
+    depth: int                       # waiting: in the broker + prefetched by workers (+ fair-scheduling queues)
+    in_flight: int                   # executing
+    concurrency: int                 # pool processes of the workers consuming the queue
+    workers: Dict[str, int]          # worker hostname -> pool processes
+    task_seconds: Optional[float]    # recent average run time of the queue's tasks
+    saturation: Optional[float] = None  # LLM permits in use / limit, hottest backend (llm queues only)
+
+
+@dataclass
+class Decision:
+    queue: str
+    action: str
+    current: int
+    target: int
+    desired: int
+    reason: str
+
+
+@dataclass
+class _QueueState:
+    last_change: float = 0.0
+    low_since: Optional[float] = None
+
+
+class Autoscaler:
+    """Sizes the worker pools of the `llm` and `pdf` queues from the backlog.
+
+    Each tick reads queue depth (broker), in-flight tasks and pool sizes (worker
+    inspection), the recent task run time per queue and the LLM limiter saturation,
+    then resizes the pools with `pool_grow` / `pool_shrink` broadcasts:
+
+    - desired = in-flight + the processes needed to drain the backlog within
+      AUTOSCALE_TARGET_WAIT at the current task run time, clamped to AUTOSCALE_LIMITS
+    - growth is immediate (after AUTOSCALE_COOLDOWN), except on llm queues while the
+      limiter is saturated: more processes would only queue for LLM permits
+    - shrinking needs the desired size to stay lower for AUTOSCALE_SCALE_DOWN_DELAY and
+      goes AUTOSCALE_STEP_DOWN processes at a time, so short lulls don't flap the pool
+
+    Idle pools therefore shrink to their minimum off-peak and grow with the backlog.
+    Workers need the prefork pool and must not be started with `--autoscale`.
+    Queues served by the same workers are sized together as a group ('llm+llm_high+llm_low'),
+    reported under the first name.
+    """
+
+    def __init__(
+        self,
+        app,
+        queues: Tuple[str, ...] = ("llm", "pdf"),
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        target_wait: float = 60.0,
+        scale_down_delay: float = 300.0,
+        cooldown: float = 30.0,
+        step_down: int = 1,
+        saturation_threshold: float = 0.9,
+        inspect_timeout: float = 2.0,
+    ):
+        self.app = app
+        self.queues = tuple(queues)
+        self._groups = {group.split("+")[0]: group.split("+") for group in self.queues}
+        self.limits = limits or {}
+        self.target_wait = target_wait
+        self.scale_down_delay = scale_down_delay
+        self.cooldown = cooldown
+        self.step_down = max(1, step_down)
+        self.saturation_threshold = saturation_threshold
+        self.inspect_timeout = inspect_timeout
+        self._state: Dict[str, _QueueState] = {name: _QueueState() for name in self._groups}
+
+    # ---------- Control loop ----------
+    def tick(self, dry_run: bool = False, now: Optional[float] = None) -> List[Decision]:
+        now = time.time() if now is None else now
+        decisions = []
+        for signals in self.signals():
+            decision = self.decide(signals, now)
+            self._report(signals, decision)
+            if decision.action != HOLD and not dry_run:
+                self.apply(signals, decision)
+            decisions.append(decision)
+        return decisions
+
+    def run(self, interval: float, dry_run: bool = False) -> None:
+        logger.info("Autoscaler watching %s every %ss%s", ",".join(self.queues), interval, " (dry run)" if dry_run else "")
+        while True:
+            started = time.monotonic()
+            try:
+                self.tick(dry_run=dry_run)
+            except Exception as e:
+                logger.warning("autoscaler tick failed: %s", e)
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    # ---------- Policy ----------
+    def decide(self, s: QueueSignals, now: float) -> Decision:
+        state = self._state.setdefault(s.queue, _QueueState())
+        lo, hi = self.limits.get(s.queue, (1, 8))
+        current = s.concurrency
+
+        # Run time unknown (no samples yet): assume one task per process per target_wait
+        per_process = self.target_wait / s.task_seconds if s.task_seconds else 1.0
+        demand = s.in_flight + s.depth / max(per_process, 1e-9)
+        desired = min(hi, max(lo, math.ceil(demand)))
+        reason = f"depth={s.depth} in_flight={s.in_flight} task_s={_fmt(s.task_seconds)}"
+
+        if not s.workers:
+            return Decision(s.queue, HOLD, 0, 0, desired, "no workers consume the queue")
+        if desired > current and s.saturation is not None and s.saturation >= self.saturation_threshold:
+            desired = max(min(current, hi), lo)
+            reason += f" llm_saturation={s.saturation:.2f}"
+        if desired < current:
+            state.low_since = state.low_since if state.low_since is not None else now
+        else:
+            state.low_since = None
+
+        in_cooldown = now - state.last_change < self.cooldown
+        if desired > current and not in_cooldown:
+            action, target = GROW, desired
+        elif desired < current and not in_cooldown and now - state.low_since >= self.scale_down_delay:
+            action, target = SHRINK, max(desired, current - self.step_down)
+        else:
+            action, target = HOLD, current
+            if desired != current:
+                reason += " (cooldown)" if in_cooldown else " (waiting out scale-down delay)"
+        if action != HOLD:
+            state.last_change = now
+            state.low_since = None
+        return Decision(s.queue, action, current, target, desired, reason)
+
+    # ---------- Signals ----------
+    def signals(self) -> List[QueueSignals]:
+        stats = self.app.control.inspect(timeout=self.inspect_timeout).stats() or {}
+        active_queues, busy, prefetched = {}, {}, {}
+        if stats:
+            # Known workers from here on: replies return as soon as all of them answered
+            inspect = self.app.control.inspect(timeout=self.inspect_timeout, destination=list(stats), limit=len(stats))
+            active_queues = inspect.active_queues() or {}
+            busy, prefetched = _per_queue(inspect.active() or {}), _per_queue(inspect.reserved() or {})
+
+        # A worker consuming queues of several groups is sized by the first group listed
+        owner: Dict[str, str] = {}
+        for worker, queues in active_queues.items():
+            names = {q.get("name") for q in queues}
+            managed = [name for name, members in self._groups.items() if names.intersection(members)]
+            if managed:
+                owner[worker] = managed[0]
+
+        saturation = self._llm_saturation()
+        # Jobs held for their tenant's turn are backlog of the (first) LLM group too
+        held = fair_scheduler.pending() if settings.FAIR_SCHEDULING_ENABLED else 0
+        llm_group = next((n for n, m in self._groups.items() if set(m) & set(CLASS_QUEUES.values())), None)
+        result = []
+        for name, members in self._groups.items():
+            workers = {w: _pool_size(stats.get(w)) for w, g in owner.items() if g == name}
+            samples = [v for q in members for v in metrics.samples("task_seconds", {"queue": q})[:50]]
+            result.append(QueueSignals(
+                queue=name,
+                depth=sum(self._depth(q) + prefetched.get(q, 0) for q in members) + (held if name == llm_group else 0),
+                in_flight=sum(busy.get(q, 0) for q in members),
+                concurrency=sum(workers.values()),
+                workers=workers,
+                task_seconds=_mean(samples),
+                saturation=saturation if name.startswith("llm") else None,
+            ))
+        return result
+
+    def _depth(self, queue: str) -> int:
+        try:
+            with self.app.connection_for_read() as conn:
+                return int(conn.default_channel.queue_declare(queue=queue, passive=True).message_count)
+        except Exception:
+            return 0  # the broker drops empty queues: not declared means nothing waiting
+
+    @staticmethod
+    def _llm_saturation() -> Optional[float]:
+        if not settings.LLM_LIMIT_ENABLED:
+            return None
+        limits = metrics.gauges("llm_concurrency_limit")
+        in_use = metrics.gauges("llm_concurrency_in_use")
+        ratios = [
+            in_use.get(labels, 0.0) / limit
+            for labels, limit in limits.items() if limit > 0
+        ]
+        return max(ratios) if ratios else None
+
+    # ---------- Actuation ----------
+    def apply(self, s: QueueSignals, decision: Decision) -> None:
+        """Spread the change over the queue's workers: grow the smallest pools, shrink the largest."""
+        sizes = dict(s.workers)
+        delta = decision.target - decision.current
+        for _ in range(abs(delta)):
+            if delta > 0:
+                worker = min(sizes, key=lambda w: (sizes[w], w))
+                sizes[worker] += 1
+            else:
+                worker = max(sizes, key=lambda w: (sizes[w], w))
+                if sizes[worker] <= 1:
+                    break  # a worker keeps at least one process
+                sizes[worker] -= 1
+        for worker, size in sizes.items():
+            change = size - s.workers[worker]
+            if change > 0:
+                self.app.control.pool_grow(change, destination=[worker])
+            elif change < 0:
+                self.app.control.pool_shrink(-change, destination=[worker])
+
+    def _report(self, s: QueueSignals, decision: Decision) -> None:
+        labels = {"queue": s.queue}
+        metrics.set_gauge("autoscaler_queue_depth", s.depth, labels)
+        metrics.set_gauge("autoscaler_in_flight", s.in_flight, labels)
+        metrics.set_gauge("autoscaler_concurrency", decision.target if decision.action != HOLD else s.concurrency, labels)
+        metrics.set_gauge("autoscaler_desired", decision.desired, labels)
+        if decision.action == HOLD:
+            logger.debug("autoscale %s: hold at %d (%s)", s.queue, decision.current, decision.reason)
+            return
+        metrics.incr("autoscaler_actions", labels={"queue": s.queue, "action": decision.action})
+        logger.info("autoscale %s: %s %d -> %d (%s)", s.queue, decision.action, decision.current,
+                    decision.target, decision.reason)
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """'llm=1:8,pdf=1:4' -> {'llm': (1, 8), 'pdf': (1, 4)}."""
+    limits = {}
+    for item in spec.split(","):
+        name, _, bounds = item.partition("=")
+        lo, _, hi = bounds.partition(":")
+        if name.strip() and lo.strip() and hi.strip():
+            limits[name.strip()] = (max(1, int(lo)), max(1, int(lo), int(hi)))
+    return limits
+
+
+def _per_queue(listing: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for tasks in listing.values():
+        for task in tasks:
+            queue = (task.get("delivery_info") or {}).get("routing_key")
+            counts[queue] = counts.get(queue, 0) + 1
+    return counts
+
+
+def _pool_size(stats: Optional[Dict[str, Any]]) -> int:
+    pool = (stats or {}).get("pool") or {}
+    processes = pool.get("processes")
+    if isinstance(processes, list):
+        return len(processes)
+    return int(pool.get("max-concurrency") or 1)
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:.1f}" if value is not None else "?"
+
+
+# Singleton
+autoscaler = Autoscaler(
+    celery_app,
+    queues=tuple(q.strip() for q in settings.AUTOSCALE_QUEUES.split(",") if q.strip()),
+    limits=parse_limits(settings.AUTOSCALE_LIMITS),
+    target_wait=settings.AUTOSCALE_TARGET_WAIT,
+    scale_down_delay=settings.AUTOSCALE_SCALE_DOWN_DELAY,
+    cooldown=settings.AUTOSCALE_COOLDOWN,
+    step_down=settings.AUTOSCALE_STEP_DOWN,
+    saturation_threshold=settings.AUTOSCALE_LLM_SATURATION,
+)
@@ -0,0 +1,132 @@
+# backend/app/core/blob_store.py
+
+from typing import Any, Dict, Union
+from backend.app.config import settings
+from backend.app.core.redis_client import get_redis
+import hashlib
+import os
+import tempfile
+import time
+import zlib
+
+REF_KEY = "$blob"
+
+
+class BlobNotFound(KeyError):
+    """A claim-check reference points to a blob that expired or was never stored."""
+
+
+class BlobStore:
+    """Content-addressed, zlib-compressed blob store for large job payloads (claim-check).
+
+    Big strings (resume/JD text, Markdown results) are stored once under their
+    sha256 and replaced by a small reference: {"$blob": "<sha256>", "size": n}.
+    Celery messages and results then carry only references, and identical
+    inputs across jobs share one blob. Backends: "redis" (shared by API and
+    workers) or "disk" (needs a shared directory).
+    """
+
+    def __init__(self, backend: str, ttl_seconds: int, inline_max_bytes: int, directory: str, level: int = 6):
+        self.backend = backend.strip().lower()
+        if self.backend not in {"redis", "disk"}:
+            raise ValueError(f"Unsupported blob store backend: {backend}")
+        self.ttl_seconds = ttl_seconds
+        self.inline_max_bytes = inline_max_bytes
+        self.directory = directory
+        self.level = level
+
+    # ---------- Public API ----------
+    def put(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        is_text = isinstance(data, str)
+        raw = data.encode("utf-8") if is_text else data
+        digest = hashlib.sha256(raw).hexdigest()
+        packed = zlib.compress(raw, self.level)
+        if self.backend == "redis":
+            self._redis_put(digest, packed)
+        else:
+            self._disk_put(digest, packed)
+        return {REF_KEY: digest, "size": len(raw), "text": is_text}
+
+    def get(self, ref: Dict[str, Any]) -> Union[str, bytes]:
+        digest = ref[REF_KEY]
+        packed = self._redis_get(digest) if self.backend == "redis" else self._disk_get(digest)
+        if packed is None:
+            raise BlobNotFound(digest)
+        raw = zlib.decompress(packed)
+        return raw.decode("utf-8") if ref.get("text", True) else raw
+
+    @staticmethod
+    def is_ref(value: Any) -> bool:
+        return isinstance(value, dict) and REF_KEY in value
+
+    def offload(self, value: Any) -> Any:
+        """Replace strings larger than `inline_max_bytes` (recursively) with blob references."""
+        if isinstance(value, str):
+            if len(value) > self.inline_max_bytes and len(value.encode("utf-8")) > self.inline_max_bytes:
+                return self.put(value)
+            return value
+        if isinstance(value, dict) and not self.is_ref(value):
+            return {k: self.offload(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.offload(v) for v in value]
+        return value
+
+    def resolve(self, value: Any) -> Any:
+        """Inverse of offload(): replace blob references (recursively) with their content."""
+        if self.is_ref(value):
+            return self.get(value)
+        if isinstance(value, dict):
+            return {k: self.resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(v) for v in value]
+        return value
+
+    # ---------- Redis ----------
+    @staticmethod
+    def _key(digest: str) -> str:
+        return f"jdm:blob:{digest}"
+
+    def _redis_put(self, digest: str, packed: bytes) -> None:
+        r = get_redis()
+        ttl = self.ttl_seconds or None
+        # NX: an identical blob is already there; just extend its lifetime
+        if not r.set(self._key(digest), packed, ex=ttl, nx=True) and ttl:
+            r.expire(self._key(digest), ttl)
+
+    def _redis_get(self, digest: str):
+        return get_redis().get(self._key(digest))
+
+    # ---------- Disk ----------
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + ".z")
+
+    def _disk_put(self, digest: str, packed: bytes) -> None:
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path, None)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(packed)
+        os.replace(tmp_path, path)
+
+    def _disk_get(self, digest: str):
+        path = self._path(digest)
+        try:
+            if self.ttl_seconds and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+# Singleton
+blob_store = BlobStore(
+    backend=settings.BLOB_STORE_BACKEND,
+    ttl_seconds=settings.BLOB_TTL_SECONDS,
+    inline_max_bytes=settings.BLOB_INLINE_MAX_BYTES,
+    directory=settings.BLOB_STORE_DIR,
+)
@@ -0,0 +1,64 @@
+# backend/app/core/cancellable_llm.py
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from crewai.llms.base_llm import BaseLLM
+from backend.app.config import settings
+from backend.app.core.cancellation import CancellationRegistry, JobCancelled
+from backend.app.core.metrics import metrics
+
+# Runs calls made for a job so the caller can keep checking its cancel flag;
+# abandoned calls keep a thread until their request returns
+_executor = ThreadPoolExecutor(max_workers=settings.LLM_CALL_THREADS, thread_name_prefix="llm-call")
+
+
+class CancellableLLM(BaseLLM):
+    """Stops a cancelled job's LLM work: the job's flag is checked before each call and every
+    `poll_seconds` while it runs. A call cancelled mid-flight is abandoned (its answer is
+    dropped when it arrives) and JobCancelled is raised, so the worker is free at once.
+    It wraps the per-host client, inside the limiter permit and the pool lease. The host
+    keeps generating the abandoned answer, so the JobCancelled carries its future and the
+    permit and lease are only freed when that request ends: the limiter and the router
+    keep seeing the host as busy until it is. The losing attempt of a hedged call is
+    stopped the same way (see HedgedLLM). Calls made outside a job (warmups, library JD
+    parses) run inline.
+    """
+
+    def __init__(self, inner: BaseLLM, registry: CancellationRegistry, poll_seconds: float = 0.5):
+        super().__init__(model=inner.model, temperature=inner.temperature)
+        self.inner = inner
+        self.registry = registry
+        self.poll_seconds = poll_seconds
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        kwargs = dict(
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
+        self.inner.stop = self.stop
+        if not self.registry.active():
+            return self.inner.call(messages, **kwargs)
+        self.registry.check()
+
+        fut = _executor.submit(self.inner.call, messages, **kwargs)
+        while True:
+            done, _ = wait([fut], timeout=self.poll_seconds)
+            if done:
+                return fut.result()
+            reason = self.registry.current_reason()
+            if reason:
+                metrics.incr("llm_calls_abandoned", labels={"reason": reason})
+                # cancel() only succeeds if the request hasn't started; otherwise it runs on
+                raise JobCancelled(f"Job {self.registry.current()} cancelled ({reason})",
+                                   abandoned=None if fut.cancel() else fut)
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
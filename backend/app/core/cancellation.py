@@ -0,0 +1,166 @@
+# backend/app/core/cancellation.py
+
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, List, Optional
+from backend.app.config import settings
+from backend.app.core.redis_client import get_redis
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Job whose work the current thread is doing (set by the worker task, carried into helper threads)
+_current_job: ContextVar[Optional[str]] = ContextVar("jdm_current_job", default=None)
+# Set to stop just this piece of work (e.g. the losing attempt of a hedged call), not the whole job
+_current_stop: ContextVar[Optional[threading.Event]] = ContextVar("jdm_current_stop", default=None)
+
+
+class JobCancelled(Exception):
+    """`abandoned`: an LLM call the job left running (see CancellableLLM), if any."""
+
+    def __init__(self, message: str = "", abandoned: Optional[Future] = None):
+        super().__init__(message)
+        self.abandoned = abandoned
+
+
+def release_when_done(error: BaseException, release: Callable[[Future], None]) -> bool:
+    """If `error` abandoned a call that is still running, call `release(future)` once that call
+    ends and return True; the caller then leaves its permit/lease for that callback to free."""
+    abandoned = getattr(error, "abandoned", None)
+    if abandoned is None:
+        return False
+    abandoned.add_done_callback(release)
+    return True
+
+
+class CancellationRegistry:
+    """Cancel requests and client liveness for jobs, shared through Redis.
+
+    - request()/reason()   : a cancel flag per job, set by the API (user cancel) or the reaper
+                             (abandoned job); the worker checks it between stages and while
+                             LLM calls run, and stops with JobCancelled
+    - scope()/check()      : the job a thread works for, so deep code (the LLM wrapper) can
+                             check its flag without the job id being passed down; a scope
+                             can also carry a stop event that cancels only the work under it
+    - watch()/touch()      : last time a client asked about an interactive job; jobs nobody
+                             asked about for `abandon_seconds` are listed by abandoned()
+    """
+
+    def __init__(self, ttl_seconds: int, abandon_seconds: int, prefix: str = "jdm:cancel"):
+        self.ttl_seconds = ttl_seconds
+        self.abandon_seconds = abandon_seconds
+        self.prefix = prefix
+
+    # ---------- Flags ----------
+    def request(self, job_id: str, reason: str = "user") -> None:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.set(self._flag(job_id), reason, ex=self.ttl_seconds)
+        pipe.zrem(self._watch, job_id)
+        pipe.execute()
+
+    def reason(self, job_id: Optional[str]) -> Optional[str]:
+        if not job_id:
+            return None
+        try:
+            raw = get_redis().get(self._flag(job_id))
+        except Exception as e:
+            logger.debug("cancel flag read failed: %s", e)
+            return None  # without Redis nobody could have cancelled: keep running
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+    # ---------- Current job ----------
+    @contextmanager
+    def scope(self, job_id: Optional[str], stop: Optional[threading.Event] = None) -> Iterator[None]:
+        token, stop_token = _current_job.set(job_id), _current_stop.set(stop)
+        try:
+            yield
+        finally:
+            _current_stop.reset(stop_token)
+            _current_job.reset(token)
+
+    @staticmethod
+    def current() -> Optional[str]:
+        return _current_job.get()
+
+    @staticmethod
+    def active() -> bool:
+        """Whether the current work can be cancelled at all (it runs for a job, or has a stop event)."""
+        return _current_job.get() is not None or _current_stop.get() is not None
+
+    def current_reason(self) -> Optional[str]:
+        """Why the current work should stop, or None."""
+        stop = _current_stop.get()
+        if stop is not None and stop.is_set():
+            return "superseded"
+        return self.reason(_current_job.get())
+
+    def check(self) -> None:
+        """Raise JobCancelled if the current job (or just the current work) has been cancelled."""
+        reason = self.current_reason()
+        if reason:
+            raise JobCancelled(f"Job {_current_job.get()} cancelled ({reason})")
+
+    def propagate(self, fn: Callable, stop: Optional[threading.Event] = None) -> Callable:
+        """Wrap `fn` to run under the caller's job scope, e.g. in a thread pool; `stop` (else
+        the caller's stop event) lets that run be cancelled on its own."""
+        job_id, stop = _current_job.get(), stop or _current_stop.get()
+
+        def run(*args, **kwargs):
+            with self.scope(job_id, stop):
+                return fn(*args, **kwargs)
+
+        return run
+
+    # ---------- Abandonment ----------
+    def watch(self, job_id: str) -> None:
+        """Start tracking an interactive job; submission counts as the first poll."""
+        if not self.abandon_seconds:
+            return
+        try:
+            get_redis().zadd(self._watch, {job_id: time.time()})
+        except Exception as e:
+            logger.debug("job watch failed: %s", e)
+
+    def touch(self, job_ids: Iterable[str], ahead: float = 0.0) -> None:
+        """A client polled these jobs (only jobs already watched are updated); `ahead`
+        extends the poll over a long-poll that keeps the client connected that long."""
+        seen = time.time() + ahead
+        mapping = {job_id: seen for job_id in job_ids}
+        if not mapping or not self.abandon_seconds:
+            return
+        try:
+            get_redis().zadd(self._watch, mapping, xx=True)
+        except Exception as e:
+            logger.debug("job touch failed: %s", e)
+
+    def abandoned(self, now: Optional[float] = None, limit: int = 500) -> List[str]:
+        """Watched jobs with no poll for `abandon_seconds`."""
+        if not self.abandon_seconds:
+            return []
+        cutoff = (now or time.time()) - self.abandon_seconds
+        raw = get_redis().zrangebyscore(self._watch, "-inf", cutoff, start=0, num=limit)
+        return [v.decode() if isinstance(v, bytes) else v for v in raw]
+
+    def forget(self, job_id: str) -> None:
+        """Stop tracking a job (finished or cancelled)."""
+        try:
+            get_redis().zrem(self._watch, job_id)
+        except Exception as e:
+            logger.debug("job forget failed: %s", e)
+
+    @property
+    def _watch(self) -> str:
+        return f"{self.prefix}:watched"
+
+    def _flag(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}"
+
+
+# Singleton
+cancellation = CancellationRegistry(
+    ttl_seconds=settings.RESULT_TTL_DEFAULT,  # a queued job may wait long before a worker sees the flag
+    abandon_seconds=settings.JOB_ABANDON_SECONDS,
+)
@@ -0,0 +1,101 @@
+# backend/app/core/deadlines.py
+
+from typing import Optional, Tuple
+from backend.app.config import settings, JOB_STAGES
+from backend.app.core.metrics import metrics, percentile
+import time
+
+# Priority class -> LLM queue. Workers should consume all three, in this order.
+CLASS_QUEUES = {"high": "llm_high", "normal": "llm", "low": "llm_low"}
+
+# Priority class -> band of Redis message priorities (0 is served first). The bands don't
+# overlap, so a worker on several queues takes the higher class first, then the earliest deadline.
+_CLASS_BANDS = {"high": (0, 2), "normal": (3, 6), "low": (7, 9)}
+
+# Seconds of slack (deadline - now at submit) for each priority step within a band
+_SLACK_STEPS = (60, 300, 1800)
+
+FULL, SMALL, FAST, DROP = "full", "small", "fast", "drop"
+
+
+def resolve_deadline(deadline: Optional[float], slo_seconds: Optional[float], now: Optional[float] = None) -> Optional[float]:
+    """Absolute deadline (unix seconds) from an explicit deadline and/or an SLO; the earlier wins."""
+    now = time.time() if now is None else now
+    candidates = [d for d in (deadline, now + slo_seconds if slo_seconds else None) if d]
+    return min(candidates) if candidates else None
+
+
+def message_priority(priority_class: str, deadline: Optional[float], now: Optional[float] = None) -> int:
+    """Broker priority for a job: its class band, earliest deadline first within it.
+    Jobs without a deadline go last in their class."""
+    lo, hi = _CLASS_BANDS.get(priority_class, _CLASS_BANDS["normal"])
+    if deadline is None:
+        return hi
+    slack = deadline - (time.time() if now is None else now)
+    step = next((i for i, limit in enumerate(_SLACK_STEPS) if slack <= limit), len(_SLACK_STEPS))
+    return min(hi, lo + step)
+
+
+class DeadlinePlanner:
+    """Decides, when a worker picks up a job with a deadline, how to run it.
+
+    The run time estimate is a percentile of the job type's recent run times. If the full
+    pipeline no longer fits in the time left, the job is downgraded before any LLM time is
+    spent: to the fallback model (LLM_FALLBACK_MODEL_NAME) for the final stage if that is
+    expected to fit, else for match jobs to the fast taxonomy scorer; otherwise, or once the
+    deadline has passed, it is dropped. With action 'drop' it is never downgraded. Without
+    enough samples, only expired jobs are dropped.
+    """
+
+    def __init__(self, percentile: float = 0.75, min_samples: int = 5, action: str = "downgrade"):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.action = action
+
+    def estimate(self, job_type: str, engine: str = FULL) -> Optional[float]:
+        samples = metrics.samples("job_seconds", {"job_type": job_type, "engine": engine})
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, self.percentile)
+
+    def plan(self, job_type: str, deadline: float, action: Optional[str] = None, now: Optional[float] = None) -> Tuple[str, str]:
+        """(engine, reason) with engine one of full | small | fast | drop."""
+        left = deadline - (time.time() if now is None else now)
+        if left <= 0:
+            return DROP, f"deadline passed {-left:.0f}s ago"
+        full = self.estimate(job_type, FULL)
+        if full is None or full <= left:
+            return FULL, f"{left:.0f}s left"
+        reason = f"{left:.0f}s left, full run takes ~{full:.0f}s"
+        if (action or self.action) == "drop":
+            return DROP, reason
+        if _has_fallback(job_type):
+            small = self.estimate(job_type, SMALL)
+            if small is None or small <= left:
+                return SMALL, reason
+        if job_type == "match":
+            return FAST, reason
+        return DROP, reason
+
+    def record(self, job_type: str, engine: str, seconds: float, deadline: Optional[float]) -> None:
+        """Run time sample (LLM engines) and, for jobs with a deadline, whether it was met."""
+        if engine in (FULL, SMALL):
+            metrics.observe("job_seconds", seconds, {"job_type": job_type, "engine": engine})
+        if deadline is not None:
+            outcome = "dropped" if engine == DROP else "met" if time.time() <= deadline else "missed"
+            metrics.incr("deadline_outcomes", labels={"job_type": job_type, "engine": engine, "outcome": outcome})
+
+
+def _has_fallback(job_type: str) -> bool:
+    if not settings.LLM_FALLBACK_MODEL_NAME.strip():
+        return False
+    final = JOB_STAGES.get(job_type, ("",))[-1]
+    return settings.llm_config("fallback") != settings.llm_config(final)
+
+
+# Singleton
+deadline_planner = DeadlinePlanner(
+    percentile=settings.DEADLINE_ESTIMATE_PERCENTILE,
+    min_samples=settings.DEADLINE_MIN_SAMPLES,
+    action=settings.DEADLINE_ACTION,
+)
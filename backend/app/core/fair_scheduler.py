@@ -0,0 +1,313 @@
+# backend/app/core/fair_scheduler.py
+
+from typing import Any, Dict, List, Optional
+from backend.app.config import settings
+from backend.app.core.cancellation import cancellation
+from backend.app.core.deadlines import deadline_planner
+from backend.app.core.metrics import metrics
+from backend.app.core.redis_client import get_redis
+from backend.worker.worker import celery_app
+import hashlib
+import json
+import logging
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Served in this order: batch jobs only get slots no interactive job can use
+INTERACTIVE, BATCH = "interactive", "batch"
+CLASSES = (INTERACTIVE, BATCH)
+
+ANONYMOUS = "anonymous"
+_TENANT_RE = re.compile(r"^[A-Za-z0-9_.@-]{1,64}$")
+
+# KEYS: flow zset, jobs hash, active set, ring list. ARGV: job_id, score, envelope, tenant
+_ENQUEUE = """
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+if redis.call('SADD', KEYS[3], ARGV[4]) == 1 then
+  redis.call('RPUSH', KEYS[4], ARGV[4])
+end
+return 1
+"""
+
+# KEYS: flow zset, active set, ring list, deficits hash. ARGV: tenant
+# Atomic with _ENQUEUE, so a job added meanwhile never leaves its tenant out of the ring
+_RETIRE = """
+if redis.call('ZCARD', KEYS[1]) > 0 then
+  return 0
+end
+redis.call('SREM', KEYS[2], ARGV[1])
+redis.call('LREM', KEYS[3], 0, ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+return 1
+"""
+
+# KEYS: lock. ARGV: token. Deletes the lock only if this pump still holds it (it may have expired)
+_UNLOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Flow zset score: message priority (0 first) in this unit, then submission time
+_PRIORITY_UNIT = 1e10
+
+
+class FairScheduler:
+    """Per-tenant sub-queues in Redis in front of the LLM queues, dispatched by deficit round robin.
+
+    Jobs wait in a queue per (class, tenant) instead of the broker, ordered by their
+    deadline priority. Only `window` of them are sent to the broker and not yet finished
+    at any time, so the broker never holds a backlog one tenant could monopolise:
+
+    - interactive jobs (/submit-job) take free slots before batch jobs (/submit-jobs)
+    - within a class, the most urgent priority band (priority class, then deadline; see
+      message_priority) is served first across all tenants: a tenant's urgent job is not
+      held behind another tenant's relaxed ones
+    - within a band, tenants take turns (DRR): each turn adds `quantum` x weight of
+      credit, and a job costs its type's estimated run time, so a tenant of slow jobs
+      gets as much worker time as one of fast jobs, not as many jobs
+    - a tenant holds at most `max_inflight` slots (FAIR_TENANT_LIMITS overrides)
+
+    pump() does the dispatching, under a Redis lock. It runs after each submit, after
+    each job finishes (worker signal) and on a beat schedule as a safety net.
+    """
+
+    def __init__(self, window: int, max_inflight: int, quantum: float, inflight_ttl: int,
+                 limits: Optional[Dict[str, float]] = None, weights: Optional[Dict[str, float]] = None,
+                 prefix: str = "jdm:fair"):
+        self.window = max(1, window)
+        self.max_inflight = max(1, max_inflight)
+        self.quantum = quantum
+        self.inflight_ttl = inflight_ttl
+        self.limits = limits or {}
+        self.weights = {t: w for t, w in (weights or {}).items() if w > 0}
+        self.prefix = prefix
+
+    # ---------- Submit ----------
+    def enqueue(self, sig, job_class: str, tenant: str, job_type: str, priority: int = 0) -> None:
+        """Hold a routed signature (with its options: queue, priority, task id, links) for dispatch."""
+        job_id = sig.id
+        now = time.time()
+        envelope = json.dumps({
+            "sig": dict(sig),
+            "tenant": tenant,
+            "class": job_class,
+            "submitted_at": now,
+            "priority": priority,
+            "cost": self._cost(job_type),
+        })
+        # Deadline priority first, then submission order
+        get_redis().eval(_ENQUEUE, 4, self._flow(job_class, tenant), self._key("jobs"),
+                         self._key(f"active:{job_class}"), self._key(f"ring:{job_class}"),
+                         job_id, priority * _PRIORITY_UNIT + now, envelope, tenant)
+
+    def discard(self, job_id: str) -> bool:
+        """Remove a job still waiting here (cancelled); False if it was already dispatched."""
+        r = get_redis()
+        raw = r.hget(self._key("jobs"), job_id)
+        if raw is None:
+            return False
+        envelope = json.loads(raw)
+        removed = r.zrem(self._flow(envelope["class"], envelope["tenant"]), job_id)
+        r.hdel(self._key("jobs"), job_id)
+        return bool(removed)
+
+    def release(self, job_id: str) -> None:
+        """A dispatched job finished (or was cancelled): free its slot and dispatch more."""
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.zrem(self._key("inflight"), job_id)
+        pipe.hdel(self._key("inflight_tenant"), job_id)
+        removed, _ = pipe.execute()
+        if removed:
+            self.pump()
+
+    def pending(self) -> int:
+        """Jobs waiting here, all tenants and classes (the autoscaler counts them as backlog)."""
+        return int(get_redis().hlen(self._key("jobs")))
+
+    # ---------- Dispatch ----------
+    def pump(self) -> int:
+        """Send jobs to the broker while the window has room; returns how many were sent.
+        A call that finds the lock taken leaves a flag so the holder runs another round."""
+        r = get_redis()
+        lock, dirty = self._key("lock"), self._key("dirty")
+        token = uuid.uuid4().hex
+        sent = 0
+        r.set(dirty, 1)
+        while r.get(dirty) and r.set(lock, token, nx=True, ex=30):
+            try:
+                r.delete(dirty)
+                sent += self._dispatch(r)
+            finally:
+                r.eval(_UNLOCK, 1, lock, token)
+        return sent
+
+    def _dispatch(self, r) -> int:
+        now = time.time()
+        inflight = self._inflight(r, now)
+        room = self.effective_window() - sum(inflight.values())
+        sent = 0
+        for job_class in CLASSES:
+            ring, deficits = self._key(f"ring:{job_class}"), self._key(f"deficit:{job_class}")
+            skipped = 0  # consecutive tenants passed over (at their cap, or outside the band)
+            band = None  # priority being served; found again after every send
+            while room > 0:
+                size = r.llen(ring)
+                if not size or skipped >= size:
+                    break
+                if band is None:
+                    band = self._band(r, job_class, inflight)
+                    if band is None:
+                        break  # every tenant with jobs is at its cap
+                tenant = _s(r.lindex(ring, 0))
+                flow = self._flow(job_class, tenant)
+                head = r.zrange(flow, 0, 0, withscores=True)
+                if not head:
+                    r.eval(_RETIRE, 4, flow, self._key(f"active:{job_class}"), ring, deficits, tenant)
+                    metrics.set_gauge("fair_queue_depth", 0, {"class": job_class, "tenant": tenant})
+                    continue
+                if inflight.get(tenant, 0) >= self._limit(tenant) or _band_of(head[0][1]) > band:
+                    # Passed over without credit: it gets its turns when its band is served
+                    r.lmove(ring, ring, "LEFT", "RIGHT")
+                    skipped += 1
+                    continue
+                skipped = 0
+                job_id = _s(head[0][0])
+                raw = r.hget(self._key("jobs"), job_id)
+                envelope = json.loads(raw) if raw else None
+                credit = self.quantum * self.weights.get(tenant, 1.0)
+                deficit = float(r.hget(deficits, tenant) or credit)  # a new turn starts with one quantum
+                if envelope and deficit < envelope["cost"]:
+                    # End of this tenant's turn: credit for the next one
+                    r.hset(deficits, tenant, deficit + credit)
+                    r.lmove(ring, ring, "LEFT", "RIGHT")
+                    continue
+                band = None
+                if not r.zrem(flow, job_id):
+                    continue  # discarded meanwhile
+                r.hdel(self._key("jobs"), job_id)
+                if envelope is None:
+                    continue
+                r.hset(deficits, tenant, deficit - envelope["cost"])
+                if self._send(r, job_id, envelope, now):
+                    inflight[tenant] = inflight.get(tenant, 0) + 1
+                    room -= 1
+                    sent += 1
+            for tenant in r.lrange(ring, 0, -1):
+                tenant = _s(tenant)
+                metrics.set_gauge("fair_queue_depth", r.zcard(self._flow(job_class, tenant)),
+                                  {"class": job_class, "tenant": tenant})
+        return sent
+
+    def _band(self, r, job_class: str, inflight: Dict[str, int]) -> Optional[int]:
+        """Most urgent priority at the head of a flow of a tenant below its cap; None if there is none."""
+        tenants = [_s(t) for t in r.lrange(self._key(f"ring:{job_class}"), 0, -1)]
+        tenants = [t for t in tenants if inflight.get(t, 0) < self._limit(t)]
+        pipe = r.pipeline(transaction=False)
+        for tenant in tenants:
+            pipe.zrange(self._flow(job_class, tenant), 0, 0, withscores=True)
+        bands = [_band_of(head[0][1]) for head in pipe.execute() if head]
+        return min(bands) if bands else None
+
+    def _send(self, r, job_id: str, envelope: Dict[str, Any], now: float) -> bool:
+        if cancellation.reason(job_id):
+            return False  # cancelled while waiting (the API already stored REVOKED)
+        tenant, job_class = envelope["tenant"], envelope["class"]
+        pipe = r.pipeline(transaction=False)
+        pipe.zadd(self._key("inflight"), {job_id: now})
+        pipe.hset(self._key("inflight_tenant"), job_id, tenant)
+        pipe.execute()
+        try:
+            celery_app.signature(envelope["sig"]).apply_async()
+        except Exception as e:
+            logger.warning("fair dispatch of %s failed, re-queued: %s", job_id, e)
+            r.zrem(self._key("inflight"), job_id)
+            r.hdel(self._key("inflight_tenant"), job_id)
+            # Back at its place: same band, same submission time
+            score = envelope.get("priority", 0) * _PRIORITY_UNIT + envelope["submitted_at"]
+            r.eval(_ENQUEUE, 4, self._flow(job_class, tenant), self._key("jobs"),
+                   self._key(f"active:{job_class}"), self._key(f"ring:{job_class}"),
+                   job_id, score, json.dumps(envelope), tenant)
+            return False
+        metrics.observe("fair_wait_seconds", now - envelope["submitted_at"], {"class": job_class, "tenant": tenant})
+        return True
+
+    def _inflight(self, r, now: float) -> Dict[str, int]:
+        """Slots in use per tenant, after freeing those of jobs lost without a release."""
+        stale = r.zrangebyscore(self._key("inflight"), "-inf", now - self.inflight_ttl)
+        if stale:
+            logger.warning("Freeing %d fair-scheduling slots never released", len(stale))
+            r.zrem(self._key("inflight"), *stale)
+            r.hdel(self._key("inflight_tenant"), *stale)
+        counts: Dict[str, int] = {}
+        for tenant in r.hvals(self._key("inflight_tenant")):
+            counts[_s(tenant)] = counts.get(_s(tenant), 0) + 1
+        return counts
+
+    def effective_window(self) -> int:
+        """FAIR_DISPATCH_WINDOW, or more while the autoscaler has grown the LLM pool past it."""
+        pool = metrics.gauges("autoscaler_concurrency").get("autoscaler_concurrency{queue=llm}")
+        return max(self.window, int(pool or 0) + 1)
+
+    # ---------- Helpers ----------
+    def _limit(self, tenant: str) -> float:
+        return self.limits.get(tenant, self.max_inflight)
+
+    @staticmethod
+    def _cost(job_type: str) -> float:
+        """Estimated seconds of worker time (the DRR cost); one quantum until there are samples."""
+        return deadline_planner.estimate(job_type) or settings.FAIR_QUANTUM_SECONDS
+
+    def _flow(self, job_class: str, tenant: str) -> str:
+        return self._key(f"q:{job_class}:{tenant}")
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+
+def tenant_id(tenant: Optional[str] = None, api_key: Optional[str] = None) -> str:
+    """Tenant of a request: the X-Tenant-Id header (set by the auth proxy), else a digest of
+    the API key (the key itself is never stored), else one shared anonymous tenant."""
+    if tenant:
+        return tenant if _TENANT_RE.match(tenant) else "tenant-" + _digest(tenant)
+    if api_key:
+        return "key-" + _digest(api_key)
+    return ANONYMOUS
+
+
+def parse_tenant_values(spec: str) -> Dict[str, float]:
+    """'acme=8,key-1f2e=2' -> {'acme': 8.0, 'key-1f2e': 2.0}."""
+    values = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            values[name.strip()] = max(0.0, float(value))
+    return values
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+
+
+def _band_of(score: float) -> int:
+    return int(score // _PRIORITY_UNIT)
+
+
+def _s(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+# Singleton
+fair_scheduler = FairScheduler(
+    window=settings.FAIR_DISPATCH_WINDOW,
+    max_inflight=settings.FAIR_TENANT_MAX_INFLIGHT,
+    quantum=settings.FAIR_QUANTUM_SECONDS,
+    inflight_ttl=settings.FAIR_INFLIGHT_TTL,
+    limits=parse_tenant_values(settings.FAIR_TENANT_LIMITS),
+    weights=parse_tenant_values(settings.FAIR_TENANT_WEIGHTS),
+)
@@ -0,0 +1,53 @@
+# backend/app/core/fast_scorer.py
+
+from typing import Any, Dict
+from backend.app.core.sections import split_sections
+from backend.app.core.skills import SkillMatcher, skill_matcher
+
+# JD sections whose skills count double
+_REQUIRED_HINTS = ("require", "must", "qualification", "essential", "minimum")
+
+
+class FastScorer:
+    """Non-LLM match report from taxonomy skills, in the same shape as the matcher agent's.
+
+    Each skill the JD mentions has weight 2 when it appears under a requirements-like
+    heading or more than once, else 1; match_score is the matched share of that weight.
+    Runs in milliseconds, so it can answer synchronously (/fast-match) and is handed to
+    the LLM matcher as a hint.
+    """
+
+    def __init__(self, matcher: SkillMatcher):
+        self.matcher = matcher
+
+    def score(self, resume: str, jd: str) -> Dict[str, Any]:
+        resume_ids = {hit.id for hit in self.matcher.extract(resume)}
+        required = set()
+        for section in split_sections(jd):
+            if any(hint in section.title.lower() for hint in _REQUIRED_HINTS):
+                required |= {hit.id for hit in self.matcher.extract(section.body)}
+
+        jd_hits = self.matcher.extract(jd)
+        weights = {hit.id: 2 if hit.id in required or hit.count > 1 else 1 for hit in jd_hits}
+        matched = [hit.name for hit in jd_hits if hit.id in resume_ids]
+        # Heaviest gaps first; otherwise in the JD's order
+        missing = [hit.name for hit in sorted(jd_hits, key=lambda h: -weights[h.id]) if hit.id not in resume_ids]
+
+        total = sum(weights.values())
+        got = sum(w for sid, w in weights.items() if sid in resume_ids)
+        summary = (
+            f"{len(matched)} of {len(jd_hits)} skills named in the job description appear in the resume."
+            if jd_hits else "No known skills found in the job description; score not meaningful."
+        )
+        return {
+            "match_score": round(100 * got / total) if total else 0,
+            "strengths": matched,
+            "gaps": missing,
+            "summary": summary,
+            "skill_overlap": {"matched": matched, "missing": missing},
+            "engine": "fast",
+        }
+
+
+# Singleton
+fast_scorer = FastScorer(skill_matcher)
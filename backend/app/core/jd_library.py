@@ -0,0 +1,118 @@
+# backend/app/core/jd_library.py
+
+from typing import Any, Dict, List, Optional, Tuple
+from backend.app.core.redis_client import get_redis
+from backend.app.core.skills import skill_matcher
+import hashlib
+import json
+import time
+import uuid
+
+PENDING, PARSED, FAILED = "pending", "parsed", "failed"
+
+
+class JDLibrary:
+    """Registered job descriptions, versioned, with their structured parse.
+
+    One Redis hash per JD: 'meta' plus one field per version ('v1', 'v2', ...), and a
+    sorted set of JD ids by last update for listing. Versions are immutable apart from
+    their parse, which a worker fills in after registration; jobs pin a version, so an
+    edit never changes the JD under a running or finished job. Entries don't expire.
+    """
+
+    def __init__(self, prefix: str = "jdm:jdlib"):
+        self.prefix = prefix
+
+    def register(self, text: str, title: Optional[str] = None, jd_id: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """Store `text` as a new JD, or as a new version of `jd_id`.
+        Returns (version record, created); re-registering the latest text creates nothing.
+
+        Runs as a WATCH/MULTI transaction on the JD's hash, retried if another write lands
+        between the check and the write: concurrent registrations of the same text create
+        one version, and 'latest' never points at a version not yet stored."""
+        r = get_redis()
+        jd_id = jd_id or uuid.uuid4().hex[:12]
+        key = self._key(jd_id)
+        digest = hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+        skills = skill_matcher.names(text)
+
+        def attempt(pipe) -> Tuple[Dict[str, Any], bool]:
+            # Immediate reads while watching; pipe.multi() starts the queued writes
+            raw_meta, raw_latest = pipe.hmget(key, "meta", "latest")
+            meta = json.loads(raw_meta) if raw_meta else None
+            version = int(raw_latest or 0)
+            if meta and version:
+                raw = pipe.hget(key, f"v{version}")
+                latest = json.loads(raw) if raw else None
+                if latest and latest["digest"] == digest and (title is None or title == latest["title"]):
+                    return latest, False
+            now = time.time()
+            record = {
+                "jd_id": jd_id,
+                "version": version + 1,
+                "title": title if title is not None else (meta or {}).get("title") or _default_title(text),
+                "text": text,
+                "digest": digest,
+                "created_at": now,
+                "parse_status": PENDING,
+                "parsed": None,
+                "skills": skills,
+                "error": None,
+            }
+            meta = dict(meta or {"jd_id": jd_id, "created_at": now}, title=record["title"], updated_at=now)
+            pipe.multi()
+            pipe.hset(key, mapping={f"v{version + 1}": json.dumps(record), "meta": json.dumps(meta),
+                                    "latest": version + 1})
+            pipe.zadd(f"{self.prefix}:index", {jd_id: now})
+            return record, True
+
+        return r.transaction(attempt, key, value_from_callable=True)
+
+    def get(self, jd_id: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        r = get_redis()
+        if version is None:
+            latest = r.hget(self._key(jd_id), "latest")
+            if latest is None:
+                return None
+            version = int(latest)
+        raw = r.hget(self._key(jd_id), f"v{version}")
+        return json.loads(raw) if raw else None
+
+    def versions(self, jd_id: str) -> List[Dict[str, Any]]:
+        fields = get_redis().hgetall(self._key(jd_id))
+        records = [json.loads(v) for k, v in fields.items() if _s(k).startswith("v")]
+        return [_summary(rec) for rec in sorted(records, key=lambda rec: rec["version"])]
+
+    def list(self, limit: int = 50, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Latest version of each JD, most recently updated first, plus the total count."""
+        r = get_redis()
+        ids = [_s(i) for i in r.zrevrange(f"{self.prefix}:index", offset, offset + limit - 1)]
+        items = [self.get(jd_id) for jd_id in ids]
+        return [_summary(rec) for rec in items if rec], int(r.zcard(f"{self.prefix}:index"))
+
+    def set_parse(self, jd_id: str, version: int, parsed: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        record = self.get(jd_id, version)
+        if record is None:
+            return
+        record.update(parsed=parsed, parse_status=FAILED if error else PARSED, error=error)
+        get_redis().hset(self._key(jd_id), f"v{version}", json.dumps(record))
+
+    def _key(self, jd_id: str) -> str:
+        return f"{self.prefix}:{jd_id}"
+
+
+def _summary(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in record.items() if k not in ("text", "parsed")}
+
+
+def _default_title(text: str) -> str:
+    first = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    return first[:80]
+
+
+def _s(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+# Singleton
+jd_library = JDLibrary()
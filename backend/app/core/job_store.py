@@ -0,0 +1,236 @@
+# backend/app/core/job_store.py
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from backend.app.config import settings
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import psycopg
+except ImportError:  # optional, only for postgresql:// URLs
+    psycopg = None
+
+logger = logging.getLogger(__name__)
+
+# Portable DDL: runs unchanged on SQLite and PostgreSQL
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jobs (
+        job_id VARCHAR(64) PRIMARY KEY,
+        job_type VARCHAR(32) NOT NULL,
+        status VARCHAR(16) NOT NULL,
+        submitted_at DOUBLE PRECISION NOT NULL,
+        started_at DOUBLE PRECISION,
+        finished_at DOUBLE PRECISION,
+        duration_seconds DOUBLE PRECISION,
+        model VARCHAR(200),
+        resume_hash CHAR(64),
+        jd_hash CHAR(64),
+        jd_id VARCHAR(64),
+        jd_version INTEGER,
+        parent_job_id VARCHAR(64),
+        group_id VARCHAR(64),
+        score INTEGER,
+        error TEXT,
+        artifacts TEXT
+    )""",
+    # Keyset pagination runs on (submitted_at, job_id); filtered listings use the prefixed variants
+    "CREATE INDEX IF NOT EXISTS ix_jobs_submitted ON jobs (submitted_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_type_submitted ON jobs (job_type, submitted_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_status_submitted ON jobs (status, submitted_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_resume_submitted ON jobs (resume_hash, submitted_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_jd_submitted ON jobs (jd_hash, submitted_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_jd_id_submitted ON jobs (jd_id, submitted_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_group ON jobs (group_id)",
+    # min_score listings only walk scored (finished match) jobs
+    "CREATE INDEX IF NOT EXISTS ix_jobs_scored_submitted ON jobs (submitted_at, job_id) WHERE score IS NOT NULL",
+)
+
+COLUMNS = (
+    "job_id", "job_type", "status", "submitted_at", "started_at", "finished_at", "duration_seconds",
+    "model", "resume_hash", "jd_hash", "jd_id", "jd_version", "parent_job_id", "group_id", "score",
+    "error", "artifacts",
+)
+
+# Equality filters accepted by list_jobs()
+FILTERS = ("job_type", "status", "resume_hash", "jd_hash", "jd_id", "parent_job_id", "group_id", "model")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class JobStore:
+    """Job metadata (type, status, timings, model, input hashes, score, artifacts) in SQL.
+
+    Rows are inserted by the API on submit and updated by the workers (start, finish,
+    rendered artifacts), so both must point at the same database: a SQLite file on a
+    shared volume (sqlite:///path) or PostgreSQL (postgresql://..., needs psycopg).
+    Listing is newest first with keyset pagination on (submitted_at, job_id), so a page
+    costs one index range scan whatever the table size. Write failures are logged and
+    swallowed: the job store is an index, never a reason to fail a job.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.is_postgres = url.startswith(("postgresql://", "postgres://"))
+        self._local = threading.local()
+        self._ready = False
+        self._lock = threading.Lock()
+
+    # ---------- Writes ----------
+    def record_submitted(self, rows: Iterable[Dict[str, Any]]) -> None:
+        now = time.time()
+        values = [
+            (r["job_id"], r["job_type"], "PENDING", r.get("submitted_at", now), r.get("resume_hash"), r.get("jd_hash"),
+             r.get("jd_id"), r.get("jd_version"), r.get("parent_job_id"), r.get("group_id"))
+            for r in rows
+        ]
+        self._write(
+            "INSERT INTO jobs (job_id, job_type, status, submitted_at, resume_hash, jd_hash, jd_id, jd_version, "
+            "parent_job_id, group_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (job_id) DO NOTHING",
+            values,
+        )
+
+    def record_started(self, job_id: str, model: Optional[str] = None) -> None:
+        self._write(
+            "UPDATE jobs SET status = 'STARTED', started_at = COALESCE(started_at, ?), model = COALESCE(?, model) "
+            "WHERE job_id = ?",
+            [(time.time(), model, job_id)],
+        )
+
+    def record_finished(self, job_id: str, status: str, score: Optional[int] = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        # Run time only (queue wait is started_at - submitted_at); NULL for jobs that never started
+        self._write(
+            "UPDATE jobs SET status = ?, finished_at = ?, duration_seconds = ? - started_at, "
+            "score = COALESCE(?, score), error = ? WHERE job_id = ?",
+            [(status, now, now, score, (error or None) and error[:2000], job_id)],
+        )
+
+    def record_artifacts(self, job_id: str, artifacts: Dict[str, Any]) -> None:
+        self._write("UPDATE jobs SET artifacts = ? WHERE job_id = ?", [(json.dumps(artifacts), job_id)])
+
+    # ---------- Reads ----------
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._query(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def list_jobs(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        min_score: Optional[int] = None,
+        **filters: Optional[str],
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page, newest first, plus the cursor of the next page (None at the end)."""
+        where, params = [], []
+        for name, value in filters.items():
+            if name not in FILTERS:
+                raise ValueError(f"Unsupported filter: {name}")
+            if value is not None:
+                where.append(f"{name} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("submitted_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("submitted_at < ?")
+            params.append(until)
+        if min_score is not None:
+            where.append("score >= ?")
+            params.append(min_score)
+        if cursor:
+            at, job_id = _decode_cursor(cursor)
+            # Row-value comparison, so the index seeks to the cursor instead of scanning down to it
+            where.append("(submitted_at, job_id) < (?, ?)")
+            params += [at, job_id]
+        sql = f"SELECT {', '.join(COLUMNS)} FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY submitted_at DESC, job_id DESC LIMIT ?"
+        rows = self._query(sql, tuple(params) + (limit + 1,))
+        next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    # ---------- Internals ----------
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        if self.is_postgres:
+            if psycopg is None:
+                raise RuntimeError("JOB_STORE_URL is PostgreSQL but 'psycopg' is not installed")
+            conn = psycopg.connect(self.url, autocommit=True)
+        else:
+            path = self.url[len("sqlite:///"):] if self.url.startswith("sqlite:///") else self.url
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writers (API + workers)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        with self._lock:
+            if not self._ready:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                self._ready = True
+        return conn
+
+    def _sql(self, sql: str) -> str:
+        return sql.replace("?", "%s") if self.is_postgres else sql
+
+    def _write(self, sql: str, values: List[tuple]) -> None:
+        if not values:
+            return
+        try:
+            conn = self._connect()
+            if self.is_postgres:
+                with conn.cursor() as cur:
+                    cur.executemany(self._sql(sql), values)
+            else:
+                conn.execute("BEGIN")
+                conn.executemany(sql, values)
+                conn.execute("COMMIT")
+        except Exception as e:
+            logger.warning("job store write failed: %s", e)
+            if not self.is_postgres:
+                try:
+                    self._connect().execute("ROLLBACK")
+                except Exception:
+                    pass
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        if self.is_postgres:
+            with conn.cursor() as cur:
+                cur.execute(self._sql(sql), params)
+                rows = cur.fetchall()
+        else:
+            rows = conn.execute(sql, params).fetchall()
+        records = [dict(zip(COLUMNS, row)) for row in rows]
+        for record in records:
+            record["artifacts"] = json.loads(record["artifacts"]) if record["artifacts"] else None
+        return records
+
+
+def _encode_cursor(row: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps([row["submitted_at"], row["job_id"]]).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        at, job_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(at), str(job_id)
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+
+
+# Singleton
+job_store = JobStore(settings.JOB_STORE_URL)
@@ -0,0 +1,92 @@
+# backend/app/core/llm_clients.py
+
+from typing import Dict, List, Tuple
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from backend.app.config import settings, LLMStageConfig, LLM_STAGES
+from backend.app.core.llm_pool import LLMEndpointPool, pool_from_settings
+from backend.app.core.pooled_llm import PooledLLM
+from backend.app.core.llm_hedge import HedgedLLM, HedgeBudget
+from backend.app.core.llm_limiter import LimitedLLM, llm_limiter
+from backend.app.core.cancellable_llm import CancellableLLM
+from backend.app.core.cancellation import cancellation
+import threading
+
+
+class LLMClientRegistry:
+    """Process-wide LLM clients, one per distinct stage config.
+
+    Stages that resolve to the same model/endpoint/parameters share a client,
+    and clients are reused across jobs instead of being rebuilt per task.
+    Configs with several base URLs get a PooledLLM over a shared endpoint pool;
+    every per-host client holds a concurrency-limiter permit while it runs, and
+    stages listed in LLM_HEDGE_STAGES are wrapped in a HedgedLLM. The innermost
+    CancellableLLM frees the worker of a cancelled job at once; the permit and the
+    pool lease of a call it abandons are released when the host finishes that call.
+    """
+
+    def __init__(self):
+        self._clients: Dict[LLMStageConfig, BaseLLM] = {}
+        self._pools: Dict[Tuple[str, ...], LLMEndpointPool] = {}
+        self._hedge_budget = HedgeBudget(settings.LLM_HEDGE_BUDGET)
+        self._lock = threading.Lock()
+
+    def get(self, stage: str = None) -> BaseLLM:
+        cfg = settings.llm_config(stage)
+        with self._lock:
+            client = self._clients.get(cfg)
+            if client is None:
+                client = self._clients[cfg] = self._build(cfg)
+            return client
+
+    def pool(self, cfg: LLMStageConfig) -> LLMEndpointPool:
+        """Endpoint pool for a config's base URLs (shared by every config on the same hosts)."""
+        with self._lock:
+            return self._pool(cfg)
+
+    def stage_clients(self) -> Dict[str, BaseLLM]:
+        """{stage: client} for every configured pipeline stage."""
+        return {stage: self.get(stage) for stage in LLM_STAGES}
+
+    @staticmethod
+    def distinct_configs() -> List[LLMStageConfig]:
+        """Every distinct config used by a stage; warmup loads each of them."""
+        return settings.llm_configs()
+
+    def _pool(self, cfg: LLMStageConfig) -> LLMEndpointPool:
+        pool = self._pools.get(cfg.base_urls)
+        if pool is None:
+            pool = self._pools[cfg.base_urls] = pool_from_settings(cfg.base_urls)
+        return pool
+
+    @staticmethod
+    def _host_client(client: BaseLLM, url: str) -> BaseLLM:
+        """Per-host chain: limiter permit (if enabled) around the cancellable call."""
+        client = CancellableLLM(client, cancellation, settings.JOB_CANCEL_POLL_SECONDS)
+        return LimitedLLM(client, llm_limiter, url) if settings.LLM_LIMIT_ENABLED else client
+
+    def _build(self, cfg: LLMStageConfig) -> BaseLLM:
+        if len(cfg.base_urls) > 1:
+            client = PooledLLM(cfg, self._pool(cfg), wrap=self._host_client)
+        else:
+            client = self._host_client(LLM(
+                model=cfg.model_id,
+                base_url=cfg.base_url,
+                api_key=cfg.api_key,
+                temperature=cfg.temperature,
+                max_tokens=cfg.max_tokens,
+                timeout=cfg.timeout,
+            ), cfg.base_url)
+        if not cfg.hedge:
+            return client
+        return HedgedLLM(
+            client,
+            self._hedge_budget,
+            percentile=settings.LLM_HEDGE_PERCENTILE,
+            min_delay=settings.LLM_HEDGE_MIN_DELAY,
+            max_delay=settings.LLM_HEDGE_MAX_DELAY,
+        )
+
+
+# Singleton
+llm_clients = LLMClientRegistry()
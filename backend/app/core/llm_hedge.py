@@ -0,0 +1,172 @@
+# backend/app/core/llm_hedge.py
+
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional
+from crewai.llms.base_llm import BaseLLM
+from backend.app.config import settings
+from backend.app.core.cancellation import cancellation
+from backend.app.core.pooled_llm import PooledLLM
+from backend.app.core.metrics import metrics, percentile
+from backend.app.core.redis_client import get_redis
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Shared by every hedged client in the process
+_executor = ThreadPoolExecutor(max_workers=settings.LLM_CALL_THREADS, thread_name_prefix="llm-hedge")
+
+
+class HedgeBudget:
+    """Fleet-wide cap on duplicate calls: hedges <= ratio * calls over the current and previous minute."""
+
+    def __init__(self, ratio: float, prefix: str = "jdm:llm_hedge"):
+        self.ratio = ratio
+        self.prefix = prefix
+
+    def record_call(self) -> None:
+        key = f"{self.prefix}:calls:{int(time.time() // 60)}"
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, 180)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("hedge budget record failed: %s", e)
+
+    def try_acquire(self) -> bool:
+        if self.ratio <= 0:
+            return False
+        minute = int(time.time() // 60)
+        try:
+            r = get_redis()
+            pipe = r.pipeline(transaction=False)
+            for m in (minute, minute - 1):
+                pipe.get(f"{self.prefix}:calls:{m}")
+                pipe.get(f"{self.prefix}:hedges:{m}")
+            calls_now, hedges_now, calls_prev, hedges_prev = (int(v or 0) for v in pipe.execute())
+            if hedges_now + hedges_prev + 1 > self.ratio * (calls_now + calls_prev):
+                return False
+            key = f"{self.prefix}:hedges:{minute}"
+            pipe = r.pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, 180)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.debug("hedge budget check failed: %s", e)
+            return False
+
+
+class HedgedLLM(BaseLLM):
+    """Wraps a client for an idempotent stage: if the call is still running after the
+    stage's latency percentile, a duplicate is sent (to another host when pooled) and
+    the first successful answer wins. Calls are not streamed, so the percentile is of
+    whole-call latency rather than time to first token.
+
+    The loser is cancelled like a cancelled job's call (see CancellableLLM): its thread
+    here is freed at once and it makes no further attempt or failover; the host's
+    request can't be interrupted, so its pool lease and limiter permit are released
+    when that request ends.
+    """
+
+    def __init__(
+        self,
+        inner: BaseLLM,
+        budget: HedgeBudget,
+        percentile: float = 0.95,
+        min_delay: float = 1.0,
+        max_delay: float = 60.0,
+        min_samples: int = 20,
+    ):
+        super().__init__(model=inner.model, temperature=inner.temperature)
+        self.inner = inner
+        self.budget = budget
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._labels = {"model": inner.model}
+        self._delay_cache = (0.0, max_delay)  # (computed_at, delay)
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float:
+        """Percentile of recent attempt latencies, clamped; refreshed at most every 30s."""
+        with self._lock:
+            computed_at, delay = self._delay_cache
+            if time.monotonic() - computed_at < 30:
+                return delay
+        samples = metrics.samples("llm_attempt_seconds", self._labels)
+        delay = self.max_delay
+        if len(samples) >= self.min_samples:
+            delay = min(self.max_delay, max(self.min_delay, percentile(samples, self.percentile)))
+        with self._lock:
+            self._delay_cache = (time.monotonic(), delay)
+        return delay
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        kwargs = dict(
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
+        self.budget.record_call()
+        primary_hosts: List[str] = []
+        primary = self._submit(messages, kwargs, route_log=primary_hosts)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done:
+            return primary.result()
+
+        if not self.budget.try_acquire():
+            metrics.incr("llm_hedge_budget_denied", labels=self._labels)
+            return primary.result()
+
+        metrics.incr("llm_hedges", labels=self._labels)
+        hedge = self._submit(messages, kwargs, exclude=list(primary_hosts))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is not None:
+                    error = fut.exception()
+                    continue
+                if fut is hedge:
+                    metrics.incr("llm_hedge_wins", labels=self._labels)
+                for loser in pending:
+                    if not loser.cancel():  # not started yet: never runs
+                        loser.stop.set()
+                return fut.result()
+        raise error
+
+    def _submit(self, messages, kwargs: Dict[str, Any], **route) -> Future:
+        if isinstance(self.inner, PooledLLM):
+            kwargs = dict(kwargs, **route)
+        self.inner.stop = self.stop  # the agent executor sets stop words on this wrapper
+        started = time.monotonic()
+        stop = threading.Event()
+        # Attempts run under the caller's job scope, so a cancelled job stops both of them;
+        # `stop` cancels just this attempt when the other one wins
+        fut = _executor.submit(cancellation.propagate(self.inner.call, stop=stop), messages, **kwargs)
+        fut.stop = stop
+
+        def _observe(f: Future) -> None:
+            # Successful attempts, and losers up to when they were stopped (a lower bound of their
+            # latency); fast failures would drag the percentile down
+            if not f.cancelled() and (f.exception() is None or stop.is_set()):
+                metrics.observe("llm_attempt_seconds", time.monotonic() - started, self._labels)
+
+        fut.add_done_callback(_observe)
+        return fut
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
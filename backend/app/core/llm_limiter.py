@@ -0,0 +1,228 @@
+# backend/app/core/llm_limiter.py
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from crewai.llms.base_llm import BaseLLM
+from backend.app.config import settings
+from backend.app.core.cancellation import JobCancelled, release_when_done
+from backend.app.core.metrics import metrics
+from backend.app.core.redis_client import get_redis
+import logging
+import random
+import time
+import uuid
+import litellm
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean "the backend is saturated" (timeouts, 429, 503): the only signals that shrink the window
+_OVERLOAD_ERRORS = (
+    litellm.exceptions.Timeout,
+    litellm.exceptions.RateLimitError,
+    litellm.exceptions.ServiceUnavailableError,
+    TimeoutError,
+)
+
+# KEYS: permits zset, state hash. ARGV: now, expires_at, member, initial_limit
+_ACQUIRE = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+local limit = tonumber(redis.call('HGET', KEYS[2], 'limit') or ARGV[4])
+if redis.call('ZCARD', KEYS[1]) < math.max(1, math.floor(limit)) then
+  redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+  return 1
+end
+return 0
+"""
+
+# KEYS: permits zset, state hash.
+# ARGV: member, outcome (ok|overload|other), latency ('' = no sample), now, initial, min, max, tolerance, factor, stage
+# Latency is tracked per stage ('recent:<stage>' fast EWMA, 'baseline:<stage>' following drops at once but
+# rising only slowly), since stages differ in prompt and answer length. Queueing (recent > tolerance x baseline)
+# only pauses the increase; the limit is cut on overload errors alone, once per cut: a failed call that
+# started before the last cut was admitted under the old limit and says nothing about the new one.
+_RELEASE = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+local outcome, latency, now, stage = ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[10]
+local limit = tonumber(redis.call('HGET', KEYS[2], 'limit') or ARGV[5])
+local queueing = false
+if outcome == 'ok' and latency ~= nil then
+  local recent_key, baseline_key = 'recent:' .. stage, 'baseline:' .. stage
+  local recent = tonumber(redis.call('HGET', KEYS[2], recent_key) or '')
+  local baseline = tonumber(redis.call('HGET', KEYS[2], baseline_key) or '')
+  if recent == nil then recent = latency else recent = 0.7 * recent + 0.3 * latency end
+  if baseline == nil or latency < baseline then baseline = latency else baseline = baseline + 0.01 * (latency - baseline) end
+  redis.call('HSET', KEYS[2], recent_key, tostring(recent), baseline_key, tostring(baseline))
+  queueing = recent > baseline * tonumber(ARGV[8])
+end
+if outcome == 'overload' then
+  local last = tonumber(redis.call('HGET', KEYS[2], 'last_decrease') or '0')
+  if now - (latency or 0) >= last then
+    limit = math.max(tonumber(ARGV[6]), limit * tonumber(ARGV[9]))
+    redis.call('HSET', KEYS[2], 'last_decrease', tostring(now))
+  end
+elseif outcome == 'ok' and not queueing then
+  limit = math.min(tonumber(ARGV[7]), limit + 1 / limit)
+end
+redis.call('HSET', KEYS[2], 'limit', tostring(limit))
+return tostring(limit)
+"""
+
+
+class ConcurrencyLimitTimeout(RuntimeError):
+    pass
+
+
+class AdaptiveLimiter:
+    """Fleet-wide AIMD concurrency limit per (backend, model), shared through Redis.
+
+    A permit is a ZSET member scored by its expiry, so permits held by a crashed
+    worker age out. On release the limit grows by 1/limit per success (about +1
+    per window of calls) and is multiplied by `decrease_factor` on a timeout /
+    429 / 503. While a stage's recent latency exceeds `latency_tolerance` x its
+    uncongested baseline, requests are queueing in the backend: the limit stops
+    growing but isn't cut. Calls without a stage (warmups) aren't latency samples.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "jdm:llm_limit",
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_tolerance: float = 2.0,
+        decrease_factor: float = 0.5,
+        permit_ttl: int = 600,
+        acquire_timeout: float = 300.0,
+    ):
+        self.prefix = prefix
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.permit_ttl = permit_ttl
+        self.acquire_timeout = acquire_timeout
+
+    @contextmanager
+    def permit(self, backend: str, model: str, stage: Optional[str] = None) -> Iterator[None]:
+        """Hold a permit around a call; `stage` keys its latency sample (None: no sample)."""
+        member = self._acquire(backend, model)
+        started = time.monotonic()
+        outcome = "other"
+        try:
+            yield
+            outcome = "ok"
+        except _OVERLOAD_ERRORS:
+            outcome = "overload"
+            raise
+        except JobCancelled as e:
+            # The host still works on an abandoned call: hold the permit until it is done
+            held = member
+            if held is not None and release_when_done(e, lambda f: self._release(
+                    backend, model, held, _outcome(f), time.monotonic() - started, stage)):
+                member = None
+            raise
+        finally:
+            if member is not None:
+                self._release(backend, model, member, outcome, time.monotonic() - started, stage)
+
+    def _acquire(self, backend: str, model: str):
+        permits, state = self._keys(backend, model)
+        member = uuid.uuid4().hex
+        deadline = time.monotonic() + self.acquire_timeout
+        delay, waited = 0.05, False
+        while True:
+            try:
+                now = time.time()
+                ok = get_redis().eval(_ACQUIRE, 2, permits, state, now, now + self.permit_ttl, member, self.initial)
+            except Exception as e:
+                # Without Redis there is nothing to coordinate on: run unlimited rather than fail the job
+                logger.debug("llm limiter acquire failed: %s", e)
+                return None
+            if ok:
+                if waited:
+                    metrics.incr("llm_limiter_waits", labels={"backend": backend, "model": model})
+                return member
+            if time.monotonic() >= deadline:
+                raise ConcurrencyLimitTimeout(f"No LLM permit for {model} on {backend} within {self.acquire_timeout}s")
+            waited = True
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(1.0, delay * 1.5)
+
+    def _release(self, backend: str, model: str, member: str, outcome: str, latency: float,
+                 stage: Optional[str] = None) -> None:
+        permits, state = self._keys(backend, model)
+        labels = {"backend": backend, "model": model}
+        try:
+            r = get_redis()
+            # Overloads always pass their duration: it dates the call against the last cut
+            sample = latency if stage is not None or outcome == "overload" else ""
+            limit = r.eval(
+                _RELEASE, 2, permits, state,
+                member, outcome, sample, time.time(),
+                self.initial, self.min_limit, self.max_limit, self.latency_tolerance, self.decrease_factor,
+                stage or "",
+            )
+            metrics.set_gauge("llm_concurrency_limit", float(limit), labels)
+            metrics.set_gauge("llm_concurrency_in_use", r.zcard(permits), labels)
+        except Exception as e:
+            logger.debug("llm limiter release failed: %s", e)
+        if outcome == "overload":
+            metrics.incr("llm_overload_errors", labels=labels)
+
+    def _keys(self, backend: str, model: str):
+        base = f"{self.prefix}:{backend}|{model}"
+        return f"{base}:permits", f"{base}:state"
+
+
+def _outcome(fut) -> str:
+    """Limiter outcome of a finished (abandoned) call."""
+    if fut.cancelled():
+        return "other"
+    error = fut.exception()
+    return "ok" if error is None else "overload" if isinstance(error, _OVERLOAD_ERRORS) else "other"
+
+
+class LimitedLLM(BaseLLM):
+    """Holds a limiter permit for the (backend, model) of each call to the wrapped client.
+    The calling agent's role is the call's stage: latency is compared between calls of one
+    pipeline step only, and calls made without an agent aren't latency samples."""
+
+    def __init__(self, inner: BaseLLM, limiter: AdaptiveLimiter, backend: str):
+        super().__init__(model=inner.model, temperature=inner.temperature)
+        self.inner = inner
+        self.limiter = limiter
+        self.backend = backend
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.inner.stop = self.stop
+        with self.limiter.permit(self.backend, self.model, getattr(from_agent, "role", None)):
+            return self.inner.call(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+            )
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+
+# Singleton
+llm_limiter = AdaptiveLimiter(
+    initial=settings.LLM_LIMIT_INITIAL,
+    min_limit=settings.LLM_LIMIT_MIN,
+    max_limit=settings.LLM_LIMIT_MAX,
+    latency_tolerance=settings.LLM_LIMIT_LATENCY_TOLERANCE,
+    decrease_factor=settings.LLM_LIMIT_DECREASE_FACTOR,
+    permit_ttl=settings.LLM_REQUEST_TIMEOUT + 60,
+    acquire_timeout=settings.LLM_LIMIT_ACQUIRE_TIMEOUT,
+)
@@ -0,0 +1,289 @@
+# backend/app/core/llm_pool.py
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+from urllib import request as urlrequest
+from urllib.error import HTTPError
+from backend.app.config import settings
+from backend.app.core.cancellation import JobCancelled, release_when_done
+from backend.app.core.metrics import metrics
+from backend.app.core.redis_client import get_redis
+import json
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+def backend_errors() -> tuple:
+    """Errors that say something about the host rather than the request.
+
+    litellm is imported here rather than at module load so the API can read pool
+    state without the LLM stack; in workers it is already loaded.
+    """
+    import litellm
+
+    return (
+        litellm.exceptions.APIConnectionError,
+        litellm.exceptions.Timeout,
+        litellm.exceptions.ServiceUnavailableError,
+        litellm.exceptions.InternalServerError,
+        ConnectionError,
+        TimeoutError,
+    )
+
+
+class NoBackendAvailable(RuntimeError):
+    pass
+
+
+@dataclass
+class BackendState:
+    url: str
+    healthy: Optional[bool]            # None until the first probe
+    circuit_open: bool
+    in_flight: int
+    latency_ewma: Optional[float]      # seconds
+    loaded_models: Optional[Set[str]]  # None when the host can't report it (non-Ollama)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "circuit_open": self.circuit_open,
+            "in_flight": self.in_flight,
+            "latency_ewma": self.latency_ewma,
+            "loaded_models": sorted(self.loaded_models) if self.loaded_models is not None else None,
+        }
+
+
+class LLMEndpointPool:
+    """Routes LLM calls over several hosts (e.g. Ollama instances).
+
+    State is shared through Redis so every worker process sees the same picture:
+    - in-flight : one ZSET member per lease, scored by its expiry (a crashed worker's leases age out)
+    - latency   : EWMA of successful call durations per host
+    - health    : periodic probe of `/api/ps` (reachability + models currently loaded);
+                  one process probes per interval, guarded by a lock key
+    - circuit   : LLM_POOL_FAILURE_THRESHOLD consecutive failures open the circuit for
+                  LLM_POOL_COOLDOWN_SECONDS; the first call after that is the half-open trial
+
+    choose() prefers healthy hosts that already have the model loaded, then the
+    fewest in-flight calls, then the lowest latency. A cold host is only used
+    when it is at least `affinity_slack` calls less busy than the best warm one.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        prefix: str = "jdm:llm_pool",
+        probe_interval: int = 15,
+        probe_timeout: float = 2.0,
+        failure_threshold: int = 3,
+        cooldown_seconds: int = 30,
+        affinity_slack: int = 2,
+        lease_ttl: int = 600,
+        ewma_alpha: float = 0.3,
+    ):
+        if not urls:
+            raise ValueError("LLMEndpointPool needs at least one URL")
+        self.urls = list(urls)
+        self.prefix = prefix
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.affinity_slack = affinity_slack
+        self.lease_ttl = lease_ttl
+        self.ewma_alpha = ewma_alpha
+
+    # ---------- Routing ----------
+    def choose(self, model: str, exclude: Sequence[str] = ()) -> str:
+        self.refresh()
+        states = [s for s in self.states() if s.url not in exclude]
+        if not states:
+            raise NoBackendAvailable("Every LLM backend was already tried")
+
+        usable = [s for s in states if s.healthy is not False and not s.circuit_open]
+        if not usable:
+            # Everything looks down: still try the least busy host rather than fail outright
+            fallback = min(states, key=lambda s: s.in_flight)
+            logger.warning("No healthy LLM backend; trying %s anyway", fallback.url)
+            return fallback.url
+
+        name = _model_name(model)
+        rank = lambda s: (s.in_flight, s.latency_ewma or 0.0)
+        best = min(usable, key=rank)
+        warm = [s for s in usable if s.loaded_models is not None and name in s.loaded_models]
+        if warm:
+            best_warm = min(warm, key=rank)
+            if best.in_flight + self.affinity_slack > best_warm.in_flight:
+                return best_warm.url
+        return best.url
+
+    @contextmanager
+    def lease(self, model: str, exclude: Sequence[str] = ()) -> Iterator[str]:
+        """Pick a host and count the call as in flight there; records latency or failure on exit."""
+        url = self.choose(model, exclude)
+        member = uuid.uuid4().hex
+        key = self._key("inflight", url)
+        try:
+            get_redis().zadd(key, {member: time.time() + self.lease_ttl})
+        except Exception as e:
+            logger.debug("llm pool lease failed: %s", e)
+        started = time.monotonic()
+
+        def end(error: Optional[BaseException]) -> None:
+            if error is None:
+                self.record_success(url, model, time.monotonic() - started)
+            elif isinstance(error, backend_errors()):
+                self.record_failure(url)
+            try:
+                get_redis().zrem(key, member)
+            except Exception:
+                pass
+
+        try:
+            yield url
+        except JobCancelled as e:
+            # The host still works on an abandoned call: keep the lease until it is done
+            if not release_when_done(e, lambda f: end(e if f.cancelled() else f.exception())):
+                end(e)
+            raise
+        except Exception as e:
+            end(e)
+            raise
+        else:
+            end(None)
+
+    def record_success(self, url: str, model: str, seconds: float) -> None:
+        try:
+            r = get_redis()
+            prev = r.hget(self._key("latency"), url)
+            ewma = seconds if prev is None else (1 - self.ewma_alpha) * float(prev) + self.ewma_alpha * seconds
+            pipe = r.pipeline(transaction=False)
+            pipe.hset(self._key("latency"), url, ewma)
+            pipe.delete(self._key("fails", url), self._key("open", url))
+            pipe.execute()
+            # The host loads a model on first use: remember that before the next probe does
+            health = self._health().get(url)
+            if health and health.get("models") is not None and _model_name(model) not in health["models"]:
+                health["models"].append(_model_name(model))
+                r.hset(self._key("health"), url, json.dumps(health))
+        except Exception as e:
+            logger.debug("llm pool success record failed: %s", e)
+        metrics.observe("llm_call_seconds", seconds, {"backend": url})
+
+    def record_failure(self, url: str) -> None:
+        metrics.incr("llm_backend_failures", labels={"backend": url})
+        try:
+            r = get_redis()
+            fails = r.incr(self._key("fails", url))
+            r.expire(self._key("fails", url), self.cooldown_seconds * 10)
+            if fails >= self.failure_threshold:
+                r.set(self._key("open", url), fails, ex=self.cooldown_seconds)
+                logger.warning("LLM backend %s: circuit open for %ss after %s failures", url, self.cooldown_seconds, fails)
+        except Exception as e:
+            logger.debug("llm pool failure record failed: %s", e)
+
+    # ---------- State ----------
+    def states(self) -> List[BackendState]:
+        now = time.time()
+        health = self._health()
+        try:
+            r = get_redis()
+            pipe = r.pipeline(transaction=False)
+            for url in self.urls:
+                pipe.zremrangebyscore(self._key("inflight", url), "-inf", now)
+                pipe.zcard(self._key("inflight", url))
+                pipe.exists(self._key("open", url))
+            raw = pipe.execute()
+            latency = {_s(k): float(v) for k, v in r.hgetall(self._key("latency")).items()}
+        except Exception as e:
+            logger.debug("llm pool state read failed: %s", e)
+            raw, latency = [0, 0, 0] * len(self.urls), {}
+
+        states = []
+        for i, url in enumerate(self.urls):
+            h = health.get(url) or {}
+            models = h.get("models")
+            states.append(BackendState(
+                url=url,
+                healthy=h.get("ok"),
+                circuit_open=bool(raw[i * 3 + 2]),
+                in_flight=int(raw[i * 3 + 1]),
+                latency_ewma=latency.get(url),
+                loaded_models=set(models) if models is not None else None,
+            ))
+        return states
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [s.to_dict() for s in self.states()]
+
+    # ---------- Health ----------
+    def refresh(self, force: bool = False) -> None:
+        """Probe every host if the last probe is older than `probe_interval` (one process at a time)."""
+        try:
+            if not force and not get_redis().set(self._key("probe_lock"), 1, nx=True, ex=self.probe_interval):
+                return
+        except Exception:
+            return
+        for url in self.urls:
+            ok, models = self._probe(url)
+            try:
+                get_redis().hset(self._key("health"), url, json.dumps({"ok": ok, "models": models, "at": time.time()}))
+            except Exception:
+                pass
+            metrics.set_gauge("llm_backend_healthy", 1 if ok else 0, {"backend": url})
+
+    def _probe(self, url: str):
+        try:
+            with urlrequest.urlopen(f"{url}/api/ps", timeout=self.probe_timeout) as resp:
+                body = json.loads(resp.read() or b"{}")
+            names = [m.get("name") or m.get("model") for m in body.get("models", [])]
+            return True, sorted(_model_name(n) for n in names if n)
+        except HTTPError as e:
+            # Reachable but not Ollama (e.g. an OpenAI-compatible server): healthy, models unknown
+            return e.code < 500, None
+        except Exception as e:
+            logger.info("LLM backend %s failed health probe: %s", url, e)
+            return False, None
+
+    def _health(self) -> Dict[str, dict]:
+        try:
+            return {_s(k): json.loads(v) for k, v in get_redis().hgetall(self._key("health")).items()}
+        except Exception:
+            return {}
+
+    def _key(self, kind: str, url: Optional[str] = None) -> str:
+        return f"{self.prefix}:{kind}" if url is None else f"{self.prefix}:{kind}:{url}"
+
+
+def pool_from_settings(urls: Sequence[str]) -> LLMEndpointPool:
+    return LLMEndpointPool(
+        urls,
+        probe_interval=settings.LLM_POOL_PROBE_INTERVAL,
+        probe_timeout=settings.LLM_POOL_PROBE_TIMEOUT,
+        failure_threshold=settings.LLM_POOL_FAILURE_THRESHOLD,
+        cooldown_seconds=settings.LLM_POOL_COOLDOWN_SECONDS,
+        affinity_slack=settings.LLM_POOL_AFFINITY_SLACK,
+        lease_ttl=settings.LLM_REQUEST_TIMEOUT + 60,
+    )
+
+
+def configured_pools() -> List[LLMEndpointPool]:
+    """A pool per distinct multi-host URL set in the stage configs (for status endpoints)."""
+    url_sets = dict.fromkeys(cfg.base_urls for cfg in settings.llm_configs() if len(cfg.base_urls) > 1)
+    return [pool_from_settings(urls) for urls in url_sets]
+
+
+def _model_name(model: str) -> str:
+    """'ollama/qwen3' -> 'qwen3:latest' (the name Ollama reports in /api/ps)."""
+    name = model.split("/", 1)[1] if "/" in model else model
+    return name if ":" in name else f"{name}:latest"
+
+
+def _s(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
@@ -0,0 +1,119 @@
+# backend/app/core/metrics.py
+
+from typing import Any, Dict, Optional, List
+from backend.app.core.redis_client import get_redis
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics:
+    """Fleet-wide metrics shared through Redis (API, workers and beat all report here).
+
+    - counters : monotonically increasing totals (HINCRBYFLOAT)
+    - gauges   : last reported value
+    - samples  : bounded recent observations per series, for averages/percentiles
+
+    Recording never raises: a metrics outage must not fail a job.
+    """
+
+    def __init__(self, prefix: str = "jdm:metrics", max_samples: int = 500):
+        self.prefix = prefix
+        self.max_samples = max_samples
+
+    # ---------- Recording ----------
+    def incr(self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.incr_many({self._series(name, labels): amount})
+
+    def incr_many(self, amounts: Dict[str, float]) -> None:
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for series, amount in amounts.items():
+                pipe.hincrbyfloat(f"{self.prefix}:counters", series, amount)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("metrics incr failed: %s", e)
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            get_redis().hset(f"{self.prefix}:gauges", self._series(name, labels), value)
+        except Exception as e:
+            logger.debug("metrics gauge failed: %s", e)
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        series = self._series(name, labels)
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.sadd(f"{self.prefix}:series", series)
+            pipe.lpush(f"{self.prefix}:samples:{series}", value)
+            pipe.ltrim(f"{self.prefix}:samples:{series}", 0, self.max_samples - 1)
+            pipe.hincrbyfloat(f"{self.prefix}:counters", f"{series}:count", 1)
+            pipe.hincrbyfloat(f"{self.prefix}:counters", f"{series}:sum", value)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("metrics observe failed: %s", e)
+
+    # ---------- Reading ----------
+    def samples(self, name: str, labels: Optional[Dict[str, Any]] = None) -> List[float]:
+        try:
+            raw = get_redis().lrange(f"{self.prefix}:samples:{self._series(name, labels)}", 0, -1)
+        except Exception:
+            return []
+        return [float(v) for v in raw]
+
+    def gauges(self, name: str) -> Dict[str, float]:
+        """Last values of every labelled series of gauge `name`, keyed by series."""
+        try:
+            raw = get_redis().hgetall(f"{self.prefix}:gauges")
+        except Exception:
+            return {}
+        return {
+            _s(k): float(v) for k, v in raw.items()
+            if _s(k) == name or _s(k).startswith(name + "{")
+        }
+
+    def percentile(self, name: str, q: float, labels: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        return percentile(self.samples(name, labels), q)
+
+    def snapshot(self) -> Dict[str, Any]:
+        r = get_redis()
+        counters = {_s(k): float(v) for k, v in r.hgetall(f"{self.prefix}:counters").items()}
+        gauges = {_s(k): float(v) for k, v in r.hgetall(f"{self.prefix}:gauges").items()}
+        summaries = {}
+        for series in sorted(_s(x) for x in r.smembers(f"{self.prefix}:series")):
+            values = [float(v) for v in r.lrange(f"{self.prefix}:samples:{series}", 0, -1)]
+            if not values:
+                continue
+            summaries[series] = {
+                "count": len(values),
+                "avg": sum(values) / len(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+            }
+        return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+    @staticmethod
+    def _series(name: str, labels: Optional[Dict[str, Any]]) -> str:
+        if not labels:
+            return name
+        inner = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+        return f"{name}{{{inner}}}"
+
+
+def _s(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..1) of `values`; None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(math.ceil(q * len(ordered))) - 1))
+    return ordered[idx]
+
+
+# Singleton
+metrics = Metrics()
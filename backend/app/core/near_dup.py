@@ -0,0 +1,132 @@
+# backend/app/core/near_dup.py
+
+from typing import Any, Dict, List, Optional, Tuple
+from backend.app.config import settings
+from backend.app.core.metrics import metrics
+from backend.app.core.redis_client import get_redis
+import hashlib
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def simhash(text: str, shingle: int = 3) -> Tuple[int, int]:
+    """64-bit SimHash over word shingles; returns (fingerprint, number of features)."""
+    tokens = _TOKEN.findall((text or "").lower())
+    if len(tokens) < shingle:
+        features = [" ".join(tokens)] if tokens else []
+    else:
+        features = [" ".join(tokens[i:i + shingle]) for i in range(len(tokens) - shingle + 1)]
+    weights: Dict[str, int] = {}
+    for feature in features:
+        weights[feature] = weights.get(feature, 0) + 1
+
+    totals = [0] * 64
+    for feature, weight in weights.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for i, bit in enumerate(format(h, "064b")):
+            totals[i] += weight if bit == "1" else -weight
+    fingerprint = 0
+    for total in totals:
+        fingerprint = (fingerprint << 1) | (1 if total > 0 else 0)
+    return fingerprint, len(features)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDupIndex:
+    """SimHash LSH index in Redis for finding a cached parse of an almost identical text.
+
+    The 64-bit fingerprint is cut into `bands`; each band value is a Redis set of the
+    documents having it, so two texts within `bands - 1` bits always share a band
+    (larger distances are found often, not always). Candidates are ranked by Hamming
+    distance. Members point at parse-cache digests; each document record also keeps its
+    section digests so a near-duplicate can be topped up with a delta parse.
+    """
+
+    def __init__(self, bands: int, ttl_seconds: int, min_features: int, max_candidates: int = 200,
+                 prefix: str = "jdm:neardup"):
+        if 64 % bands:
+            raise ValueError("NEAR_DUP_BANDS must divide 64")
+        self.bands = bands
+        self.band_bits = 64 // bands
+        self.ttl_seconds = ttl_seconds
+        self.min_features = min_features
+        self.max_candidates = max_candidates
+        self.prefix = prefix
+
+    def add(self, kind: str, text: str, digest: str, sections: Optional[List[str]] = None) -> None:
+        fingerprint, features = simhash(text)
+        if features < self.min_features:
+            return  # too short: fingerprints of tiny texts are mostly noise
+        record = json.dumps({"simhash": fingerprint, "digest": digest, "sections": sections or []})
+        ttl = self.ttl_seconds or None
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.set(self._doc(kind, digest), record, ex=ttl)
+            for band in self._bands(fingerprint):
+                pipe.sadd(self._band(kind, band), digest)
+                if ttl:
+                    pipe.expire(self._band(kind, band), ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("near-dup index write failed: %s", e)
+
+    def nearest(self, kind: str, text: str, max_distance: int) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Closest indexed document within `max_distance` bits, as (record, distance)."""
+        fingerprint, features = simhash(text)
+        if features < self.min_features:
+            return None
+        metrics.incr("near_dup_lookups", labels={"kind": kind})
+        try:
+            r = get_redis()
+            candidates = set()
+            for band in self._bands(fingerprint):
+                key = self._band(kind, band)
+                members = r.srandmember(key, self.max_candidates) if r.scard(key) > self.max_candidates \
+                    else r.smembers(key)
+                candidates.update(m.decode() if isinstance(m, bytes) else m for m in members)
+            if not candidates:
+                return None
+            candidates = sorted(candidates)
+            records = r.mget([self._doc(kind, d) for d in candidates])
+        except Exception as e:
+            logger.debug("near-dup lookup failed: %s", e)
+            return None
+
+        best = None
+        for raw in records:
+            if not raw:
+                continue  # expired
+            record = json.loads(raw)
+            distance = hamming(fingerprint, int(record["simhash"]))
+            if best is None or distance < best[1]:
+                best = (record, distance)
+        if best is None:
+            return None
+        metrics.observe("near_dup_distance", best[1], {"kind": kind})
+        return best if best[1] <= max_distance else None
+
+    def _bands(self, fingerprint: int) -> List[str]:
+        mask = (1 << self.band_bits) - 1
+        return [f"{i}:{(fingerprint >> (i * self.band_bits)) & mask:x}" for i in range(self.bands)]
+
+    def _band(self, kind: str, band: str) -> str:
+        return f"{self.prefix}:{kind}:band:{band}"
+
+    def _doc(self, kind: str, digest: str) -> str:
+        return f"{self.prefix}:{kind}:doc:{digest}"
+
+
+# Singleton
+near_dup_index = NearDupIndex(
+    bands=settings.NEAR_DUP_BANDS,
+    ttl_seconds=settings.PARSE_CACHE_TTL_SECONDS,
+    min_features=settings.NEAR_DUP_MIN_FEATURES,
+)
@@ -0,0 +1,76 @@
+# backend/app/core/parse_cache.py
+
+from typing import Any, Dict, Optional
+from backend.app.config import settings
+from backend.app.core.redis_client import get_redis
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parse prompts change, so parses made with the old prompts aren't reused
+PARSE_PROMPT_VERSION = "2"
+
+
+class ParseCache:
+    """Structured parses in Redis, keyed by content hash + parse model + prompt version.
+
+    - get()/put()          : cached parse of one resume section or one JD
+    - lineage()/record()   : per-job record (section digests, JD digest, parent) so an
+                             edited resume can be diffed against the job it came from
+    A cache miss (or Redis being down) only means the text is parsed again.
+    """
+
+    def __init__(self, ttl_seconds: int, lineage_ttl_seconds: int, prefix: str = "jdm:parse"):
+        self.ttl_seconds = ttl_seconds
+        self.lineage_ttl_seconds = lineage_ttl_seconds
+        self.prefix = prefix
+
+    def digest(self, kind: str, text: str) -> str:
+        model_id = settings.llm_config("parse").model_id
+        normalized = " ".join((text or "").split()).lower()
+        return hashlib.sha256(f"{kind}|{model_id}|{PARSE_PROMPT_VERSION}|{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, text: str) -> Optional[Dict[str, Any]]:
+        return self.get_digest(kind, self.digest(kind, text))
+
+    def get_digest(self, kind: str, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = get_redis().get(f"{self.prefix}:{kind}:{digest}")
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.debug("parse cache read failed: %s", e)
+            return None
+
+    def put(self, kind: str, text: str, parsed: Dict[str, Any]) -> None:
+        try:
+            get_redis().set(f"{self.prefix}:{kind}:{self.digest(kind, text)}", json.dumps(parsed),
+                            ex=self.ttl_seconds or None)
+        except Exception as e:
+            logger.debug("parse cache write failed: %s", e)
+
+    # ---------- Lineage ----------
+    def lineage(self, job_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not job_id:
+            return None
+        try:
+            raw = get_redis().get(f"jdm:lineage:{job_id}")
+            return json.loads(raw) if raw else None
+        except Exception:
+            return None
+
+    def record(self, job_id: Optional[str], lineage: Dict[str, Any]) -> None:
+        if not job_id:
+            return
+        try:
+            get_redis().set(f"jdm:lineage:{job_id}", json.dumps(lineage), ex=self.lineage_ttl_seconds or None)
+        except Exception as e:
+            logger.debug("lineage write failed: %s", e)
+
+
+# Singleton
+parse_cache = ParseCache(
+    ttl_seconds=settings.PARSE_CACHE_TTL_SECONDS,
+    lineage_ttl_seconds=settings.LINEAGE_TTL_SECONDS,
+)
@@ -1,14 +1,17 @@
 
 #backend/app/core/pdf_parser.py
-from typing import Union
+from typing import Union, TYPE_CHECKING
 from pathlib import Path
-from PyPDF2 import PdfReader
+
+if TYPE_CHECKING:
+    from PyPDF2 import PdfReader
 
 
 class PDFParser:
     """Handles PDF and plain text extraction."""
 
     def extract_text(self, file: Union[Path, bytes]) -> str:
+        from PyPDF2 import PdfReader  # imported on first use: keeps API startup light
         if isinstance(file, Path):
             with open(file, "rb") as f:
                 reader = PdfReader(f)
@@ -20,7 +23,7 @@ class PDFParser:
         else:
             raise ValueError("Unsupported file type for PDFParser.")
         
-    def _extract_all(self, reader: PdfReader) -> str:
+    def _extract_all(self, reader: "PdfReader") -> str:
         text = []
         for page in reader.pages:
             page_text = page.extract_text()
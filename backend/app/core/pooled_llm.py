@@ -0,0 +1,65 @@
+# backend/app/core/pooled_llm.py
+
+from typing import List, Optional, Sequence
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from backend.app.config import LLMStageConfig
+from backend.app.core.llm_pool import LLMEndpointPool, backend_errors
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PooledLLM(BaseLLM):
+    """crewai LLM that sends each call to the pool's pick, failing over to the next host."""
+
+    def __init__(self, cfg: LLMStageConfig, pool: LLMEndpointPool, wrap=None):
+        """`wrap(client, url)` decorates each per-host client (e.g. with a concurrency limiter)."""
+        super().__init__(model=cfg.model_id, temperature=cfg.temperature)
+        self.pool = pool
+        self._clients = {}
+        for url in pool.urls:
+            client = LLM(
+                model=cfg.model_id,
+                base_url=url,
+                api_key=cfg.api_key,
+                temperature=cfg.temperature,
+                max_tokens=cfg.max_tokens,
+                timeout=cfg.timeout,
+            )
+            self._clients[url] = wrap(client, url) if wrap else client
+        self._template = self._clients[pool.urls[0]]
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None,
+             exclude: Sequence[str] = (), route_log: Optional[List[str]] = None):
+        """`exclude` skips hosts (e.g. the one a hedged duplicate is racing); hosts used are appended to `route_log`."""
+        tried: List[str] = list(exclude)
+        while True:
+            try:
+                with self.pool.lease(self.model, exclude=tried) as url:
+                    tried.append(url)
+                    if route_log is not None:
+                        route_log.append(url)
+                    client = self._clients[url]
+                    client.stop = self.stop  # the agent executor sets stop words on this wrapper
+                    return client.call(
+                        messages,
+                        tools=tools,
+                        callbacks=callbacks,
+                        available_functions=available_functions,
+                        from_task=from_task,
+                        from_agent=from_agent,
+                    )
+            except backend_errors() as e:
+                if len(tried) >= len(self.pool.urls):
+                    raise
+                logger.warning("LLM backend %s failed (%s); failing over", tried[-1], e)
+
+    def supports_function_calling(self) -> bool:
+        return self._template.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self._template.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self._template.get_context_window_size()
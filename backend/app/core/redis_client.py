@@ -0,0 +1,12 @@
+# backend/app/core/redis_client.py
+
+from functools import lru_cache
+from typing import Optional
+import redis
+from backend.app.config import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis(url: Optional[str] = None) -> redis.Redis:
+    """Shared, lazily created Redis client (one connection pool per URL and process)."""
+    return redis.Redis.from_url(url or settings.REDIS_URL)
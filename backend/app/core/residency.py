@@ -0,0 +1,199 @@
+# backend/app/core/residency.py
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib import request as urlrequest
+from backend.app.config import settings, JOB_STAGES
+from backend.app.core.llm_pool import _model_name as _ollama_name
+from backend.app.core.metrics import metrics
+from backend.app.core.redis_client import get_redis
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+WARM, COLD, LOADING, UNMANAGED = "warm", "cold", "loading", "unmanaged"
+
+
+class ResidencyManager:
+    """Keeps configured Ollama models loaded and tracks warm/cold state per (host, model) in Redis.
+
+    - keep_alive()  : beat task body; inside RESIDENCY_HOURS pings every managed model with an
+                      empty generate + keep_alive (loads it without producing tokens), then checks
+                      /api/ps so models Ollama unloaded on its own are reported cold
+    - mark_warm()   : also called after warmups, so one-off loads are visible too
+    - state()       : warm | loading | cold for a model (warm on any host counts);
+                      non-Ollama and unlisted models are 'unmanaged' and never gate jobs
+    """
+
+    def __init__(self, prefix: str = "jdm:residency", timeout: float = 300.0):
+        self.prefix = prefix
+        self.timeout = timeout
+
+    # ---------- Targets ----------
+    def targets(self) -> List[Tuple[str, str]]:
+        """(model_id, base_url) pairs to keep resident."""
+        wanted = {m.strip() for m in settings.RESIDENCY_MODELS.split(",") if m.strip()}
+        pairs = []
+        for cfg in settings.llm_configs():
+            if not _is_ollama(cfg.model_id):
+                continue
+            if wanted and cfg.model_id not in wanted and _ollama_name(cfg.model_id) not in wanted \
+                    and cfg.model_id.split("/", 1)[-1] not in wanted:
+                continue
+            pairs.extend((cfg.model_id, url) for url in cfg.base_urls)
+        return list(dict.fromkeys(pairs))
+
+    def in_window(self, now: Optional[datetime] = None) -> bool:
+        """True when `now` (UTC) falls in one of the RESIDENCY_HOURS ranges (ranges may wrap midnight)."""
+        spec = settings.RESIDENCY_HOURS.strip()
+        if not spec:
+            return True
+        now = now or datetime.now(timezone.utc)
+        minute = now.hour * 60 + now.minute
+        for item in spec.split(","):
+            start, _, end = item.strip().partition("-")
+            if not end:
+                continue
+            lo, hi = _minutes(start), _minutes(end)
+            if (lo <= minute < hi) if lo <= hi else (minute >= lo or minute < hi):
+                return True
+        return False
+
+    # ---------- Keep-alive ----------
+    def keep_alive(self, models: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, Any]:
+        if not force and not self.in_window():
+            return {"in_window": False, "pinged": []}
+        only = set(models or [])
+        pinged, failed = [], {}
+        for model_id, url in self.targets():
+            if only and model_id not in only:
+                continue
+            try:
+                self.ping(model_id, url)
+                pinged.append(f"{model_id}@{url}")
+            except Exception as e:
+                logger.warning("Keep-alive failed for %s on %s: %s", model_id, url, e)
+                self._set(url, model_id, COLD)
+                failed[f"{model_id}@{url}"] = str(e)
+        self.sync()
+        return {"in_window": True, "pinged": pinged, "failed": failed}
+
+    def ping(self, model_id: str, url: str) -> float:
+        """Load (or keep) a model on a host; returns the seconds it took."""
+        body = json.dumps({"model": _ollama_name(model_id), "keep_alive": f"{settings.RESIDENCY_KEEP_ALIVE_SECONDS}s"})
+        req = urlrequest.Request(f"{url}/api/generate", data=body.encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+        self._set(url, model_id, LOADING, keep=self._get(url, model_id).get("state") == WARM)
+        started = time.monotonic()
+        with urlrequest.urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+        seconds = time.monotonic() - started
+        self.mark_warm(model_id, url, seconds)
+        return seconds
+
+    def sync(self) -> None:
+        """Reconcile with what each host reports as loaded (Ollama unloads idle models by itself)."""
+        hosts: Dict[str, List[str]] = {}
+        for model_id, url in self.targets():
+            hosts.setdefault(url, []).append(model_id)
+        for url, model_ids in hosts.items():
+            try:
+                with urlrequest.urlopen(f"{url}/api/ps", timeout=5) as resp:
+                    loaded = {m.get("name") or m.get("model") for m in json.loads(resp.read() or b"{}").get("models", [])}
+            except Exception:
+                continue
+            for model_id in model_ids:
+                if _ollama_name(model_id) not in loaded and self._get(url, model_id).get("state") == WARM:
+                    self._set(url, model_id, COLD)
+
+    def mark_warm(self, model_id: str, url: str, load_seconds: Optional[float] = None) -> None:
+        if load_seconds is not None:
+            metrics.observe("model_load_seconds", load_seconds, {"model": model_id})
+        self._set(url, model_id, WARM, until=time.time() + settings.RESIDENCY_KEEP_ALIVE_SECONDS)
+
+    # ---------- State ----------
+    def state(self, model_id: str) -> str:
+        if not _is_ollama(model_id):
+            return UNMANAGED
+        states = [self._effective(self._get(url, m)) for m, url in self.targets() if m == model_id]
+        if not states:
+            return UNMANAGED  # excluded by RESIDENCY_MODELS
+        if WARM in states:
+            return WARM
+        return LOADING if LOADING in states else COLD
+
+    def job_ready(self, job_type: str) -> Tuple[bool, List[str]]:
+        """Whether every model the job's stages use is warm; returns the cold ones."""
+        cold = []
+        for stage in JOB_STAGES.get(job_type, ()):
+            model_id = settings.llm_config(stage).model_id
+            if self.state(model_id) not in (WARM, UNMANAGED) and model_id not in cold:
+                cold.append(model_id)
+        return not cold, cold
+
+    def request_load(self, model_ids: List[str], send) -> None:
+        """Ask for a keep-alive of cold models, at most once per minute per model (`send` enqueues the task)."""
+        try:
+            r = get_redis()
+            todo = [m for m in model_ids if r.set(f"{self.prefix}:load_requested:{m}", 1, nx=True, ex=60)]
+        except Exception:
+            todo = model_ids
+        if todo:
+            send(todo)
+
+    def held_seconds(self, job_id: str) -> float:
+        """Seconds since a job was first held for warmup (0 on the first hold)."""
+        key = f"{self.prefix}:held:{job_id}"
+        try:
+            r = get_redis()
+            r.set(key, time.time(), nx=True, ex=max(3600, settings.RESIDENCY_GATE_MAX_WAIT * 2))
+            return time.time() - float(r.get(key))
+        except Exception:
+            return float("inf")  # can't track holds: don't hold
+
+    def snapshot(self) -> Dict[str, Any]:
+        entries = {}
+        for model_id, url in self.targets():
+            rec = self._get(url, model_id)
+            entries.setdefault(model_id, {"state": self.state(model_id), "hosts": {}})
+            entries[model_id]["hosts"][url] = dict(rec, state=self._effective(rec))
+        return {"in_window": self.in_window(), "models": entries}
+
+    # ---------- Internals ----------
+    @staticmethod
+    def _effective(rec: Dict[str, Any]) -> str:
+        state = rec.get("state", COLD)
+        if state == WARM and float(rec.get("until") or 0) < time.time():
+            return COLD  # keep_alive lapsed without a ping
+        if state == LOADING and rec.get("keep"):
+            return WARM  # refreshing a model that is already loaded
+        return state
+
+    def _get(self, url: str, model_id: str) -> Dict[str, Any]:
+        try:
+            raw = get_redis().hget(self.prefix, f"{url}|{model_id}")
+            return json.loads(raw) if raw else {}
+        except Exception:
+            return {}
+
+    def _set(self, url: str, model_id: str, state: str, **extra) -> None:
+        rec = dict(extra, state=state, at=time.time())
+        try:
+            get_redis().hset(self.prefix, f"{url}|{model_id}", json.dumps(rec))
+        except Exception as e:
+            logger.debug("residency state write failed: %s", e)
+
+
+def _is_ollama(model_id: str) -> bool:
+    return model_id.split("/", 1)[0] in ("ollama", "ollama_chat")
+
+
+def _minutes(hhmm: str) -> int:
+    hh, _, mm = hhmm.strip().partition(":")
+    return int(hh) * 60 + int(mm or 0)
+
+
+# Singleton
+residency = ResidencyManager()
@@ -0,0 +1,195 @@
+# backend/app/core/result_archive.py
+
+from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from backend.app.config import settings
+from backend.app.core.blob_store import blob_store, BlobNotFound
+from backend.app.core.metrics import metrics
+import logging
+import os
+import struct
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Archive entry: magic + expiry (epoch seconds, big-endian double) + encoded result
+_MAGIC = b"JDMA"
+_HEADER = struct.Struct(">4sd")
+
+
+class ResultArchive:
+    """Cheap on-disk home for old Celery results, read transparently by the API.
+
+    Each result is the backend's encoded payload (already compact/compressed by
+    the result codec) with its claim-check blobs inlined, stored under
+    <dir>/<id[:2]>/<task_id>.res. Entries keep the expiry their Redis key had
+    (the per job type TTL), are not served past it and are deleted by purge().
+
+    The directory must be shared by the API and the workers running compaction:
+    results moved where the API can't read them would look PENDING. Without a
+    directory (RESULT_ARCHIVE_DIR unset) nothing is archived and results stay in Redis.
+    """
+
+    def __init__(self, directory: str, default_ttl: int):
+        self.directory = directory
+        self.default_ttl = default_ttl
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def put(self, task_id: str, payload: bytes, expires_at: float) -> int:
+        if not self.enabled:
+            raise RuntimeError("RESULT_ARCHIVE_DIR is not set")
+        path = self._path(task_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, expires_at))
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    def get_raw(self, task_id: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        try:
+            path = self._path(task_id)
+            with open(path, "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            return None
+        expires_at, payload = self._unpack(path, data)
+        if expires_at <= time.time():
+            _remove(path)
+            return None
+        return payload
+
+    def get_meta(self, backend, task_id: str) -> Optional[Dict[str, Any]]:
+        """Decoded result meta (same shape as the result backend's), or None."""
+        raw = self.get_raw(task_id)
+        if raw is None:
+            return None
+        return backend.decode_result(raw)
+
+    def _path(self, task_id: str) -> str:
+        safe = "".join(c for c in task_id if c.isalnum() or c in "-_")
+        if not safe:
+            raise ValueError("Invalid task id")
+        return os.path.join(self.directory, safe[:2], f"{safe}.res")
+
+    def _unpack(self, path: str, data: bytes):
+        """(expires_at, payload); entries written before expiries were stored expire by mtime."""
+        if data[:len(_MAGIC)] == _MAGIC:
+            _, expires_at = _HEADER.unpack_from(data)
+            return expires_at, data[_HEADER.size:]
+        try:
+            return os.path.getmtime(path) + self.default_ttl, data
+        except OSError:
+            return 0.0, data
+
+    # ---------- Compaction ----------
+    def compact(self, backend, older_than_seconds: int, batch: int = 500) -> Dict[str, Any]:
+        """
+        Move finished results older than `older_than_seconds` from Redis into the archive,
+        then delete expired archive entries.
+        Returns a report (scanned / archived / bytes moved out of Redis / purged).
+        """
+        if not self.enabled:
+            logger.warning("Result compaction skipped: RESULT_ARCHIVE_DIR is not set")
+            return {"scanned": 0, "archived": 0, "bytes_moved": 0, "purged": 0, "skipped": True}
+        r = backend.client  # the result backend's own Redis connection
+        prefix = backend.task_keyprefix
+        prefix = prefix.decode() if isinstance(prefix, bytes) else prefix
+        now = time.time()
+        cutoff = now - older_than_seconds
+        scanned = archived = moved = 0
+
+        for key in r.scan_iter(match=f"{prefix}*", count=batch):
+            scanned += 1
+            raw = r.get(key)
+            if raw is None:
+                continue
+            try:
+                meta = backend.decode_result(raw)
+            except Exception:
+                continue
+            if meta.get("status") not in ("SUCCESS", "FAILURE", "REVOKED"):
+                continue
+            done = date_done_timestamp(meta.get("date_done"))
+            if done is None or done > cutoff:
+                continue
+            task_id = (key.decode() if isinstance(key, bytes) else key)[len(prefix):]
+            # Same expiry as in Redis (per job type TTL), else the default TTL from completion
+            ttl = r.ttl(key)
+            expires_at = now + ttl if ttl and ttl > 0 else done + self.default_ttl
+            self.put(task_id, self._inline_blobs(backend, task_id, meta, raw), expires_at)
+            r.delete(key)
+            archived += 1
+            moved += len(raw)
+
+        purged = self.purge(now)
+        metrics.incr_many({"results_archived": archived, "results_archived_bytes": moved, "results_archive_purged": purged})
+        return {"scanned": scanned, "archived": archived, "bytes_moved": moved, "purged": purged}
+
+    @staticmethod
+    def _inline_blobs(backend, task_id: str, meta: Dict[str, Any], raw: bytes) -> bytes:
+        """The result with its claim-check blobs inlined: blobs expire, archive entries outlive them."""
+        if meta.get("status") != "SUCCESS":
+            return raw  # only successful results carry blob references
+        try:
+            resolved = blob_store.resolve(meta.get("result"))
+        except BlobNotFound:
+            logger.warning("Archiving %s with expired blobs; it will read as expired", task_id)
+            return raw
+        if resolved == meta.get("result"):
+            return raw
+        return backend.encode(dict(meta, result=resolved))
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Delete archive entries past their expiry; returns how many."""
+        now = time.time() if now is None else now
+        purged = 0
+        if not self.enabled:
+            return purged
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".res"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    with open(path, "rb") as f:
+                        head = f.read(_HEADER.size)
+                except OSError:
+                    continue
+                expires_at, _ = self._unpack(path, head)
+                if expires_at <= now and _remove(path):
+                    purged += 1
+        return purged
+
+
+def date_done_timestamp(date_done: Any) -> Optional[float]:
+    """Epoch seconds from a backend `date_done` (ISO string or datetime, naive means UTC)."""
+    if not date_done:
+        return None
+    if isinstance(date_done, str):
+        try:
+            date_done = datetime.fromisoformat(date_done)
+        except ValueError:
+            return None
+    if date_done.tzinfo is None:
+        date_done = date_done.replace(tzinfo=timezone.utc)
+    return date_done.timestamp()
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+# Singleton
+result_archive = ResultArchive(settings.RESULT_ARCHIVE_DIR, default_ttl=settings.RESULT_TTL_DEFAULT)
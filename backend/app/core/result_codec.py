@@ -0,0 +1,112 @@
+# backend/app/core/result_codec.py
+
+from typing import Any, Dict
+from kombu.serialization import register
+from kombu.utils.json import dumps as json_dumps, loads as json_loads
+from backend.app.config import settings
+import threading
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+SERIALIZER_NAME = "jdm"
+CONTENT_TYPE = "application/x-jdm-result"
+
+# Header: 1 byte compression + 1 byte body format.
+# Legacy plain-JSON payloads (written before this codec) start with '{' and are still readable.
+_NONE, _ZLIB, _ZSTD = b"\x00", b"\x01", b"\x02"
+_JSON, _MSGPACK = b"j", b"m"
+
+
+class ResultCodec:
+    """Compact encoding for the Celery result backend.
+
+    Body is JSON or msgpack (RESULT_CODEC); bodies larger than
+    RESULT_COMPRESS_MIN_BYTES are compressed with zlib or zstd (RESULT_COMPRESSION).
+    Missing optional libraries fall back to json / zlib.
+    Encoding does no I/O: byte counts are tallied in memory and published by the
+    worker after each task (take_stats).
+    """
+
+    def __init__(self, codec: str, compression: str, min_bytes: int, level: int = 6):
+        codec = codec.strip().lower()
+        compression = compression.strip().lower()
+        self.codec = "msgpack" if codec == "msgpack" and msgpack is not None else "json"
+        if compression == "zstd" and zstandard is None:
+            compression = "zlib"
+        self.compression = compression if compression in {"none", "zlib", "zstd"} else "zlib"
+        self.min_bytes = min_bytes
+        self.level = level
+        self._stats = {"result_raw_bytes": 0, "result_stored_bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    def encode(self, obj: Any) -> bytes:
+        if self.codec == "msgpack":
+            body, fmt = msgpack.packb(obj, use_bin_type=True, default=str), _MSGPACK
+        else:
+            body, fmt = json_dumps(obj).encode("utf-8"), _JSON
+
+        raw_len, comp = len(body), _NONE
+        if self.compression != "none" and len(body) >= self.min_bytes:
+            if self.compression == "zstd":
+                packed = zstandard.ZstdCompressor(level=3).compress(body)
+                comp_flag = _ZSTD
+            else:
+                packed = zlib.compress(body, self.level)
+                comp_flag = _ZLIB
+            if len(packed) < len(body):
+                body, comp = packed, comp_flag
+
+        data = comp + fmt + body
+        with self._stats_lock:
+            self._stats["result_raw_bytes"] += raw_len
+            self._stats["result_stored_bytes"] += len(data)
+        return data
+
+    def take_stats(self) -> Dict[str, int]:
+        """Byte counts encoded since the last call (then reset)."""
+        with self._stats_lock:
+            stats, self._stats = self._stats, {"result_raw_bytes": 0, "result_stored_bytes": 0}
+        return {name: value for name, value in stats.items() if value}
+
+    def decode(self, data: Any) -> Any:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data:
+            return None
+        if data[:1] in (b"{", b"["):  # legacy JSON result
+            return json_loads(data)
+
+        comp, fmt, body = data[:1], data[1:2], data[2:]
+        if comp == _ZLIB:
+            body = zlib.decompress(body)
+        elif comp == _ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Result is zstd-compressed but 'zstandard' is not installed")
+            body = zstandard.ZstdDecompressor().decompress(body)
+        if fmt == _MSGPACK:
+            if msgpack is None:
+                raise RuntimeError("Result is msgpack-encoded but 'msgpack' is not installed")
+            return msgpack.unpackb(body, raw=False)
+        return json_loads(body)
+
+
+codec = ResultCodec(
+    codec=settings.RESULT_CODEC,
+    compression=settings.RESULT_COMPRESSION,
+    min_bytes=settings.RESULT_COMPRESS_MIN_BYTES,
+)
+
+
+def register_codec() -> str:
+    """Register the codec with kombu; returns the serializer name for celeryconfig."""
+    register(SERIALIZER_NAME, codec.encode, codec.decode, content_type=CONTENT_TYPE, content_encoding="binary")
+    return SERIALIZER_NAME
@@ -0,0 +1,143 @@
+# backend/app/core/sections.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+import hashlib
+import json
+import re
+
+# Headings commonly found in resumes and JDs (matched case-insensitively, with or without a trailing colon)
+_KNOWN_HEADINGS = {
+    "summary", "profile", "professional summary", "objective", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "education", "academic background", "skills", "technical skills", "core competencies",
+    "tools", "technologies", "projects", "personal projects", "certifications", "certificates",
+    "publications", "awards", "achievements", "languages", "interests", "volunteering",
+    "volunteer experience", "references", "training", "courses",
+    "requirements", "qualifications", "minimum qualifications", "preferred qualifications",
+    "responsibilities", "key responsibilities", "must have", "must haves", "nice to have",
+    "nice to haves", "about the role", "what you'll do", "what you will do", "benefits",
+}
+_MD_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$")
+
+
+@dataclass
+class Section:
+    title: str
+    body: str
+
+    @property
+    def digest(self) -> str:
+        """Content hash; whitespace-only edits don't count as a change."""
+        normalized = " ".join(f"{self.title}\n{self.body}".split()).lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @property
+    def text(self) -> str:
+        return f"{self.title}\n{self.body}".strip() if self.title else self.body.strip()
+
+
+def split_sections(text: str) -> List[Section]:
+    """Split a resume into sections at heading lines (Markdown '#', known section names,
+    short ALL-CAPS lines). Text before the first heading becomes a 'Header' section."""
+    sections: List[Section] = []
+    title, body = "Header", []
+    for line in (text or "").splitlines():
+        heading = _heading(line)
+        if heading is not None:
+            if "\n".join(body).strip():
+                sections.append(Section(title, "\n".join(body).strip()))
+            title, body = heading, []
+        else:
+            body.append(line)
+    if "\n".join(body).strip():
+        sections.append(Section(title, "\n".join(body).strip()))
+    return sections or [Section("Resume", (text or "").strip())]
+
+
+def chunk_sections(sections: List[Section], max_chars: int) -> List[Section]:
+    """Section-aligned chunks of at most ~max_chars: short sections are kept whole, long
+    ones are cut at blank lines, then at line ends (a single oversized line is cut hard).
+    Each piece keeps its section title so the parser knows what it is reading."""
+    max_chars = max(200, max_chars)
+    chunks: List[Section] = []
+    for section in sections:
+        if len(section.text) <= max_chars:
+            chunks.append(section)
+            continue
+        pieces = _pack(section.body, max_chars - len(section.title) - 16)
+        for i, piece in enumerate(pieces, 1):
+            chunks.append(Section(f"{section.title} ({i}/{len(pieces)})", piece))
+    return chunks
+
+
+def merge_parses(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-section structured parses: list values are concatenated in section
+    order without duplicates; for other values the first non-empty one wins."""
+    merged: Dict[str, Any] = {}
+    for part in parts:
+        if not isinstance(part, dict):
+            continue
+        for key, value in part.items():
+            if isinstance(value, list):
+                existing = merged.setdefault(key, [])
+                if not isinstance(existing, list):
+                    continue
+                seen = {_identity(v) for v in existing}
+                for item in value:
+                    if _identity(item) not in seen:
+                        existing.append(item)
+                        seen.add(_identity(item))
+            elif key not in merged or merged[key] in (None, "", {}, []):
+                merged[key] = value
+    return merged
+
+
+def _heading(line: str):
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60:
+        return None
+    md = _MD_HEADING.match(line)
+    if md:
+        return md.group(1).strip()
+    bare = stripped.rstrip(":").strip()
+    if bare.lower() in _KNOWN_HEADINGS:
+        return bare
+    letters = [c for c in bare if c.isalpha()]
+    if len(letters) >= 4 and bare.isupper() and len(bare.split()) <= 4:
+        return bare.title()
+    return None
+
+
+def _pack(body: str, limit: int) -> List[str]:
+    units: List[str] = []
+    for para in re.split(r"\n\s*\n", body):
+        if len(para) <= limit:
+            units.append(para)
+            continue
+        for line in para.splitlines():
+            units.extend(line[i:i + limit] for i in range(0, max(len(line), 1), limit))
+    pieces, current = [], ""
+    for unit in units:
+        if current and len(current) + len(unit) + 2 > limit:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n\n{unit}" if current else unit
+    if current.strip():
+        pieces.append(current)
+    return [p.strip() for p in pieces if p.strip()]
+
+
+def _identity(value: Any) -> str:
+    """Dedup key: case/whitespace-insensitive, also inside structured entries (experience items)."""
+    return json.dumps(_normalize(value), sort_keys=True, default=str)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, dict):
+        return {str(k).lower(): _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
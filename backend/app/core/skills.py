@@ -0,0 +1,261 @@
+# backend/app/core/skills.py
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from backend.app.config import settings
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_TAXONOMY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills.json")
+_CACHE_FORMAT = 2
+_WS = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SkillHit:
+    id: str
+    name: str
+    category: str
+    count: int
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every occurrence of every pattern."""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(index)
+        # Breadth-first: a node's failure link is the longest proper suffix that is also a trie path
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def tables(self) -> Dict[str, Any]:
+        """The automaton as plain JSON-able data (see from_tables)."""
+        return {"patterns": self.patterns, "goto": self.goto, "fail": self.fail, "out": self.out}
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, Any]) -> "AhoCorasick":
+        automaton = cls.__new__(cls)
+        automaton.patterns, automaton.goto = tables["patterns"], tables["goto"]
+        automaton.fail, automaton.out = tables["fail"], tables["out"]
+        if not len(automaton.goto) == len(automaton.fail) == len(automaton.out):
+            raise ValueError("inconsistent automaton tables")
+        return automaton
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yields (start, pattern index) for every occurrence."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for index in self.out[node]:
+                yield i - len(self.patterns[index]) + 1, index
+
+
+class SkillMatcher:
+    """Dictionary skill extraction over a taxonomy of canonical skills and their aliases.
+
+    The taxonomy is the bundled data/skills.json plus any JSON files (same format) listed in
+    SKILLS_TAXONOMY_EXTRA; an entry with an existing id adds aliases to it. Every name and alias
+    is compiled into one Aho-Corasick automaton, cached as JSON under SKILLS_CACHE_DIR keyed by the
+    taxonomy's hash, so processes load it instead of rebuilding. The cache is plain data (never
+    pickle) and only used from a directory private to this user; anything unreadable is rebuilt.
+    Matching is case-insensitive and whole-word, except for the entry's `exact` forms (e.g. "Go",
+    "R"), which must match case.
+    Overlapping hits keep the longest one ("spring boot" over "spring").
+    """
+
+    def __init__(self, paths: List[str], cache_dir: str):
+        self.paths = paths
+        self.cache_dir = cache_dir
+        self._compiled: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    # ---------- Public API ----------
+    def extract(self, text: str) -> List[SkillHit]:
+        """Skills mentioned in `text`, in order of first mention."""
+        compiled = self._load()
+        skills, payloads = compiled["skills"], compiled["payloads"]
+        original = _WS.sub(" ", text or "")
+        lowered = original.lower()
+        if len(lowered) != len(original):  # a few Unicode characters change length when lowercased
+            lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in original)
+
+        hits = []
+        for start, index in compiled["automaton"].iter(lowered):
+            skill_id, exact = payloads[index]
+            end = start + len(compiled["automaton"].patterns[index])
+            if not _bounded(lowered, start, end):
+                continue
+            if exact is not None and original[start:end] != exact:
+                continue
+            hits.append((start, end, skill_id))
+
+        counts: Dict[str, int] = {}
+        taken_until = -1
+        for start, end, skill_id in sorted(hits, key=lambda h: (h[0], -h[1])):
+            if start < taken_until:
+                continue  # inside a longer match
+            taken_until = end
+            counts[skill_id] = counts.get(skill_id, 0) + 1
+        return [SkillHit(sid, skills[sid]["name"], skills[sid].get("category", ""), n) for sid, n in counts.items()]
+
+    def canonical(self, term: str) -> Optional[str]:
+        """Canonical name when `term` as a whole is a known skill name or alias ('k8s' -> 'Kubernetes')."""
+        compiled = self._load()
+        normalized = _WS.sub(" ", term or "").strip()
+        sid = compiled["aliases"].get(normalized.lower()) or compiled["exact"].get(normalized)
+        return compiled["skills"][sid]["name"] if sid else None
+
+    def names(self, text: str) -> List[str]:
+        return [hit.name for hit in self.extract(text)]
+
+    # ---------- Build / cache ----------
+    def _load(self) -> Dict[str, Any]:
+        if self._compiled is not None:
+            return self._compiled
+        with self._lock:
+            if self._compiled is None:
+                self._compiled = self._compile()
+        return self._compiled
+
+    def _compile(self) -> Dict[str, Any]:
+        raw = [self._read(p) for p in self.paths]
+        fingerprint = hashlib.sha256(json.dumps([_CACHE_FORMAT, raw], sort_keys=True).encode("utf-8")).hexdigest()
+        path = os.path.join(self.cache_dir, f"skills-{fingerprint[:16]}.json")
+        cached = self._read_cache(path, fingerprint)
+        if cached is not None:
+            return cached
+
+        skills: Dict[str, Dict[str, Any]] = {}
+        for doc in raw:
+            for entry in doc.get("skills", []):
+                current = skills.setdefault(entry["id"], {"name": entry["name"], "category": entry.get("category", ""),
+                                                         "aliases": [], "exact": []})
+                current["aliases"] += entry.get("aliases", [])
+                current["exact"] += entry.get("exact", [])
+
+        aliases: Dict[str, str] = {}
+        exact: Dict[str, str] = {}
+        for sid, entry in skills.items():
+            for form in entry["exact"]:
+                exact[_WS.sub(" ", form).strip()] = sid
+            for form in [entry["name"]] + entry["aliases"]:
+                form = _WS.sub(" ", form).strip()
+                if form not in exact:
+                    aliases.setdefault(form.lower(), sid)
+
+        patterns, payloads = [], []
+        for form, sid in aliases.items():
+            patterns.append(form)
+            payloads.append((sid, None))
+        for form, sid in exact.items():
+            patterns.append(form.lower())
+            payloads.append((sid, form))
+        compiled = {"skills": skills, "aliases": aliases, "exact": exact,
+                    "payloads": payloads, "automaton": AhoCorasick(patterns)}
+        self._write_cache(path, fingerprint, compiled)
+        return compiled
+
+    def _private_cache_dir(self) -> bool:
+        """Create the cache dir (0700) if needed; True only if it is ours and no one else can write to it."""
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            st = os.stat(self.cache_dir)
+        except OSError as e:
+            logger.warning("Skill automaton cache dir %s unusable: %s", self.cache_dir, e)
+            return False
+        if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+            logger.warning("Not caching the skill automaton in %s: not owned by this user or writable by others",
+                           self.cache_dir)
+            return False
+        return True
+
+    def _read_cache(self, path: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path) or not self._private_cache_dir():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+            if doc["fingerprint"] != fingerprint:
+                return None
+            return {"skills": doc["skills"], "aliases": doc["aliases"], "exact": doc["exact"],
+                    "payloads": [tuple(p) for p in doc["payloads"]],
+                    "automaton": AhoCorasick.from_tables(doc["automaton"])}
+        except Exception as e:
+            # Truncated, stale or foreign: rebuild (and overwrite it)
+            logger.info("Ignoring skill automaton cache %s: %s", path, e)
+            return None
+
+    def _write_cache(self, path: str, fingerprint: str, compiled: Dict[str, Any]) -> None:
+        if not self._private_cache_dir():
+            return
+        doc = dict(compiled, fingerprint=fingerprint, automaton=compiled["automaton"].tables())
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not cache the skill automaton in %s: %s", self.cache_dir, e)
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def _bounded(text: str, start: int, end: int) -> bool:
+    """Whole-word check; single letters ("C", "R") must not be glued to '&', '-', ''' or '.' either."""
+    strict = "&-'." if end - start == 1 else ""
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    for ch in (before, after):
+        if ch.isalnum() or ch == "_" or ch in strict:
+            return False
+    # A hyphen between word characters joins them: "java-script" is not "Java".
+    # Hyphenated skills ("scikit-learn") match through their own taxonomy forms.
+    if before == "-" and start > 1 and text[start - 2].isalnum():
+        return False
+    if after == "-" and end + 1 < len(text) and text[end + 1].isalnum():
+        return False
+    # "node.js" style: a trailing '.' followed by a letter is part of the token
+    return not (after == "." and end + 1 < len(text) and text[end + 1].isalpha())
+
+
+# Singleton (the automaton is loaded on first use)
+skill_matcher = SkillMatcher(
+    paths=[BUNDLED_TAXONOMY] + [p.strip() for p in settings.SKILLS_TAXONOMY_EXTRA.split(",") if p.strip()],
+    cache_dir=settings.SKILLS_CACHE_DIR,
+)
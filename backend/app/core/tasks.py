@@ -1,16 +1,38 @@
 # backend/app/core/tasks.py
 
+from contextlib import nullcontext
+from celery.exceptions import Ignore, Retry
+from celery.signals import task_prerun, task_postrun
 from celery.utils.log import get_task_logger
 from backend.worker.worker import celery_app
 from backend.app.core.agent_orchestrator import AgentOrchestrator
-from backend.app.config import settings
+from backend.app.core.artifacts import ArtifactRenderer
+from backend.app.core.artifact_store import artifact_store
+from backend.app.core.async_queue import queue
+from backend.app.core.blob_store import blob_store
+from backend.app.core.cancellation import cancellation, JobCancelled
+from backend.app.core.deadlines import deadline_planner, FULL, DROP
+from backend.app.core.fair_scheduler import fair_scheduler
+from backend.app.core.result_archive import result_archive
+from backend.app.core.result_codec import codec as result_codec
+from backend.app.core.jd_library import jd_library
+from backend.app.core.job_store import job_store
+from backend.app.core.llm_clients import llm_clients
+from backend.app.core.llm_limiter import llm_limiter
+from backend.app.core.residency import residency
+from backend.app.core.metrics import metrics
+from backend.app.config import settings, JOB_STAGES
 import litellm
+import time
 
 logger = get_task_logger(__name__)
 
+# task_id -> start (monotonic), for the per-queue run time the autoscaler sizes pools from
+_task_started = {}
+
 @celery_app.task(
     name="run_agent_job",
-    bind=False,
+    bind=True,
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_jitter=True,
@@ -19,12 +41,229 @@ logger = get_task_logger(__name__)
     time_limit=settings.CELERY_HARD_TIME_LIMIT,       #  660s
     acks_late=False,                          # ack immediately; or set True with care + visibility_timeout
 )
-def run_agent_job(job_type: str, data: dict):
-    logger.info("Starting job type=%s", job_type)
-    orchestrator = AgentOrchestrator()
-    result = orchestrator.run(job_type, data or {})
+def run_agent_job(self, job_type: str, data: dict):
+    data = data or {}
+    deadline = data.get("deadline")
+    try:
+        with cancellation.scope(self.request.id):
+            cancellation.check()  # cancelled while queued, on a worker that missed the revoke
+            if settings.RESIDENCY_GATE_JOBS:
+                _hold_until_warm(self, job_type)
+            # Decided before any LLM time is spent: full run, downgrade, or drop
+            engine, reason = deadline_planner.plan(job_type, deadline, data.get("deadline_action")) if deadline else (FULL, "")
+            if engine == DROP:
+                _drop_late_job(self.request.id, job_type, deadline, reason)
+            logger.info("Starting job type=%s engine=%s %s", job_type, engine, reason)
+            started = time.monotonic()
+            result = AgentOrchestrator().run(job_type, data, job_id=self.request.id, engine=engine)
+    except JobCancelled as e:
+        # The API already stored REVOKED; Ignore keeps the worker from overwriting it (and from retrying)
+        logger.info("Stopped job type=%s: %s", job_type, e)
+        metrics.incr("jobs_stopped_cancelled", labels={"job_type": job_type})
+        raise Ignore()
+    deadline_planner.record(job_type, engine, time.monotonic() - started, deadline)
+    if engine != FULL:
+        result = dict(result, engine=engine, downgrade_reason=f"deadline: {reason}")
     logger.info("Finished job type=%s", job_type)
-    return result
+    # Large Markdown bodies are kept out of the result backend (claim-check)
+    return blob_store.offload(result)
+
+
+def _drop_late_job(job_id: str, job_type: str, deadline: float, reason: str) -> None:
+    """Store REVOKED for a job that can't meet its deadline, then stop it (no retry, no result)."""
+    logger.info("Dropping job type=%s: %s", job_type, reason)
+    celery_app.backend.mark_as_revoked(job_id, f"deadline: {reason}")
+    job_store.record_finished(job_id, "REVOKED", error=f"deadline: {reason}")
+    cancellation.forget(job_id)
+    deadline_planner.record(job_type, DROP, 0.0, deadline)
+    raise Ignore()
+
+
+def _hold_until_warm(task, job_type: str) -> None:
+    """
+    Re-queue the job (freeing the worker) while its models are cold and a load is
+    requested; after RESIDENCY_GATE_MAX_WAIT it runs anyway and pays the cold load.
+    Re-queued with the same retry count, so holding doesn't use up the failure retry.
+    """
+    ready, cold = residency.job_ready(job_type)
+    if ready:
+        return
+    held = residency.held_seconds(task.request.id)
+    if held >= settings.RESIDENCY_GATE_MAX_WAIT:
+        logger.info("Models still cold after %ss, running anyway: %s", int(held), cold)
+        return
+    residency.request_load(cold, lambda models: keep_models_warm.apply_async(
+        kwargs={"models": models, "force": True}, queue="default", routing_key="default"))
+    metrics.incr("jobs_held_for_warmup", labels={"job_type": job_type})
+    countdown = settings.RESIDENCY_GATE_RETRY_SECONDS
+    task.signature_from_request(countdown=countdown, retries=task.request.retries).apply_async()
+    raise Retry(f"Waiting for cold models: {cold}", when=countdown)
+
+
+@celery_app.task(
+    name="parse_jd",
+    bind=False,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 1},
+    soft_time_limit=settings.CELERY_SOFT_TIME_LIMIT,
+    time_limit=settings.CELERY_HARD_TIME_LIMIT,
+)
+def parse_jd(jd_id: str, version: int):
+    """Pre-parse a JD registered in the library (runs on the 'llm' queue)."""
+    record = jd_library.get(jd_id, version)
+    if record is None:
+        logger.warning("JD %s v%s not found, nothing to parse", jd_id, version)
+        return {"jd_id": jd_id, "version": version, "parse_status": "missing"}
+    try:
+        parsed = AgentOrchestrator().parse_jd(record["text"])
+    except Exception as e:
+        jd_library.set_parse(jd_id, version, error=str(e))
+        raise
+    jd_library.set_parse(jd_id, version, parsed=parsed)
+    logger.info("Parsed library JD %s v%s", jd_id, version)
+    return {"jd_id": jd_id, "version": version, "parse_status": "parsed"}
+
+
+@celery_app.task(
+    name="render_artifacts",
+    bind=False,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 2},
+    soft_time_limit=120,
+    time_limit=180,
+)
+def render_artifacts(result: dict, job_id: str):
+    """
+    Post-processing step linked after run_agent_job (runs on the 'pdf' queue).
+    Pre-renders md/json/pdf into the artifact store so downloads are plain reads.
+    """
+    renderer = ArtifactRenderer()
+    jr = {"job_id": job_id, "status": "SUCCESS", "result": blob_store.resolve(result), "error": None}
+    for fmt in ArtifactRenderer.FORMATS:
+        if artifact_store.get(job_id, fmt) is not None:
+            continue
+        data, filename, media_type = renderer.render(job_id, jr, fmt)
+        artifact_store.put(job_id, fmt, data, filename, media_type)
+    job_store.record_artifacts(job_id, {
+        fmt: {"filename": stored.filename, "digest": stored.digest, "size": stored.size}
+        for fmt in ArtifactRenderer.FORMATS
+        for stored in [artifact_store.get(job_id, fmt)] if stored is not None
+    })
+    logger.info("Rendered artifacts for job_id=%s", job_id)
+    return {"job_id": job_id, "artifacts": list(ArtifactRenderer.FORMATS)}
+
+
+@task_prerun.connect
+def _record_job_started(sender=None, task_id=None, args=None, **kwargs):
+    if getattr(sender, "name", None) != "run_agent_job" or not args:
+        return
+    stages = JOB_STAGES.get(args[0])
+    job_store.record_started(task_id, model=settings.llm_config(stages[-1]).model_id if stages else None)
+
+
+@task_prerun.connect
+def _record_job_wait(sender=None, args=None, **kwargs):
+    """Submit-to-start wait per tenant and class (fair-queue wait plus broker wait)."""
+    if getattr(sender, "name", None) != "run_agent_job" or len(args or ()) < 2 or not isinstance(args[1], dict):
+        return
+    data = args[1]
+    if data.get("submitted_at") and not getattr(sender.request, "retries", 0):
+        metrics.observe("job_wait_seconds", time.time() - data["submitted_at"],
+                        {"tenant": data.get("tenant") or "anonymous", "class": data.get("job_class") or "interactive"})
+
+
+@task_prerun.connect
+def _time_task_start(task_id=None, **kwargs):
+    _task_started[task_id] = time.monotonic()
+
+
+@task_postrun.connect
+def _time_task_end(task=None, task_id=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or state not in ("SUCCESS", "FAILURE"):
+        return  # RETRY: held or failed attempts would skew the run time
+    delivery_info = getattr(getattr(task, "request", None), "delivery_info", None) or {}
+    queue = delivery_info.get("routing_key") or "default"
+    metrics.observe("task_seconds", time.monotonic() - started, {"queue": queue})
+
+
+@task_postrun.connect
+def _record_job_finished(sender=None, task_id=None, args=None, retval=None, state=None, **kwargs):
+    if getattr(sender, "name", None) != "run_agent_job" or state not in ("SUCCESS", "FAILURE"):
+        return  # RETRY: the job continues later under the same id
+    score = None
+    if state == "SUCCESS" and isinstance(retval, dict) and isinstance(retval.get("result"), dict):
+        try:
+            score = int(float(retval["result"].get("match_score")))
+        except (TypeError, ValueError):
+            pass  # not a match job, or the model's score isn't a number
+    job_store.record_finished(task_id, state, score=score, error=str(retval) if state == "FAILURE" else None)
+    cancellation.forget(task_id)
+
+
+@task_postrun.connect
+def _release_fair_slot(sender=None, task_id=None, state=None, **kwargs):
+    """Free the job's fair-scheduling slot and dispatch the next job (held jobs keep theirs)."""
+    if getattr(sender, "name", None) != "run_agent_job" or state == "RETRY":
+        return
+    try:
+        fair_scheduler.release(task_id)
+    except Exception as e:
+        logger.warning("Could not release fair-scheduling slot of %s: %s", task_id, e)
+
+
+@task_postrun.connect
+def _publish_result_sizes(**kwargs):
+    """Raw vs stored result bytes, tallied by the codec while storing (one Redis write per task)."""
+    stats = result_codec.take_stats()
+    if stats:
+        metrics.incr_many(stats)
+
+
+@task_postrun.connect
+def _apply_result_ttl(sender=None, task_id=None, args=None, **kwargs):
+    """Per job type result TTL: runs after the result is stored."""
+    if getattr(sender, "name", None) != "run_agent_job" or not args:
+        return
+    backend = celery_app.backend
+    if not hasattr(backend, "expire"):
+        return
+    try:
+        backend.expire(backend.get_key_for_task(task_id), settings.result_ttl(args[0]))
+    except Exception as e:
+        logger.warning("Could not set result TTL for %s: %s", task_id, e)
+
+
+@celery_app.task(name="reap_abandoned_jobs", bind=False, soft_time_limit=120, time_limit=180)
+def reap_abandoned_jobs():
+    """Periodic (beat): cancel interactive jobs no client has polled for JOB_ABANDON_SECONDS."""
+    cancelled, finished = [], 0
+    for job_id in cancellation.abandoned():
+        outcome = queue.cancel(job_id, reason="abandoned")
+        if outcome and outcome["cancelled"]:
+            cancelled.append(job_id)
+        else:
+            cancellation.forget(job_id)
+            finished += 1
+    if cancelled:
+        logger.info("Cancelled %d abandoned jobs: %s", len(cancelled), cancelled)
+    return {"cancelled": len(cancelled), "finished": finished}
+
+
+@celery_app.task(name="pump_fair_queues", bind=False, soft_time_limit=60, time_limit=90)
+def pump_fair_queues():
+    """Periodic (beat): dispatch waiting tenant jobs in case a release was missed (lost worker)."""
+    return {"sent": fair_scheduler.pump(), "pending": fair_scheduler.pending()}
+
+
+@celery_app.task(name="compact_results", bind=False, soft_time_limit=900, time_limit=960)
+def compact_results():
+    """Periodic: archive finished results older than RESULT_ARCHIVE_AFTER_SECONDS to disk."""
+    report = result_archive.compact(celery_app.backend, settings.RESULT_ARCHIVE_AFTER_SECONDS)
+    logger.info("Result compaction: %s", report)
+    return report
 
 
 @celery_app.task(
@@ -39,24 +278,56 @@ def run_agent_job(job_type: str, data: dict):
 )
 def warmup_llm():
     """
-    Pre-load the model into memory via a tiny LiteLLM call.
-    """
-    model_id = settings.full_model_id()
-    logger.info("Warming up LLM model_id=%s base_url=%s", model_id, settings.LLM_BASE_URL)
-
-    resp = litellm.completion(
-        model=model_id,
-        api_base=settings.LLM_BASE_URL,
-        api_key=settings.LLM_API_KEY,
-        timeout=settings.LLM_REQUEST_TIMEOUT,
-        messages=[{"role": "user", "content": settings.WARMUP_PROMPT}],
-        temperature=0.0,
-        max_tokens=16,
-    )
-    # It will returns a dict-like object; we just log short content
-    try:
-        txt = resp.get("choices", [{}])[0].get("message", {}).get("content", "")
-    except Exception:
-        txt = str(resp)
-    logger.info("Warmup response (truncated): %s", (txt or "")[:120])
-    return {"status": "ok", "model": model_id}
+    Pre-load every model in use (one per distinct stage config) via a tiny LiteLLM call.
+    """
+    warmed, failed, seen = [], {}, set()
+    for cfg in llm_clients.distinct_configs():
+        if (cfg.model_id, cfg.base_urls) in seen:  # configs differing only in sampling params
+            continue
+        seen.add((cfg.model_id, cfg.base_urls))
+        # Pooled configs warm the host the pool would route to, so affinity picks it next
+        pool = llm_clients.pool(cfg) if len(cfg.base_urls) > 1 else None
+        try:
+            with (pool.lease(cfg.model_id) if pool else nullcontext(cfg.base_url)) as base_url:
+                logger.info("Warming up LLM model_id=%s base_url=%s", cfg.model_id, base_url)
+                # No stage: a 16-token warmup says nothing about the latency of real calls
+                permit = llm_limiter.permit(base_url, cfg.model_id) if settings.LLM_LIMIT_ENABLED else nullcontext()
+                started = time.monotonic()
+                with permit:
+                    resp = litellm.completion(
+                        model=cfg.model_id,
+                        api_base=base_url,
+                        api_key=cfg.api_key,
+                        timeout=cfg.timeout,
+                        messages=[{"role": "user", "content": settings.WARMUP_PROMPT}],
+                        temperature=0.0,
+                        max_tokens=16,
+                    )
+                residency.mark_warm(cfg.model_id, base_url, time.monotonic() - started)
+        except Exception as e:
+            # One unreachable model must not keep the others cold
+            logger.warning("Warmup failed for model_id=%s: %s", cfg.model_id, e)
+            failed[cfg.model_id] = str(e)
+            continue
+        # It will returns a dict-like object; we just log short content
+        try:
+            txt = resp.get("choices", [{}])[0].get("message", {}).get("content", "")
+        except Exception:
+            txt = str(resp)
+        logger.info("Warmup response from %s (truncated): %s", cfg.model_id, (txt or "")[:120])
+        warmed.append(cfg.model_id)
+
+    if not warmed:
+        raise RuntimeError(f"Warmup failed for every model: {failed}")
+    return {"status": "ok" if not failed else "partial", "model": warmed[0], "models": warmed, "failed": failed}
+
+
+@celery_app.task(name="keep_models_warm", bind=False, soft_time_limit=600, time_limit=660)
+def keep_models_warm(models=None, force: bool = False):
+    """
+    Periodic (beat): keep-alive ping for resident models during RESIDENCY_HOURS.
+    `force` ignores the hours (used when a held job needs a cold model loaded).
+    """
+    report = residency.keep_alive(models=models, force=force)
+    logger.info("Keep-alive: %s", report)
+    return report
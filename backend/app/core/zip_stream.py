@@ -0,0 +1,59 @@
+# backend/app/core/zip_stream.py
+
+from typing import Iterable, Iterator, Tuple
+import io
+import time
+import zipfile
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries: Iterable[Tuple[str, Iterable[bytes]]]) -> Iterator[bytes]:
+    """
+    Build a ZIP archive incrementally and yield it chunk by chunk.
+    `entries` yields (archive_name, byte_chunks); only the chunk being written
+    is held in memory, so exporting hundreds of jobs keeps memory flat.
+    Because the sink is not seekable, zipfile writes data descriptors instead
+    of patching local headers.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w") as zf:
+        for name, chunks in entries:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            # PDFs are already compressed; deflating them again only burns CPU
+            info.compress_type = zipfile.ZIP_STORED if name.endswith(".pdf") else zipfile.ZIP_DEFLATED
+            with zf.open(info, mode="w") as dst:
+                for chunk in chunks:
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    data = sink.drain()
+    if data:
+        yield data
@@ -2,7 +2,7 @@
 #backend/app/models/job_models.py
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 from enum import Enum
 
 class JobState(str, Enum):
@@ -19,6 +19,87 @@ class ResumeJDRequest(BaseModel):
     job_type: str = Field(..., description="One of: match, enhance, cover_letter")
     resume: Optional[str] = Field(default=None, description="Plain text resume")
     jd: Optional[str] = Field(default=None, description="Plain text job description")
+    parent_job_id: Optional[str] = Field(default=None, description="Previous job for an edited version of this resume; only changed sections are re-parsed")
+    jd_id: Optional[str] = Field(default=None, description="Library JD (see /jds) to use instead of `jd` text")
+    jd_version: Optional[int] = Field(default=None, description="Version of `jd_id`; defaults to the latest at submit time")
+    priority: Literal["high", "normal", "low"] = Field(default="normal", description="Priority class (llm_high / llm / llm_low queue)")
+    deadline: Optional[float] = Field(default=None, description="Result wanted by (unix seconds); earliest deadline runs first")
+    slo_seconds: Optional[float] = Field(default=None, gt=0, description="Result wanted within this many seconds of submission")
+    deadline_action: Optional[Literal["downgrade", "drop"]] = Field(default=None, description="If it can't finish in time: downgrade (smaller model / fast scorer) or drop; default DEADLINE_ACTION")
+
+class JobMatrix(BaseModel):
+    """Cartesian product: every resume × every JD (text or library id) × every job type."""
+    job_types: List[str] = Field(default_factory=lambda: ["match"], description="Subset of: match, enhance, cover_letter")
+    resumes: List[str] = Field(..., min_length=1)
+    jds: List[str] = Field(default_factory=list)
+    jd_ids: List[str] = Field(default_factory=list, description="Library JDs (latest versions)")
+    priority: Literal["high", "normal", "low"] = Field(default="normal", description="Priority class of every expanded job")
+    slo_seconds: Optional[float] = Field(default=None, gt=0, description="SLO of every expanded job")
+
+class BulkJobRequest(BaseModel):
+    items: List[ResumeJDRequest] = Field(default_factory=list, description="Explicit (job_type, resume, jd) items")
+    matrix: Optional[JobMatrix] = Field(default=None, description="Expanded after `items`")
+
+class FastMatchRequest(BaseModel):
+    resume: str = Field(..., min_length=1, description="Plain text resume")
+    jd: str = Field(..., min_length=1, description="Plain text job description")
+
+class FastMatchResponse(BaseModel):
+    match_score: int
+    strengths: List[str]
+    gaps: List[str]
+    summary: str
+    skill_overlap: Dict[str, List[str]]
+    engine: str = "fast"
+
+class JDCreateRequest(BaseModel):
+    text: str = Field(..., min_length=1, description="Plain text job description")
+    title: Optional[str] = Field(default=None, description="Defaults to the first line of the text")
+    jd_id: Optional[str] = Field(default=None, pattern=r"^[A-Za-z0-9_-]{1,64}$", description="Add a new version to this JD (or create it with this id)")
+
+class JDRecord(BaseModel):
+    jd_id: str
+    version: int
+    title: str
+    digest: str
+    created_at: float
+    parse_status: str
+    skills: List[str] = Field(default_factory=list)
+    error: Optional[str] = None
+    text: Optional[str] = None
+    parsed: Optional[Dict[str, Any]] = None
+
+class JDCreateResponse(BaseModel):
+    jd: JDRecord
+    created: bool
+    parse_job_id: Optional[str] = None
+
+class JDListResponse(BaseModel):
+    total: int
+    items: List[JDRecord]
+
+class JobRecord(BaseModel):
+    job_id: str
+    job_type: str
+    status: str
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration_seconds: Optional[float] = None
+    model: Optional[str] = None
+    resume_hash: Optional[str] = None
+    jd_hash: Optional[str] = None
+    jd_id: Optional[str] = None
+    jd_version: Optional[int] = None
+    parent_job_id: Optional[str] = None
+    group_id: Optional[str] = None
+    score: Optional[int] = None
+    error: Optional[str] = None
+    artifacts: Optional[Dict[str, Any]] = None
+
+class JobListResponse(BaseModel):
+    jobs: List[JobRecord]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` for the next page; null on the last page")
 
 class PDFUploadResponse(BaseModel):
     extracted_text: str
@@ -26,13 +107,63 @@ class PDFUploadResponse(BaseModel):
 class JobSubmitResponse(BaseModel):
     job_id: str
 
+class BulkItemResult(BaseModel):
+    index: int
+    job_type: str
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkSubmitResponse(BaseModel):
+    group_id: Optional[str] = None
+    submitted: int
+    rejected: int
+    items: List[BulkItemResult]
+
 class JobStatusResponse(BaseModel):
     job_id: str
     status: JobState
     info: Optional[Dict[str, Any]] = None
+    artifacts: List[str] = Field(default_factory=list, description="Pre-rendered download formats")
+    artifacts_ready: bool = False
 
 class JobResultResponse(BaseModel):
     job_id: str
     status: JobState
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    artifacts: List[str] = Field(default_factory=list, description="Pre-rendered download formats")
+    artifacts_ready: bool = False
+
+class JobCancelResponse(BaseModel):
+    job_id: str
+    status: JobState
+    cancelled: bool = Field(..., description="False when the job had already finished")
+
+class JobExportRequest(BaseModel):
+    job_ids: List[str] = Field(..., min_length=1, max_length=1000, description="Jobs to include in the ZIP")
+    formats: List[str] = Field(default_factory=lambda: ["md", "json", "pdf"], description="Subset of: md, json, pdf")
+
+class GroupStatusResponse(BaseModel):
+    group_id: str
+    total: int
+    completed: int
+    succeeded: int
+    failed: int
+    pending: int
+    progress: float
+    jobs: List[JobResultResponse]
+
+class JobsStatusRequest(BaseModel):
+    job_ids: List[str] = Field(..., min_length=1, description="Job ids to resolve in one round-trip")
+    since: Optional[float] = Field(default=None, description="`cursor` from a previous response; finished jobs unchanged since then are omitted")
+
+class CompactJobStatus(BaseModel):
+    job_id: str
+    status: JobState
+    updated_at: Optional[float] = None
+    error: Optional[str] = None
+
+class JobsStatusResponse(BaseModel):
+    cursor: float
+    unchanged: int = 0
+    jobs: List[CompactJobStatus]
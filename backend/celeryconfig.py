@@ -2,6 +2,8 @@
 
 import os
 from kombu import Queue, Exchange
+from backend.app.config import settings
+from backend.app.core.result_codec import register_codec
 
 # redis is in another docker container
 # if it's not the case for you,
@@ -13,10 +15,19 @@ RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", BROKER_URL)
 broker_url = BROKER_URL
 result_backend = RESULT_BACKEND
 
+# Ten message priorities (0 first) instead of Redis' default four buckets: each LLM priority
+# class gets its own band, ordered by deadline inside it (backend.app.core.deadlines)
+broker_transport_options = {"priority_steps": list(range(10))}
+# Long tasks: reserve one at a time, so a job with an earlier deadline isn't stuck behind prefetched ones
+worker_prefetch_multiplier = 1
+
 
 task_serializer = "json"
-result_serializer = "json"
-accept_content = ["json"]
+# Compact result codec (json/msgpack + zlib/zstd above a size threshold); still reads legacy JSON
+result_serializer = register_codec()
+accept_content = ["json", result_serializer]
+result_accept_content = ["json", result_serializer]
+result_expires = settings.RESULT_TTL_DEFAULT  # per job type TTLs are applied after each run
 timezone = "UTC"
 enable_utc = True
 
@@ -24,14 +35,16 @@ enable_utc = True
 # Exchanges (direct for simple routing)
 
 default_exchange = Exchange("default", type="direct")
-llm_exchange = Exchange("llm", type="direct")
+llm_exchange = Exchange("llm", type="direct")  # llm_high / llm / llm_low: priority classes
 pdf_exchange = Exchange("pdf", type="direct")
 
 # Declare queues
 task_queues = (
     Queue("celery", exchange=default_exchange, routing_key="celery"),  # default
     Queue("default", exchange=default_exchange, routing_key="default"),
+    Queue("llm_high", exchange=llm_exchange, routing_key="llm_high"),
     Queue("llm", exchange=llm_exchange, routing_key="llm"),
+    Queue("llm_low", exchange=llm_exchange, routing_key="llm_low"),
     Queue("pdf", exchange=pdf_exchange, routing_key="pdf"),
 )
 
@@ -43,7 +56,38 @@ task_default_routing_key = "default"
 # We can optionally define task_routes if there is multiple tasks
 # Here we keep it minimal and mostly route from apply_async.
 task_routes = {
-    # Example (for dedicated PDF task):
-    # "run_pdf_parse": {"queue": "pdf", "routing_key": "pdf"},
+    # Artifact pre-rendering (linked after run_agent_job) stays off the LLM workers
+    "render_artifacts": {"queue": "pdf", "routing_key": "pdf"},
     # Our main agent task can default to llm via apply_async from code.
 }
+
+# -------- Periodic tasks (celery beat) --------
+beat_schedule = {}
+if settings.RESULT_ARCHIVE_DIR:
+    # Move old results out of Redis into the on-disk archive (a volume the API reads too)
+    beat_schedule["compact-results"] = {
+        "task": "compact_results",
+        "schedule": float(settings.RESULT_COMPACT_INTERVAL),
+        "options": {"queue": "default", "routing_key": "default"},
+    }
+if settings.JOB_ABANDON_SECONDS > 0:
+    # Cancel interactive jobs whose client stopped polling
+    beat_schedule["reap-abandoned-jobs"] = {
+        "task": "reap_abandoned_jobs",
+        "schedule": float(settings.JOB_REAP_INTERVAL),
+        "options": {"queue": "default", "routing_key": "default"},
+    }
+if settings.FAIR_SCHEDULING_ENABLED:
+    # Dispatch runs on submit and on job end; this catches slots freed by the TTL of lost jobs
+    beat_schedule["pump-fair-queues"] = {
+        "task": "pump_fair_queues",
+        "schedule": float(settings.FAIR_PUMP_INTERVAL),
+        "options": {"queue": "default", "routing_key": "default"},
+    }
+if settings.RESIDENCY_KEEPALIVE_INTERVAL > 0:
+    # Keep configured models loaded in Ollama during RESIDENCY_HOURS
+    beat_schedule["keep-models-warm"] = {
+        "task": "keep_models_warm",
+        "schedule": float(settings.RESIDENCY_KEEPALIVE_INTERVAL),
+        "options": {"queue": "default", "routing_key": "default"},
+    }
@@ -0,0 +1,62 @@
+# backend/tests/conftest.py
+
+from types import SimpleNamespace
+from backend.app.core import redis_client
+from backend.app.core.redis_client import get_redis
+from backend.tools.mock_ollama import serve
+import fakeredis
+import pytest
+import time
+import uuid
+
+MODEL = "ollama/qwen3"  # reported by Ollama as "qwen3:latest"
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    """Poll `predicate` until it holds (work finishing in other threads)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    """A fresh in-memory Redis (fakeredis, with Lua) behind get_redis() for every test."""
+    client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    get_redis.cache_clear()
+    monkeypatch.setattr(redis_client, "redis", SimpleNamespace(Redis=SimpleNamespace(from_url=lambda url: client)))
+    yield client
+    get_redis.cache_clear()
+
+
+@pytest.fixture
+def prefix():
+    """A Redis key prefix of this test's own."""
+    return f"jdm:test:{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def mock_host():
+    """Factory starting a MockOllamaServer on a free port: mock_host(latency=..., preload=True, fail_rate=...)."""
+    servers = []
+
+    def start(latency: float = 0.05, preload: bool = False, fail_rate: float = 0.0):
+        server, = serve(
+            [0],
+            models=["qwen3:latest"],
+            latency=latency,
+            load_latency=0.0,
+            fail_rate=fail_rate,
+            reply='{{"reply": "OK from {name}"}}',
+            preload={"qwen3:latest"} if preload else set(),
+        )
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,114 @@
+# backend/tests/test_artifacts.py
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.app.api import routes
+from backend.app.core.artifact_store import ArtifactStore
+import io
+import json
+import os
+import pytest
+import time
+import zipfile
+
+MATCH = {"status": "done", "result": {"match_score": 72, "strengths": ["Python"], "gaps": ["Go"],
+                                      "summary": "Good fit."}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path / "artifacts"), max_bytes=1024 * 1024, ttl_seconds=3600)
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    """The API router on a store of this test's own, with two finished jobs and one still running."""
+    results = {
+        "done-1": {"job_id": "done-1", "status": "SUCCESS", "result": MATCH, "error": None},
+        "done-2": {"job_id": "done-2", "status": "SUCCESS", "result": MATCH, "error": None},
+        "busy": {"job_id": "busy", "status": "STARTED", "result": None, "error": None},
+    }
+    monkeypatch.setattr(routes, "artifact_store", store)
+    monkeypatch.setattr(routes.queue, "get_result", lambda job_id: results.get(
+        job_id, {"job_id": job_id, "status": "PENDING", "result": None, "error": None}))
+    app = FastAPI()
+    app.include_router(routes.api_router)
+    return TestClient(app)
+
+
+def test_identical_content_is_stored_once(store):
+    a = store.put("job-a", "md", b"# Report", "a.md", "text/markdown")
+    b = store.put("job-b", "md", b"# Report", "b.md", "text/markdown")
+    assert a.path == b.path and a.etag == b.etag
+    assert store.get("job-b", "md").filename == "b.md"
+    assert store.available("job-a", ("md", "pdf")) == ["md"]
+
+
+def test_lru_entries_are_evicted_over_the_size_cap(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=250, ttl_seconds=3600, sweep_grace_seconds=0)
+    old = store.put("old", "md", b"o" * 100, "old.md", "text/markdown")
+    os.utime(store._index_path("old", "md"), (time.time() - 60, time.time() - 60))
+    store.put("mid", "md", b"m" * 100, "mid.md", "text/markdown")
+    store.put("new", "md", b"n" * 100, "new.md", "text/markdown")
+    assert store.get("old", "md") is None and not os.path.exists(old.path)
+    assert store.get("mid", "md") and store.get("new", "md")
+
+
+def test_sweep_keeps_a_blob_written_just_before_its_index(store):
+    # Another process's put() has written the blob but not yet its index entry
+    digest = "ab" * 32
+    blob = store._blob_path(digest)
+    os.makedirs(os.path.dirname(blob), exist_ok=True)
+    with open(blob, "wb") as f:
+        f.write(b"rendered")
+    store.evict()
+    assert os.path.exists(blob)
+
+    # Unreferenced past the grace period: swept
+    os.utime(blob, (time.time() - 3600, time.time() - 3600))
+    assert store.evict() == len(b"rendered") and not os.path.exists(blob)
+
+
+def test_put_of_known_content_restarts_its_grace_period(store):
+    first = store.put("job-a", "md", b"# Report", "a.md", "text/markdown")
+    os.utime(first.path, (time.time() - 3600, time.time() - 3600))
+    os.remove(store._index_path("job-a", "md"))  # now unreferenced, like an expired entry
+    store.put("job-b", "md", b"# Report", "b.md", "text/markdown")  # evicts, and must keep the blob
+    assert store.get("job-b", "md") is not None
+
+
+def test_download_has_an_etag_and_answers_304(client):
+    first = client.get("/job/done-1/download", params={"format": "json"})
+    assert first.status_code == 200 and json.loads(first.content)["result"]["match_score"] == 72
+    etag = first.headers["etag"]
+
+    again = client.get("/job/done-1/download", params={"format": "json"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag and not again.content
+    weak = client.get("/job/done-1/download", params={"format": "json"}, headers={"If-None-Match": f'"x", W/{etag}'})
+    assert weak.status_code == 304
+    stale = client.get("/job/done-1/download", params={"format": "json"}, headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200 and stale.content == first.content
+
+    assert client.get("/job/busy/download", params={"format": "md"}).status_code == 202
+
+
+def test_zip_export_round_trip(client):
+    response = client.post("/jobs/export", json={"job_ids": ["done-1", "busy", "done-2", "done-1"],
+                                                 "formats": ["json", "md"]})
+    assert response.status_code == 200 and response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+        manifest = json.loads(archive.read("manifest.json"))
+        exported = json.loads(archive.read("done-1/match_report_done-1.json"))
+
+    # Jobs once each, in request order; formats in the renderer's order
+    assert names == ["done-1/match_report_done-1.md", "done-1/match_report_done-1.json",
+                     "done-2/match_report_done-2.md", "done-2/match_report_done-2.json", "manifest.json"]
+    assert exported["result"]["match_score"] == 72
+    assert set(manifest["exported"]) == {"done-1", "done-2"}
+    assert set(manifest["skipped"]["busy"]) == {"json", "md"}
+
+    # The same bytes as a single download (served from the store this time)
+    single = client.get("/job/done-1/download", params={"format": "json"})
+    assert json.loads(single.content) == exported
@@ -0,0 +1,68 @@
+# backend/tests/test_autoscaler.py
+
+from backend.app.core.autoscaler import Autoscaler, QueueSignals, GROW, SHRINK, HOLD, parse_limits
+import pytest
+
+
+@pytest.fixture
+def scaler():
+    return Autoscaler(app=None, queues=("llm", "pdf"), limits={"llm": (1, 8)}, target_wait=60.0,
+                      scale_down_delay=300.0, cooldown=30.0, step_down=2)
+
+
+def _signals(depth=0, in_flight=0, concurrency=2, task_seconds=30.0, saturation=None, queue="llm"):
+    return QueueSignals(queue=queue, depth=depth, in_flight=in_flight, concurrency=concurrency,
+                        workers={"w1": concurrency}, task_seconds=task_seconds, saturation=saturation)
+
+
+def test_grows_to_drain_the_backlog_within_the_target_wait(scaler):
+    # 30s tasks: a process drains 2 per minute, so 6 waiting need 3 more processes
+    decision = scaler.decide(_signals(depth=6, in_flight=2), now=1000.0)
+    assert (decision.action, decision.current, decision.target) == (GROW, 2, 5)
+
+
+def test_desired_size_is_clamped_to_the_limits(scaler):
+    assert scaler.decide(_signals(depth=500, in_flight=2), now=1000.0).target == 8
+    assert scaler.decide(_signals(depth=0, in_flight=0, concurrency=1), now=2000.0).desired == 1
+
+
+def test_no_run_time_samples_means_one_task_per_process(scaler):
+    assert scaler.decide(_signals(depth=4, in_flight=1, task_seconds=None), now=1000.0).target == 5
+
+
+def test_growth_waits_for_the_cooldown(scaler):
+    assert scaler.decide(_signals(depth=6, in_flight=2), now=1000.0).action == GROW
+    held = scaler.decide(_signals(depth=10, in_flight=5, concurrency=5), now=1010.0)
+    assert held.action == HOLD and "(cooldown)" in held.reason
+    assert scaler.decide(_signals(depth=10, in_flight=5, concurrency=5), now=1031.0).action == GROW
+
+
+def test_saturated_llm_backend_blocks_growth(scaler):
+    decision = scaler.decide(_signals(depth=20, in_flight=2, saturation=0.95), now=1000.0)
+    assert decision.action == HOLD and decision.desired == 2 and "llm_saturation=0.95" in decision.reason
+    assert scaler.decide(_signals(depth=20, in_flight=2, saturation=0.5), now=1000.0).action == GROW
+
+
+def test_shrinks_stepwise_after_the_scale_down_delay(scaler):
+    idle = _signals(depth=0, in_flight=0, concurrency=6)
+    first = scaler.decide(idle, now=1000.0)
+    assert first.action == HOLD and "scale-down delay" in first.reason
+    assert scaler.decide(idle, now=1200.0).action == HOLD
+    shrink = scaler.decide(idle, now=1300.0)
+    assert (shrink.action, shrink.target) == (SHRINK, 4)  # step_down at a time, not straight to 1
+
+    # A busy tick in between restarts the delay
+    scaler.decide(_signals(depth=0, in_flight=0, concurrency=4), now=1400.0)
+    scaler.decide(_signals(depth=0, in_flight=4, concurrency=4), now=1500.0)
+    assert scaler.decide(_signals(depth=0, in_flight=0, concurrency=4), now=1700.0).action == HOLD
+
+
+def test_queue_without_workers_is_left_alone(scaler):
+    signals = QueueSignals(queue="pdf", depth=50, in_flight=0, concurrency=0, workers={}, task_seconds=1.0)
+    decision = scaler.decide(signals, now=1000.0)
+    assert decision.action == HOLD and decision.reason == "no workers consume the queue"
+
+
+def test_parse_limits():
+    assert parse_limits("llm=1:8, pdf=2:4,bad,x=3") == {"llm": (1, 8), "pdf": (2, 4)}
+    assert parse_limits("llm=4:2") == {"llm": (4, 4)}
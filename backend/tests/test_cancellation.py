@@ -0,0 +1,131 @@
+# backend/tests/test_cancellation.py
+
+from concurrent.futures import ThreadPoolExecutor
+from crewai.llms.base_llm import BaseLLM
+from backend.app.core.cancellable_llm import CancellableLLM
+from backend.app.core.cancellation import CancellationRegistry, JobCancelled
+from backend.app.core.llm_limiter import AdaptiveLimiter, LimitedLLM
+from backend.app.core.llm_pool import LLMEndpointPool
+from backend.tests.conftest import wait_for
+import pytest
+import threading
+import time
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class BlockingLLM(BaseLLM):
+    """Answers once `release` is set, like a host still generating."""
+
+    def __init__(self):
+        super().__init__(model="ollama/qwen3")
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def call(self, messages, **kwargs):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(10)
+        return "answer"
+
+
+@pytest.fixture
+def registry(prefix):
+    return CancellationRegistry(ttl_seconds=60, abandon_seconds=30, prefix=prefix)
+
+
+def _cancel_soon(registry, job_id, inner, delay=0.1):
+    def cancel():
+        inner.started.wait(5)
+        time.sleep(delay)
+        registry.request(job_id)
+
+    threading.Thread(target=cancel, daemon=True).start()
+
+
+def test_flag_is_seen_by_check_in_scope_and_in_helper_threads(registry):
+    registry.request("job-1", reason="user")
+    assert registry.reason("job-1") == "user" and registry.reason("job-2") is None
+    registry.check()  # outside any job: nothing to check
+    with registry.scope("job-1"):
+        with pytest.raises(JobCancelled):
+            registry.check()
+        with ThreadPoolExecutor(1) as pool:
+            assert pool.submit(registry.propagate(registry.current)).result() == "job-1"
+            assert pool.submit(registry.current).result() is None
+    with registry.scope("job-2"):
+        registry.check()
+
+
+def test_only_watched_jobs_become_abandoned(registry):
+    registry.watch("polled")
+    registry.watch("silent")
+    registry.touch(["polled", "never-watched"], ahead=60)
+    now = time.time() + registry.abandon_seconds + 1
+    assert registry.abandoned(now) == ["silent"]
+    registry.request("silent", reason="abandoned")
+    assert registry.abandoned(now) == []
+
+
+def test_no_abandonment_tracking_when_off(prefix):
+    registry = CancellationRegistry(ttl_seconds=60, abandon_seconds=0, prefix=prefix)
+    registry.watch("job-1")
+    assert registry.abandoned(time.time() + 3600) == []
+
+
+def test_call_outside_a_job_runs_inline(registry):
+    inner = BlockingLLM()
+    inner.release.set()
+    assert CancellableLLM(inner, registry, poll_seconds=0.05).call(MESSAGES) == "answer"
+
+
+def test_cancelled_job_makes_no_call(registry):
+    inner = BlockingLLM()
+    registry.request("job-1")
+    with registry.scope("job-1"), pytest.raises(JobCancelled):
+        CancellableLLM(inner, registry, poll_seconds=0.05).call(MESSAGES)
+    assert inner.calls == 0
+
+
+def test_cancel_mid_call_frees_the_worker_but_holds_the_permit_until_the_host_is_done(redis, registry, prefix):
+    inner = BlockingLLM()
+    limiter = AdaptiveLimiter(prefix=prefix, initial=4)
+    llm = LimitedLLM(CancellableLLM(inner, registry, poll_seconds=0.05), limiter, "http://host")
+    permits, _ = limiter._keys("http://host", inner.model)
+    _cancel_soon(registry, "job-1", inner)
+    started = time.monotonic()
+    with registry.scope("job-1"), pytest.raises(JobCancelled) as raised:
+        llm.call(MESSAGES)
+    assert time.monotonic() - started < 2
+    assert raised.value.abandoned is not None
+    assert redis.zcard(permits) == 1  # the host is still generating the abandoned answer
+    inner.release.set()
+    assert wait_for(lambda: redis.zcard(permits) == 0)
+
+
+def test_cancel_mid_call_holds_the_pool_lease_until_the_host_is_done(registry, prefix):
+    inner = BlockingLLM()
+    pool = LLMEndpointPool(["http://host-a"], prefix=prefix)
+    llm = CancellableLLM(inner, registry, poll_seconds=0.05)
+    _cancel_soon(registry, "job-1", inner)
+    with registry.scope("job-1"), pytest.raises(JobCancelled) as raised:
+        with pool.lease("ollama/qwen3"):
+            llm.call(MESSAGES)
+    assert [s.in_flight for s in pool.states()] == [1]
+    inner.release.set()
+    assert wait_for(lambda: [s.in_flight for s in pool.states()] == [0])
+
+
+def test_stop_event_cancels_only_the_work_under_it(registry):
+    stop = threading.Event()
+    inner = BlockingLLM()
+    llm = CancellableLLM(inner, registry, poll_seconds=0.05)
+    with ThreadPoolExecutor(1) as pool:
+        attempt = pool.submit(registry.propagate(llm.call, stop=stop), MESSAGES)
+        assert inner.started.wait(5)
+        stop.set()
+        with pytest.raises(JobCancelled, match="superseded"):
+            attempt.result(2)
+    inner.release.set()
+    registry.check()  # the caller itself carries on
@@ -0,0 +1,99 @@
+# backend/tests/test_deadlines.py
+
+from backend.app.config import settings
+from backend.app.core.deadlines import DeadlinePlanner, message_priority, resolve_deadline, FULL, SMALL, FAST, DROP
+from backend.app.core.metrics import metrics, percentile
+import pytest
+
+NOW = 1_000_000.0
+
+
+@pytest.fixture
+def planner():
+    return DeadlinePlanner(percentile=0.75, min_samples=5)
+
+
+@pytest.fixture
+def fallback(monkeypatch):
+    """A fallback model other than the final stages' model."""
+    monkeypatch.setattr(settings, "LLM_FALLBACK_MODEL_NAME", "qwen3:0.6b")
+    monkeypatch.setattr(settings, "LLM_MODEL_NAME", "qwen3:14b")
+
+
+def _runs(job_type, engine, seconds):
+    for value in seconds:
+        metrics.observe("job_seconds", value, {"job_type": job_type, "engine": engine})
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 0.5) is None
+    assert percentile([5.0, 1.0, 3.0, 2.0, 4.0], 0.75) == 4.0
+    assert percentile([7.0], 0.99) == 7.0
+
+
+def test_deadline_and_slo_earliest_wins():
+    assert resolve_deadline(None, None, now=NOW) is None
+    assert resolve_deadline(NOW + 100, 30, now=NOW) == NOW + 30
+    assert resolve_deadline(NOW + 10, 30, now=NOW) == NOW + 10
+
+
+def test_priority_bands_by_class_then_slack():
+    assert message_priority("high", NOW + 30, now=NOW) == 0
+    assert message_priority("high", None, now=NOW) == 2
+    assert message_priority("normal", NOW + 30, now=NOW) == 3
+    assert message_priority("normal", NOW + 600, now=NOW) == 5
+    assert message_priority("low", NOW + 30, now=NOW) == 7
+    assert message_priority("low", NOW + 10_000, now=NOW) == 9
+    # Bands never overlap: a relaxed high job still goes before an urgent normal one
+    assert message_priority("high", NOW + 10_000, now=NOW) < message_priority("normal", NOW, now=NOW)
+
+
+def test_without_samples_only_expired_jobs_are_dropped(planner):
+    _runs("match", FULL, [100.0] * 4)  # below min_samples
+    assert planner.plan("match", NOW + 1, now=NOW)[0] == FULL
+    assert planner.plan("match", NOW - 1, now=NOW)[0] == DROP
+
+
+def test_full_run_when_it_fits(planner):
+    _runs("enhance", FULL, [10, 20, 30, 40, 50, 60, 70, 80])
+    assert planner.estimate("enhance") == 60
+    assert planner.plan("enhance", NOW + 61, now=NOW)[0] == FULL
+
+
+def test_downgrade_to_the_fallback_model_then_fast_scorer(planner, fallback):
+    _runs("match", FULL, [100.0] * 6)
+    _runs("match", SMALL, [40.0] * 6)
+    engine, reason = planner.plan("match", NOW + 60, now=NOW)
+    assert engine == SMALL and "~100s" in reason
+    # Not even the small model fits: match jobs still get the taxonomy score
+    assert planner.plan("match", NOW + 20, now=NOW)[0] == FAST
+
+
+def test_jobs_without_a_cheaper_engine_are_dropped(planner, fallback):
+    _runs("cover_letter", FULL, [100.0] * 6)
+    _runs("cover_letter", SMALL, [50.0] * 6)
+    assert planner.plan("cover_letter", NOW + 60, now=NOW)[0] == SMALL
+    assert planner.plan("cover_letter", NOW + 20, now=NOW)[0] == DROP
+
+
+def test_no_fallback_model_skips_the_small_engine(planner, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_FALLBACK_MODEL_NAME", "")
+    _runs("match", FULL, [100.0] * 6)
+    assert planner.plan("match", NOW + 60, now=NOW)[0] == FAST
+    _runs("enhance", FULL, [100.0] * 6)
+    assert planner.plan("enhance", NOW + 60, now=NOW)[0] == DROP
+
+
+def test_drop_action_never_downgrades(planner, fallback):
+    _runs("match", FULL, [100.0] * 6)
+    assert planner.plan("match", NOW + 60, action="drop", now=NOW)[0] == DROP
+    assert DeadlinePlanner(min_samples=5, action="drop").plan("match", NOW + 60, now=NOW)[0] == DROP
+    assert planner.plan("match", NOW + 200, action="drop", now=NOW)[0] == FULL
+
+
+def test_outcomes_are_recorded(planner):
+    planner.record("match", FULL, 12.0, deadline=None)
+    planner.record("match", DROP, 0.0, deadline=NOW)
+    counters = metrics.snapshot()["counters"]
+    assert counters["deadline_outcomes{engine=drop,job_type=match,outcome=dropped}"] == 1
+    assert metrics.samples("job_seconds", {"job_type": "match", "engine": FULL}) == [12.0]
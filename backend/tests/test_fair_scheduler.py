@@ -0,0 +1,121 @@
+# backend/tests/test_fair_scheduler.py
+
+from types import SimpleNamespace
+from backend.app.core.fair_scheduler import FairScheduler, INTERACTIVE, BATCH
+from backend.worker.worker import celery_app
+from celery import signature
+import pytest
+import uuid
+
+QUANTUM = 10.0  # equal to a job's cost (no run-time samples yet): one job per turn
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Job ids in the order the scheduler sent them to the broker."""
+    sent = []
+    monkeypatch.setattr(celery_app, "signature", lambda sig: SimpleNamespace(
+        apply_async=lambda: sent.append(sig["options"]["task_id"])))
+    return sent
+
+
+def _scheduler(prefix, window=4, max_inflight=10, **kwargs) -> FairScheduler:
+    return FairScheduler(window=window, max_inflight=max_inflight, quantum=QUANTUM,
+                         inflight_ttl=600, prefix=prefix, **kwargs)
+
+
+def _submit(scheduler, tenant, n=1, job_class=INTERACTIVE, priority=4):
+    ids = []
+    for _ in range(n):
+        job_id = f"{tenant}-{uuid.uuid4().hex[:6]}"
+        scheduler.enqueue(signature("run_job", task_id=job_id), job_class, tenant, "match", priority=priority)
+        ids.append(job_id)
+    return ids
+
+
+def _tenant(job_id: str) -> str:
+    return job_id.split("-", 1)[0]
+
+
+def test_tenants_take_turns_however_many_jobs_each_queued(prefix, broker, monkeypatch):
+    monkeypatch.setattr(FairScheduler, "_cost", staticmethod(lambda job_type: QUANTUM))
+    scheduler = _scheduler(prefix)
+    _submit(scheduler, "bulk", 20)
+    _submit(scheduler, "small", 2)
+    _submit(scheduler, "other", 2)
+
+    assert scheduler.pump() == 4
+    assert sorted(map(_tenant, broker)) == ["bulk", "bulk", "other", "small"]
+    assert scheduler.pending() == 20
+
+
+def test_weights_scale_a_tenants_share(prefix, broker, monkeypatch):
+    monkeypatch.setattr(FairScheduler, "_cost", staticmethod(lambda job_type: QUANTUM))
+    scheduler = _scheduler(prefix, window=9, weights={"gold": 2.0})
+    _submit(scheduler, "gold", 10)
+    _submit(scheduler, "basic", 10)
+
+    scheduler.pump()
+    assert [_tenant(j) for j in broker].count("gold") == 6
+
+
+def test_urgent_band_is_served_across_tenants_before_drr(prefix, broker):
+    scheduler = _scheduler(prefix, window=2)
+    relaxed = _submit(scheduler, "early", 3, priority=5)  # at the head of the ring
+    urgent = _submit(scheduler, "late", 1, priority=1)
+    high = _submit(scheduler, "third", 1, priority=0)
+
+    scheduler.pump()
+    assert broker == high + urgent
+    assert scheduler.pending() == len(relaxed)
+
+
+def test_interactive_jobs_take_slots_before_batch_jobs(prefix, broker):
+    scheduler = _scheduler(prefix, window=2)
+    _submit(scheduler, "nightly", 3, job_class=BATCH, priority=0)
+    interactive = _submit(scheduler, "web", 2, priority=8)
+
+    scheduler.pump()
+    assert broker == interactive
+
+
+def test_tenant_cap_and_release(prefix, broker):
+    scheduler = _scheduler(prefix, window=10, max_inflight=2, limits={"vip": 3})
+    first = _submit(scheduler, "acme", 5)
+    _submit(scheduler, "vip", 5)
+
+    scheduler.pump()
+    assert [_tenant(j) for j in broker].count("acme") == 2
+    assert [_tenant(j) for j in broker].count("vip") == 3
+
+    scheduler.release(first[0])  # a finished job frees its tenant's slot
+    assert [_tenant(j) for j in broker].count("acme") == 3
+
+
+def test_discarded_job_is_never_sent(prefix, broker):
+    scheduler = _scheduler(prefix, window=1)
+    kept, dropped = _submit(scheduler, "acme", 2)
+    assert scheduler.discard(dropped)
+    scheduler.pump()
+    scheduler.release(kept)
+    assert broker == [kept] and scheduler.pending() == 0
+    assert not scheduler.discard(kept)
+
+
+def test_pump_leaves_a_lock_taken_over_by_another_pump(prefix, broker, redis, monkeypatch):
+    scheduler = _scheduler(prefix)
+    lock = scheduler._key("lock")
+
+    def slow_dispatch(r):
+        # This pump's lock expired mid-round and another pump took it
+        r.set(lock, "other-token")
+        return 0
+
+    monkeypatch.setattr(scheduler, "_dispatch", slow_dispatch)
+    scheduler.pump()
+    assert redis.get(lock) == b"other-token"
+
+    monkeypatch.delattr(scheduler, "_dispatch")
+    redis.delete(lock)
+    _submit(scheduler, "acme", 1)
+    assert scheduler.pump() == 1 and redis.get(lock) is None
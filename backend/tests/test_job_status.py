@@ -0,0 +1,85 @@
+# backend/tests/test_job_status.py
+
+from fastapi import HTTPException
+from celery.result import AsyncResult, GroupResult
+from backend.app.api import routes
+from backend.app.config import settings
+from backend.app.core import async_queue
+from backend.app.models.job_models import JobsStatusRequest
+from backend.worker.worker import celery_app
+import inspect
+import pytest
+import time
+
+MATCH = {"status": "done", "result": {"match_score": 64, "strengths": [], "gaps": [], "summary": "ok"}}
+
+
+@pytest.fixture
+def backend(redis, monkeypatch):
+    """Celery's Redis result backend, on the test's fakeredis."""
+    backend = celery_app.backend
+    monkeypatch.setattr(backend, "client", redis)
+    return backend
+
+
+def _finish(backend, done=(), failed=(), revoked=()):
+    for job_id in done:
+        backend.mark_as_done(job_id, MATCH)
+    for job_id in failed:
+        backend.mark_as_failure(job_id, RuntimeError("model unavailable"))
+    for job_id in revoked:
+        backend.mark_as_revoked(job_id, "cancelled (user)")
+
+
+def test_group_status_aggregates_its_jobs(backend):
+    ids = ["g-ok", "g-failed", "g-cancelled", "g-queued"]
+    GroupResult("grp-1", [AsyncResult(i, app=celery_app) for i in ids], app=celery_app).save()
+    _finish(backend, done=["g-ok"], failed=["g-failed"], revoked=["g-cancelled"])
+
+    status = routes.group_status("grp-1")
+    assert (status.total, status.completed, status.succeeded, status.failed, status.pending) == (4, 3, 1, 2, 1)
+    assert status.progress == pytest.approx(0.75)
+    assert [job.job_id for job in status.jobs] == ids  # submission order
+    assert status.jobs[0].result == MATCH
+    assert "model unavailable" in status.jobs[1].error
+    assert status.jobs[3].status == "PENDING"
+
+    with pytest.raises(HTTPException) as e:
+        routes.group_status("no-such-group")
+    assert e.value.status_code == 404
+
+
+def test_batch_status_in_one_call_and_only_changes_since_the_cursor(backend):
+    _finish(backend, done=["b-ok"], failed=["b-failed"])
+    first = routes.jobs_status(JobsStatusRequest(job_ids=["b-ok", "b-failed", "b-queued", "b-ok"]))
+    assert [(j.job_id, j.status) for j in first.jobs] == [("b-ok", "SUCCESS"), ("b-failed", "FAILURE"),
+                                                          ("b-queued", "PENDING")]
+    assert first.jobs[0].updated_at == pytest.approx(time.time(), abs=5)
+    assert "model unavailable" in first.jobs[1].error and first.jobs[0].error is None
+
+    # Past the clock-skew margin: jobs finished before the cursor are left out, unfinished ones never are
+    since = first.cursor + async_queue._CURSOR_SKEW_SECONDS + 1
+    later = routes.jobs_status(JobsStatusRequest(job_ids=["b-ok", "b-failed", "b-queued"], since=since))
+    assert [j.job_id for j in later.jobs] == ["b-queued"] and later.unchanged == 2
+
+    # Within the margin, a job that just finished is still reported
+    recent = routes.jobs_status(JobsStatusRequest(job_ids=["b-ok"], since=first.cursor))
+    assert [j.job_id for j in recent.jobs] == ["b-ok"]
+
+
+def test_batch_status_caps_the_number_of_ids(backend, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_STATUS_MAX_IDS", 2)
+    assert len(routes.jobs_status(JobsStatusRequest(job_ids=["a", "b", "a"])).jobs) == 2
+    with pytest.raises(HTTPException) as e:
+        routes.jobs_status(JobsStatusRequest(job_ids=["a", "b", "c"]))
+    assert e.value.status_code == 413
+
+
+def test_status_handlers_are_sync(backend):
+    # Handlers doing blocking Redis calls run in FastAPI's threadpool, off the event loop
+    for handler in (routes.job_status, routes.job_result, routes.job_wait, routes.jobs_status,
+                    routes.group_status, routes.submit_job, routes.submit_jobs):
+        assert not inspect.iscoroutinefunction(handler), handler.__name__
+    _finish(backend, done=["s-ok"])
+    assert routes.job_status("s-ok").status == "SUCCESS"
+    assert routes.job_result("s-ok").result == MATCH
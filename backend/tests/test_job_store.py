@@ -0,0 +1,160 @@
+# backend/tests/test_job_store.py
+
+from backend.app.core.job_store import COLUMNS, InvalidCursor, JobStore, _decode_cursor, _encode_cursor
+import base64
+import json
+import pytest
+
+# 30 jobs, three per timestamp, so pages also have to break ties on job_id
+JOBS = [
+    {
+        "job_id": f"job-{i:02d}",
+        "job_type": "match" if i % 2 else "parse",
+        "submitted_at": 1000.0 + i // 3,
+        "jd_id": "jd-a" if i < 15 else "jd-b",
+        "group_id": "grp-1" if i % 5 == 0 else None,
+    }
+    for i in range(30)
+]
+
+
+def _newest_first(jobs):
+    return [j["job_id"] for j in sorted(jobs, key=lambda j: (j["submitted_at"], j["job_id"]), reverse=True)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(f"sqlite:///{tmp_path / 'jobs.sqlite3'}")
+    store.record_submitted(JOBS)
+    for i, job in enumerate(JOBS):
+        if job["job_type"] == "match":
+            store.record_finished(job["job_id"], "SUCCESS", score=i * 3)
+        elif i % 4 == 0:
+            store.record_finished(job["job_id"], "FAILURE", error="boom")
+    return store
+
+
+def _all_pages(store, limit, **kwargs):
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = store.list_jobs(limit=limit, cursor=cursor, **kwargs)
+        ids += [row["job_id"] for row in rows]
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7, 30, 50])
+def test_pages_cover_every_job_once_newest_first(store, limit):
+    ids, pages = _all_pages(store, limit)
+    assert ids == _newest_first(JOBS)
+    assert pages == max(1, -(-len(JOBS) // limit))
+
+
+def test_last_full_page_has_no_cursor(store):
+    rows, cursor = store.list_jobs(limit=len(JOBS))
+    assert len(rows) == len(JOBS) and cursor is None
+
+
+def test_pages_are_stable_under_new_submissions(store):
+    first, cursor = store.list_jobs(limit=10)
+    store.record_submitted([{"job_id": "job-new", "job_type": "match", "submitted_at": 5000.0}])
+    ids = [row["job_id"] for row in first]
+    while cursor:
+        rows, cursor = store.list_jobs(limit=10, cursor=cursor)
+        ids += [row["job_id"] for row in rows]
+    assert ids == _newest_first(JOBS)
+
+
+def test_cursor_round_trip():
+    row = {"submitted_at": 1234.5, "job_id": "job-07"}
+    cursor = _encode_cursor(row)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (1234.5, "job-07")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(json.dumps([1, 2, 3]).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps(["soon", "job-01"]).encode()).decode(),
+])
+def test_malformed_cursor_is_rejected(store, cursor):
+    with pytest.raises(InvalidCursor):
+        store.list_jobs(cursor=cursor)
+
+
+def test_unknown_filter_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.list_jobs(score=1)
+
+
+@pytest.mark.parametrize("kwargs, expected", [
+    ({"job_type": "match"}, lambda j: j["job_type"] == "match"),
+    ({"status": "FAILURE"}, lambda j: j["job_type"] == "parse" and int(j["job_id"][4:]) % 4 == 0),
+    ({"jd_id": "jd-b"}, lambda j: j["jd_id"] == "jd-b"),
+    ({"group_id": "grp-1"}, lambda j: j["group_id"] == "grp-1"),
+    ({"since": 1003.0, "until": 1006.0}, lambda j: 1003.0 <= j["submitted_at"] < 1006.0),
+    ({"min_score": 45}, lambda j: j["job_type"] == "match" and int(j["job_id"][4:]) * 3 >= 45),
+    ({"job_type": "match", "jd_id": "jd-a", "min_score": 10},
+     lambda j: j["job_type"] == "match" and j["jd_id"] == "jd-a" and int(j["job_id"][4:]) * 3 >= 10),
+    ({"model": "none"}, lambda j: False),
+])
+def test_filters_paginate(store, kwargs, expected):
+    ids, _ = _all_pages(store, 4, **kwargs)
+    assert ids == _newest_first([j for j in JOBS if expected(j)])
+
+
+def test_rows_carry_all_columns(store):
+    store.record_artifacts("job-01", {"pdf": "a1"})
+    row = store.get("job-01")
+    assert set(row) == set(COLUMNS)
+    assert row["status"] == "SUCCESS" and row["score"] == 3 and row["artifacts"] == {"pdf": "a1"}
+    assert row["duration_seconds"] is None  # finished without ever starting (e.g. cancelled while queued)
+
+
+def test_duration_is_run_time_not_queue_wait(tmp_path, monkeypatch):
+    store = JobStore(f"sqlite:///{tmp_path / 'jobs.sqlite3'}")
+    clock = iter([100.0, 130.0, 142.5])
+    monkeypatch.setattr("backend.app.core.job_store.time.time", lambda: next(clock))
+    store.record_submitted([{"job_id": "job-q", "job_type": "match"}])
+    store.record_started("job-q")
+    store.record_finished("job-q", "SUCCESS")
+    row = store.get("job-q")
+    assert (row["submitted_at"], row["started_at"], row["finished_at"]) == (100.0, 130.0, 142.5)
+    assert row["duration_seconds"] == 12.5
+
+
+# ---------- Query plans ----------
+def _plans(store, monkeypatch, **kwargs):
+    """EXPLAIN QUERY PLAN of the statements list_jobs() runs for a first and a second page."""
+    statements = []
+    query = store._query
+
+    def capture(sql, params):
+        statements.append((sql, params))
+        return query(sql, params)
+
+    monkeypatch.setattr(store, "_query", capture)
+    _, cursor = store.list_jobs(limit=2, **kwargs)
+    assert cursor
+    store.list_jobs(limit=2, cursor=cursor, **kwargs)
+    conn = store._connect()
+    return [" | ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)) for sql, params in statements]
+
+
+@pytest.mark.parametrize("kwargs, index", [
+    ({}, "ix_jobs_submitted"),
+    ({"since": 1001.0, "until": 1008.0}, "ix_jobs_submitted"),
+    ({"job_type": "match"}, "ix_jobs_type_submitted"),
+    ({"status": "SUCCESS"}, "ix_jobs_status_submitted"),
+    ({"jd_id": "jd-a"}, "ix_jobs_jd_id_submitted"),
+    ({"min_score": 10}, "ix_jobs_scored_submitted"),
+])
+def test_listings_walk_an_index_in_order(store, monkeypatch, kwargs, index):
+    first, second = _plans(store, monkeypatch, **kwargs)
+    for plan in (first, second):
+        assert f"USING INDEX {index}" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan  # rows come out of the index already sorted
+    # A later page seeks to the cursor rather than scanning down to it
+    assert second.startswith("SEARCH"), second
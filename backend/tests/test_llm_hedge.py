@@ -0,0 +1,90 @@
+# backend/tests/test_llm_hedge.py
+
+from crewai import LLM
+from backend.app.config import LLMStageConfig
+from backend.app.core.llm_clients import LLMClientRegistry
+from backend.app.core.llm_hedge import HedgeBudget, HedgedLLM
+from backend.app.core.llm_pool import LLMEndpointPool
+from backend.app.core.metrics import metrics
+from backend.app.core.pooled_llm import PooledLLM
+from backend.tests.conftest import MODEL, wait_for
+import time
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+HEDGE_DELAY = 0.2
+
+
+def _hedged(inner, budget) -> HedgedLLM:
+    # Too few latency samples ever: the hedge fires after max_delay
+    return HedgedLLM(inner, budget, min_samples=10**9, min_delay=HEDGE_DELAY, max_delay=HEDGE_DELAY)
+
+
+def _pooled(prefix, *hosts):
+    pool = LLMEndpointPool([h.url for h in hosts], prefix=prefix, probe_timeout=1.0)
+    pool.refresh(force=True)
+    cfg = LLMStageConfig(model_id=MODEL, base_url=pool.urls[0], base_urls=tuple(pool.urls),
+                         api_key="ollama", temperature=0.0, timeout=10)
+    return PooledLLM(cfg, pool, wrap=LLMClientRegistry._host_client)  # the per-host chain workers use
+
+
+def _single(host):
+    return LLMClientRegistry._host_client(
+        LLM(model=MODEL, base_url=host.url, api_key="ollama", temperature=0.0, timeout=10), host.url)
+
+
+def _hedges(redis, prefix) -> int:
+    return sum(int(redis.get(k) or 0) for k in redis.scan_iter(f"{prefix}:hedges:*"))
+
+
+def test_fast_call_is_not_hedged(redis, prefix, mock_host):
+    host = mock_host(latency=0.01)
+    llm = _hedged(_single(host), HedgeBudget(1.0, prefix=prefix))
+    assert host.name in llm.call(MESSAGES)
+    assert host.calls == 1 and _hedges(redis, prefix) == 0
+
+
+def test_slow_call_is_hedged_on_another_host_and_the_loser_stopped(redis, prefix, mock_host):
+    slow, fast = mock_host(latency=1.5, preload=True), mock_host(latency=0.05)
+    inner = _pooled(prefix, slow, fast)
+    llm = _hedged(inner, HedgeBudget(1.0, prefix=prefix))
+    started = time.monotonic()
+    answer = llm.call(MESSAGES)
+    elapsed = time.monotonic() - started
+    assert fast.name in answer
+    assert HEDGE_DELAY <= elapsed < 1.0
+    assert (slow.calls, fast.calls) == (1, 1) and _hedges(redis, prefix) == 1
+    # The loser is stopped at once, but the slow host still works on it: its lease ends when it returns
+    abandoned = lambda: metrics.snapshot()["counters"].get("llm_calls_abandoned{reason=superseded}")
+    assert wait_for(lambda: abandoned() == 1, timeout=0.5)
+    in_flight = lambda: {s.url: s.in_flight for s in inner.pool.states()}
+    assert in_flight()[slow.url] == 1
+    assert wait_for(lambda: in_flight() == {slow.url: 0, fast.url: 0})
+    assert slow.calls == 1  # no failover or retry for the loser
+
+
+def test_primary_answer_wins_if_it_arrives_first(redis, prefix, mock_host):
+    # Same host for both attempts: the primary is ahead by the hedge delay
+    host = mock_host(latency=0.5)
+    llm = _hedged(_single(host), HedgeBudget(1.0, prefix=prefix))
+    started = time.monotonic()
+    assert host.name in llm.call(MESSAGES)
+    assert time.monotonic() - started < 0.5 + HEDGE_DELAY
+    assert _hedges(redis, prefix) == 1
+    assert wait_for(lambda: host.calls == 2)
+
+
+def test_no_hedge_without_budget(redis, prefix, mock_host):
+    slow, fast = mock_host(latency=0.6, preload=True), mock_host(latency=0.05)
+    llm = _hedged(_pooled(prefix, slow, fast), HedgeBudget(0.0, prefix=prefix))
+    assert slow.name in llm.call(MESSAGES)
+    assert (slow.calls, fast.calls) == (1, 0) and _hedges(redis, prefix) == 0
+
+
+def test_budget_caps_hedges_per_call(redis, prefix, mock_host):
+    # ratio 0.5: calls 1 and 3 find the budget spent, calls 2 and 4 get a hedge
+    host = mock_host(latency=0.4)
+    llm = _hedged(_single(host), HedgeBudget(0.5, prefix=prefix))
+    for _ in range(4):
+        llm.call(MESSAGES)
+    assert _hedges(redis, prefix) == 2
+    assert wait_for(lambda: host.calls == 6)
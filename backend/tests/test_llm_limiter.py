@@ -0,0 +1,89 @@
+# backend/tests/test_llm_limiter.py
+
+from backend.app.core.llm_limiter import AdaptiveLimiter, ConcurrencyLimitTimeout
+import pytest
+
+BACKEND, MODEL = "http://host", "ollama/qwen3"
+PARSE, LETTER = "Resume Parsing Specialist", "Cover Letter Writer"
+
+
+@pytest.fixture
+def limiter(prefix):
+    return AdaptiveLimiter(prefix=prefix, initial=4, min_limit=1, max_limit=16, acquire_timeout=0.2)
+
+
+def _limit(redis, limiter) -> float:
+    _, state = limiter._keys(BACKEND, MODEL)
+    return float(redis.hget(state, "limit") or limiter.initial)
+
+
+def _call(limiter, outcome="ok", latency=1.0, stage=PARSE):
+    member = limiter._acquire(BACKEND, MODEL)
+    limiter._release(BACKEND, MODEL, member, outcome, latency, stage)
+
+
+def test_permits_are_capped_at_the_limit(redis, limiter):
+    held = [limiter._acquire(BACKEND, MODEL) for _ in range(4)]
+    with pytest.raises(ConcurrencyLimitTimeout):
+        limiter._acquire(BACKEND, MODEL)
+    limiter._release(BACKEND, MODEL, held.pop(), "other", 1.0)
+    assert limiter._acquire(BACKEND, MODEL)
+
+
+def test_successes_grow_the_limit_additively(redis, limiter):
+    for _ in range(8):
+        _call(limiter)
+    assert 5.5 < _limit(redis, limiter) < 6.5  # +1/limit per call: about +1 per window
+
+
+def test_mixed_length_workload_after_a_warmup_is_not_congestion(redis, limiter):
+    # A 16-token warmup, then short parses and long cover letters on the same (backend, model)
+    _call(limiter, latency=0.3, stage=None)
+    for i in range(31):
+        _call(limiter, latency=8.0, stage=PARSE) if i % 2 else _call(limiter, latency=25.0, stage=LETTER)
+    assert _limit(redis, limiter) > limiter.initial
+
+
+def test_mixed_lengths_within_a_stage_never_cut_the_limit(redis, limiter):
+    for i in range(31):
+        _call(limiter, latency=2.0 if i % 3 else 25.0)
+    assert _limit(redis, limiter) >= limiter.initial
+
+
+def test_queueing_latency_stops_the_growth(redis, limiter):
+    for _ in range(3):
+        _call(limiter, latency=1.0)
+    grown = _limit(redis, limiter)
+    for _ in range(10):
+        _call(limiter, latency=10.0)
+    assert grown <= _limit(redis, limiter) < grown + 0.5
+
+
+def test_overload_cuts_once_per_admitted_generation(redis, limiter):
+    _call(limiter, "overload", latency=5.0)
+    assert _limit(redis, limiter) == 2.0
+    # The rest of the burst started before the cut: no further cut
+    for _ in range(3):
+        _call(limiter, "overload", latency=5.0)
+    assert _limit(redis, limiter) == 2.0
+    # A call admitted after the cut that overloads again cuts again, down to the floor
+    _call(limiter, "overload", latency=0.0)
+    _call(limiter, "overload", latency=0.0)
+    assert _limit(redis, limiter) == 1.0
+
+
+def test_other_errors_change_nothing(redis, limiter):
+    for _ in range(5):
+        _call(limiter, "other", latency=30.0)
+    assert _limit(redis, limiter) == limiter.initial
+
+
+def test_permit_context_records_the_outcome(redis, limiter):
+    import litellm
+
+    with pytest.raises(litellm.exceptions.Timeout):
+        with limiter.permit(BACKEND, MODEL, PARSE):
+            raise litellm.exceptions.Timeout("slow", model=MODEL, llm_provider="ollama")
+    assert _limit(redis, limiter) == 2.0
+    permits, _ = limiter._keys(BACKEND, MODEL)
+    assert redis.zcard(permits) == 0
@@ -0,0 +1,103 @@
+# backend/tests/test_llm_pool.py
+
+from backend.app.config import LLMStageConfig
+from backend.app.core.llm_pool import LLMEndpointPool, NoBackendAvailable
+from backend.tests.conftest import MODEL
+import pytest
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _pool(prefix, *hosts, **options) -> LLMEndpointPool:
+    pool = LLMEndpointPool([h.url for h in hosts], prefix=prefix, probe_timeout=1.0, **options)
+    pool.refresh(force=True)
+    return pool
+
+
+def _pooled_llm(pool):
+    from backend.app.core.pooled_llm import PooledLLM
+
+    cfg = LLMStageConfig(model_id=MODEL, base_url=pool.urls[0], base_urls=tuple(pool.urls),
+                         api_key="ollama", temperature=0.0, timeout=10)
+    return PooledLLM(cfg, pool)
+
+
+def _hold(redis, pool, url, n):
+    """Count n calls as in flight on `url`, as other workers' leases would."""
+    redis.zadd(pool._key("inflight", url), {f"held-{i}": 4e9 for i in range(n)})
+
+
+def test_probe_reports_health_and_loaded_models(prefix, mock_host):
+    warm, cold = mock_host(preload=True), mock_host()
+    pool = _pool(prefix, warm, cold)
+    states = {s.url: s for s in pool.states()}
+    assert states[warm.url].healthy and states[warm.url].loaded_models == {"qwen3:latest"}
+    assert states[cold.url].healthy and states[cold.url].loaded_models == set()
+
+
+def test_routes_to_the_host_with_the_model_loaded(prefix, mock_host):
+    cold, warm = mock_host(), mock_host(preload=True)
+    pool = _pool(prefix, cold, warm)
+    assert pool.choose(MODEL) == warm.url
+
+
+@pytest.mark.parametrize("held, expected", [(1, "warm"), (2, "cold"), (3, "cold")])
+def test_spills_to_a_cold_host_past_the_affinity_slack(redis, prefix, mock_host, held, expected):
+    hosts = {"cold": mock_host(), "warm": mock_host(preload=True)}
+    pool = _pool(prefix, hosts["cold"], hosts["warm"], affinity_slack=2)
+    _hold(redis, pool, hosts["warm"].url, held)
+    assert pool.choose(MODEL) == hosts[expected].url
+
+
+def test_skips_an_unreachable_host(prefix, mock_host):
+    down, up = mock_host(preload=True), mock_host()
+    down.shutdown()
+    down.server_close()
+    pool = _pool(prefix, down, up)
+    assert {s.url: s.healthy for s in pool.states()} == {down.url: False, up.url: True}
+    assert pool.choose(MODEL) == up.url
+
+
+def test_no_backend_left_after_excluding_all(prefix, mock_host):
+    a, b = mock_host(), mock_host()
+    pool = _pool(prefix, a, b)
+    with pytest.raises(NoBackendAvailable):
+        pool.choose(MODEL, exclude=[a.url, b.url])
+
+
+def test_fails_over_to_the_next_host(prefix, mock_host):
+    failing, healthy = mock_host(preload=True, fail_rate=1.0), mock_host()
+    pool = _pool(prefix, failing, healthy)
+    route = []
+    answer = _pooled_llm(pool).call(MESSAGES, route_log=route)
+    assert healthy.name in answer
+    assert route == [failing.url, healthy.url]
+    assert (failing.calls, healthy.calls) == (1, 1)
+    # The successful host now counts as warm; leases of both calls are released
+    states = {s.url: s for s in pool.states()}
+    assert "qwen3:latest" in states[healthy.url].loaded_models
+    assert states[failing.url].in_flight == states[healthy.url].in_flight == 0
+
+
+def test_circuit_opens_after_repeated_failures(prefix, mock_host):
+    failing, healthy = mock_host(preload=True, fail_rate=1.0), mock_host()
+    pool = _pool(prefix, failing, healthy, failure_threshold=2)
+    llm = _pooled_llm(pool)
+    for _ in range(2):
+        llm.call(MESSAGES)
+    assert {s.url: s.circuit_open for s in pool.states()} == {failing.url: True, healthy.url: False}
+    # While open, the failing host isn't tried at all
+    route = []
+    llm.call(MESSAGES, route_log=route)
+    assert route == [healthy.url]
+    assert (failing.calls, healthy.calls) == (2, 3)
+
+
+def test_raises_when_every_host_fails(prefix, mock_host):
+    from backend.app.core.llm_pool import backend_errors
+
+    a, b = mock_host(fail_rate=1.0), mock_host(fail_rate=1.0)
+    pool = _pool(prefix, a, b)
+    with pytest.raises(backend_errors()):
+        _pooled_llm(pool).call(MESSAGES)
+    assert (a.calls, b.calls) == (1, 1)
@@ -0,0 +1,125 @@
+# backend/tests/test_near_dup.py
+
+from types import SimpleNamespace
+from backend.app.config import settings
+from backend.app.core.agent_orchestrator import AgentOrchestrator
+from backend.app.core.near_dup import NearDupIndex, hamming, near_dup_index, simhash
+import pytest
+import threading
+
+JD = """Senior Backend Engineer
+
+About the role
+We build the billing platform used by thousands of merchants across Europe and North America.
+You will own services end to end, from design reviews to production on-call.
+
+Requirements
+- 5+ years of Python in production, ideally Django or FastAPI
+- Solid PostgreSQL: schema design, query plans, migrations without downtime
+- Experience running services on Kubernetes with Prometheus and Grafana
+- Comfortable with asynchronous messaging such as RabbitMQ or Kafka
+
+Responsibilities
+- Design and ship payment and invoicing features with product and finance
+- Keep p95 latency and error budgets within our SLOs
+- Mentor engineers and review code across the team
+
+Benefits
+- Remote-first, flexible hours, yearly learning budget
+"""
+NEW_LINE = "- Terraform and AWS experience"
+EDITED = JD.replace("Benefits", f"Nice to have\n{NEW_LINE}\n\nBenefits")
+UNRELATED = ("Registered nurse wanted for night shifts in the cardiology ward of a city hospital, patient care "
+             "and medication rounds, weekend rotation, union contract and pension plan included, apply with license.")
+DISTANCE = hamming(simhash(JD)[0], simhash(EDITED)[0])
+
+
+class StubParser:
+    """Parses a JD by listing its bullet lines as must-haves; records what it was asked."""
+
+    def __init__(self):
+        self.texts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, agent, description: str, expected_output: str):
+        text = description.split("JD:\n", 1)[-1]
+        with self.lock:
+            self.texts.append(text)
+        return {"must_haves": [line[2:] for line in text.splitlines() if line.startswith("- ")],
+                "nice_to_haves": [], "responsibilities": [], "keywords": []}
+
+
+AGENTS = SimpleNamespace(jd_parser=SimpleNamespace(copy=lambda: None))
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setattr(settings, "PARSE_CHUNK_TOKENS", 512)
+    monkeypatch.setattr(settings, "NEAR_DUP_ENABLED", True)
+    # 16 bands of 4 bits: any two texts within 15 bits share a band, so lookups never miss here
+    monkeypatch.setattr(near_dup_index, "bands", 16)
+    monkeypatch.setattr(near_dup_index, "band_bits", 4)
+    orchestrator = AgentOrchestrator.__new__(AgentOrchestrator)  # no LLM clients needed
+    orchestrator.llm, orchestrator.stage_llms = None, {}
+    orchestrator._kickoff_json = StubParser()
+    orchestrator._parse_jd(AGENTS, JD)
+    orchestrator._kickoff_json.texts.clear()
+    return orchestrator
+
+
+def _thresholds(monkeypatch, reuse: int, delta: int):
+    monkeypatch.setattr(settings, "NEAR_DUP_REUSE_DISTANCE", reuse)
+    monkeypatch.setattr(settings, "NEAR_DUP_DELTA_DISTANCE", delta)
+
+
+def test_simhash_distance_tracks_similarity():
+    assert hamming(simhash(JD)[0], simhash(JD.upper())[0]) == 0  # case-insensitive
+    assert 0 < DISTANCE < 16
+    assert hamming(simhash(JD)[0], simhash(UNRELATED)[0]) > 2 * DISTANCE
+
+
+def test_nearest_respects_max_distance_and_min_features(prefix):
+    index = NearDupIndex(bands=16, ttl_seconds=60, min_features=20, prefix=prefix)
+    index.add("jd", JD, "digest-jd")
+    record, distance = index.nearest("jd", EDITED, DISTANCE)
+    assert record["digest"] == "digest-jd" and distance == DISTANCE
+    assert index.nearest("jd", EDITED, DISTANCE - 1) is None
+    assert index.nearest("jd", UNRELATED, DISTANCE) is None
+
+    index.add("jd", "Python engineer", "digest-short")  # too few features to index or look up
+    assert index.nearest("jd", "Python engineer", 64) is None
+    with pytest.raises(ValueError):
+        NearDupIndex(bands=5, ttl_seconds=60, min_features=20)
+
+
+def test_within_reuse_distance_the_parse_is_reused_as_is(orchestrator, monkeypatch):
+    _thresholds(monkeypatch, reuse=DISTANCE, delta=DISTANCE + 4)
+    parsed, reused = orchestrator._parse_jd(AGENTS, EDITED)
+    assert reused and orchestrator._kickoff_json.texts == []
+    assert NEW_LINE[2:] not in parsed["must_haves"]
+
+
+def test_within_delta_distance_only_new_sections_are_parsed(orchestrator, monkeypatch):
+    _thresholds(monkeypatch, reuse=DISTANCE - 1, delta=DISTANCE)
+    parsed, reused = orchestrator._parse_jd(AGENTS, EDITED)
+    assert reused
+    assert orchestrator._kickoff_json.texts == [f"Nice to have\n{NEW_LINE}"]
+    assert parsed["must_haves"][-1] == NEW_LINE[2:]
+    assert "Mentor engineers and review code across the team" in parsed["must_haves"]
+
+    # The merged parse is cached for the edited text itself
+    orchestrator._kickoff_json.texts.clear()
+    assert orchestrator._parse_jd(AGENTS, EDITED) == (parsed, True) and not orchestrator._kickoff_json.texts
+
+
+def test_beyond_delta_distance_the_jd_is_parsed_from_scratch(orchestrator, monkeypatch):
+    _thresholds(monkeypatch, reuse=DISTANCE - 2, delta=DISTANCE - 1)
+    parsed, reused = orchestrator._parse_jd(AGENTS, EDITED)
+    assert not reused and orchestrator._kickoff_json.texts == [EDITED.strip()]
+    assert NEW_LINE[2:] in parsed["must_haves"]
+
+
+def test_disabled_near_dup_never_reuses(orchestrator, monkeypatch):
+    monkeypatch.setattr(settings, "NEAR_DUP_ENABLED", False)
+    _thresholds(monkeypatch, reuse=64, delta=64)
+    assert orchestrator._parse_jd(AGENTS, EDITED)[1] is False
@@ -0,0 +1,91 @@
+# backend/tests/test_result_storage.py
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from backend.app.config import settings
+from backend.app.core import result_codec
+from backend.app.core.result_archive import ResultArchive
+from backend.app.core.result_codec import ResultCodec
+import json
+import pytest
+import time
+
+PREFIX = "celery-task-meta-"
+RESULT = {"status": "done", "result": {"match_score": 80, "summary": "Strong fit. " * 200}}
+
+
+@pytest.mark.parametrize("codec_name", ["json", pytest.param("msgpack", marks=pytest.mark.skipif(
+    result_codec.msgpack is None, reason="msgpack not installed"))])
+def test_codec_round_trip_and_compression_threshold(codec_name):
+    codec = ResultCodec(codec_name, "zlib", min_bytes=1024)
+    large, small = codec.encode(RESULT), codec.encode({"ok": True})
+    assert codec.decode(large) == RESULT and codec.decode(small) == {"ok": True}
+    assert large[:1] == b"\x01" and small[:1] == b"\x00"  # only the large one is compressed
+    assert len(large) < len(json.dumps(RESULT))
+    stats = codec.take_stats()
+    assert stats["result_stored_bytes"] < stats["result_raw_bytes"]
+    assert codec.take_stats() == {}
+
+
+def test_codec_falls_back_and_reads_legacy_json():
+    codec = ResultCodec("nope", "zstd" if result_codec.zstandard is None else "bogus", min_bytes=1)
+    assert (codec.codec, codec.compression) == ("json", "zlib")
+    assert codec.decode(json.dumps(RESULT)) == RESULT  # written before the codec
+    assert codec.decode(b"") is None
+
+
+def test_result_ttl_per_job_type(monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_TTL_DEFAULT", 3600)
+    monkeypatch.setattr(settings, "RESULT_TTLS", "match=60, Cover_Letter=600,bad")
+    assert settings.result_ttl("match") == 60
+    assert settings.result_ttl("cover_letter") == 600
+    assert settings.result_ttl("enhance") == 3600
+    assert settings.result_ttl(None) == 3600
+
+
+@pytest.fixture
+def backend(redis):
+    """The slice of Celery's Redis result backend that compaction and the API use."""
+    codec = ResultCodec("json", "zlib", min_bytes=1024)
+    return SimpleNamespace(client=redis, task_keyprefix=PREFIX, encode=codec.encode, decode_result=codec.decode)
+
+
+def _store(backend, task_id, age, ttl, status="SUCCESS"):
+    done = datetime.fromtimestamp(time.time() - age, tz=timezone.utc).isoformat()
+    meta = {"status": status, "result": RESULT, "date_done": done, "task_id": task_id}
+    backend.client.set(PREFIX + task_id, backend.encode(meta), ex=ttl)
+
+
+def test_compaction_moves_old_results_and_keeps_their_ttl(tmp_path, backend):
+    archive = ResultArchive(str(tmp_path), default_ttl=3600)
+    _store(backend, "old-job", age=7200, ttl=600)
+    _store(backend, "new-job", age=10, ttl=600)
+    _store(backend, "running", age=7200, ttl=600, status="STARTED")
+
+    report = archive.compact(backend, older_than_seconds=3600)
+    assert report["archived"] == 1 and report["bytes_moved"] > 0
+    assert backend.client.get(PREFIX + "old-job") is None
+    assert backend.client.get(PREFIX + "new-job") and backend.client.get(PREFIX + "running")
+    assert archive.get_meta(backend, "old-job")["result"] == RESULT
+
+    # The archived copy expires when its Redis key would have
+    assert archive.purge(time.time() + 300) == 0
+    assert archive.purge(time.time() + 900) == 1
+    assert archive.get_meta(backend, "old-job") is None
+
+
+def test_expired_entry_is_not_served(tmp_path, backend):
+    archive = ResultArchive(str(tmp_path), default_ttl=3600)
+    archive.put("gone", backend.encode({"status": "SUCCESS", "result": 1}), expires_at=time.time() - 1)
+    assert archive.get_raw("gone") is None
+    assert archive.purge() == 0  # get_raw already removed it
+
+
+def test_no_archive_dir_keeps_results_in_redis(backend):
+    archive = ResultArchive("", default_ttl=3600)
+    _store(backend, "old-job", age=7200, ttl=600)
+    assert archive.compact(backend, older_than_seconds=3600)["skipped"]
+    assert backend.client.get(PREFIX + "old-job")
+    assert archive.get_meta(backend, "old-job") is None
+    with pytest.raises(RuntimeError):
+        archive.put("old-job", b"x", time.time() + 60)
@@ -0,0 +1,109 @@
+# backend/tests/test_resume_parsing.py
+
+from types import SimpleNamespace
+from backend.app.config import settings
+from backend.app.core.agent_orchestrator import AgentOrchestrator
+from backend.app.core.near_dup import near_dup_index
+from backend.app.core.parse_cache import parse_cache
+import pytest
+import threading
+
+RESUME = """Jane Doe
+jane@example.com
+
+EXPERIENCE
+- Built billing services in Python and Django at Acme, 2019-2023
+- Ran the migration of the reporting stack to PostgreSQL and Airflow
+- Mentored four engineers and led the on-call rotation for payments
+- Cut p95 latency of the checkout API by forty percent with caching
+- Introduced contract tests between the billing and ledger services
+- Automated invoice reconciliation, saving two days of finance work a month
+- Moved batch jobs from cron hosts to Kubernetes CronJobs with alerting
+- Wrote the internal style guide for Python services and code review
+- Shipped multi-currency pricing across web and mobile checkouts
+- Replaced a homegrown queue with RabbitMQ and idempotent consumers
+- Ran quarterly load tests and capacity planning for peak season
+- Led the PCI audit remediation for the payments platform
+
+EDUCATION
+- BSc Computer Science, University of Somewhere, 2015-2019
+
+SKILLS
+Python, Django, PostgreSQL, Docker, Kubernetes, Airflow
+"""
+
+NEW_BULLET = "- Designed the fraud scoring pipeline on Kafka streams"
+
+
+class StubParser:
+    """Parses a chunk by listing its bullet lines as experience; records what it was asked."""
+
+    def __init__(self):
+        self.texts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, agent, description: str, expected_output: str):
+        text = description.split("RESUME SECTION:\n", 1)[-1]
+        with self.lock:
+            self.texts.append(text)
+        return {"skills": [], "experience": [line[2:] for line in text.splitlines() if line.startswith("- ")],
+                "education": [], "tools": []}
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setattr(settings, "PARSE_CHUNK_TOKENS", 512)
+    # Settings under which the edit below is always found as a near-duplicate (8 bands: any two texts
+    # within 7 bits share one): resume sections must still be reused only when unchanged
+    monkeypatch.setattr(settings, "NEAR_DUP_ENABLED", True)
+    monkeypatch.setattr(settings, "NEAR_DUP_REUSE_DISTANCE", 7)
+    monkeypatch.setattr(near_dup_index, "bands", 8)
+    monkeypatch.setattr(near_dup_index, "band_bits", 8)
+    orchestrator = AgentOrchestrator.__new__(AgentOrchestrator)  # no LLM clients needed
+    orchestrator.llm, orchestrator.stage_llms = None, {}
+    orchestrator._kickoff_json = StubParser()
+    return orchestrator
+
+
+AGENTS = SimpleNamespace(resume_parser=SimpleNamespace(copy=lambda: None))
+
+
+def _edit(resume: str) -> str:
+    return resume.replace("EDUCATION", NEW_BULLET + "\n\nEDUCATION")
+
+
+def test_edited_section_is_parsed_again_and_its_new_content_shows_up(orchestrator):
+    # One added bullet moves the section's SimHash by a few bits only: a near-duplicate, but not the same text
+    first, info = orchestrator._parse_resume(AGENTS, RESUME, None)
+    assert info["parsed"] == len(orchestrator._kickoff_json.texts) and info["reused"] == 0
+    assert NEW_BULLET[2:] not in first["experience"]
+
+    orchestrator._kickoff_json.texts.clear()
+    second, info = orchestrator._parse_resume(AGENTS, _edit(RESUME), {"sections": []})
+    # Only the edited section hits the parser; the others come from the cache
+    assert info["parsed"] == 1 and info["reused"] >= 2
+    assert len(orchestrator._kickoff_json.texts) == 1 and NEW_BULLET in orchestrator._kickoff_json.texts[0]
+    assert NEW_BULLET[2:] in second["experience"]
+    assert set(first["experience"]) < set(second["experience"])
+
+
+def test_lineage_of_an_edit_lists_changed_and_unchanged_sections(orchestrator):
+    _, info = orchestrator._parse_resume(AGENTS, RESUME, None)
+    assert info["changed"] is None  # no parent: nothing to compare with
+    parse_cache.record("job-1", {"parent": None, "sections": info["sections"]})
+
+    orchestrator._kickoff_json.texts.clear()
+    _, info = orchestrator._parse_resume(AGENTS, RESUME, parse_cache.lineage("job-1"))
+    # Same text: every chunk is a cache hit
+    assert info["parsed"] == 0 and not orchestrator._kickoff_json.texts
+    assert info["changed"] == []
+
+    _, info = orchestrator._parse_resume(AGENTS, _edit(RESUME), parse_cache.lineage("job-1"))
+    assert info["changed"] == ["EXPERIENCE"]
+    assert "EDUCATION" in info["unchanged"] and "SKILLS" in info["unchanged"]
+    assert info["parsed"] == 1
+
+
+def test_unknown_parent_has_no_lineage():
+    assert parse_cache.lineage("never-recorded") is None
+    assert parse_cache.lineage(None) is None
@@ -0,0 +1,66 @@
+# backend/tests/test_sections.py
+
+from backend.app.core.sections import Section, chunk_sections, merge_parses, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+## Summary
+Backend engineer.
+
+EXPERIENCE
+- Acme, 2019-2023
+
+Skills:
+Python, Docker
+"""
+
+
+def test_split_at_markdown_known_and_all_caps_headings():
+    sections = split_sections(RESUME)
+    assert [s.title for s in sections] == ["Header", "Summary", "EXPERIENCE", "Skills"]
+    assert sections[0].body == "Jane Doe\njane@example.com"
+    assert split_sections("just one paragraph")[0].title == "Header"
+    assert split_sections("") == [Section("Resume", "")]
+
+
+def test_digest_ignores_whitespace_and_case_only():
+    a = Section("Skills", "Python,  Docker\n")
+    assert a.digest == Section("skills", "python, docker").digest
+    assert a.digest != Section("Skills", "Python, Go").digest
+
+
+def test_long_sections_are_cut_at_paragraphs_and_keep_their_title():
+    paragraphs = [f"- Project {i}: " + "x" * 150 for i in range(6)]
+    long = Section("Projects", "\n\n".join(paragraphs))
+    short = Section("Skills", "Python")
+    chunks = chunk_sections([short, long], max_chars=400)
+
+    assert chunks[0] is short
+    titles = [c.title for c in chunks[1:]]
+    assert titles == [f"Projects ({i}/{len(titles)})" for i in range(1, len(titles) + 1)]
+    assert all(len(c.text) <= 400 for c in chunks)
+    # Nothing lost, nothing cut mid-paragraph
+    assert [p for c in chunks[1:] for p in c.body.split("\n\n")] == paragraphs
+
+
+def test_an_oversized_line_is_cut_hard():
+    chunks = chunk_sections([Section("Summary", "y" * 1000)], max_chars=300)
+    assert len(chunks) > 1 and "".join(c.body for c in chunks) == "y" * 1000
+
+
+def test_merge_concatenates_lists_in_order_without_duplicates():
+    parts = [
+        {"skills": ["Python", "Docker"], "experience": [{"company": "Acme", "role": "Engineer"}], "summary": ""},
+        {"skills": ["python ", "Kubernetes"], "experience": [{"Company": "acme", "role": "engineer"}],
+         "summary": "Backend engineer."},
+        {"raw": "unparseable answer"},
+        None,
+        {"skills": "not a list", "summary": "Later summary."},
+    ]
+    merged = merge_parses(parts)
+    assert merged["skills"] == ["Python", "Docker", "Kubernetes"]
+    assert merged["experience"] == [{"company": "Acme", "role": "Engineer"}]
+    assert merged["summary"] == "Backend engineer."  # first non-empty value wins
+    assert merged["raw"] == "unparseable answer"
+    assert merge_parses([]) == {}
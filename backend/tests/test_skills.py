@@ -0,0 +1,69 @@
+# backend/tests/test_skills.py
+
+from backend.app.core.skills import AhoCorasick, BUNDLED_TAXONOMY, SkillMatcher
+import json
+import os
+import pytest
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "skills-cache")
+
+
+@pytest.fixture
+def matcher(cache_dir):
+    return SkillMatcher([BUNDLED_TAXONOMY], cache_dir)
+
+
+def test_aliases_and_case_sensitive_forms(matcher):
+    assert matcher.names("Shipped services in golang and Python3 on k8s") == ["Go", "Python", "Kubernetes"]
+    assert "Go" in matcher.names("Backend in Go.")
+    assert "Go" not in matcher.names("we go live every week")
+    assert matcher.canonical("K8S") == "Kubernetes"
+    assert matcher.canonical("java script") is None
+
+
+def test_whole_words_and_longest_match(matcher):
+    assert "Java" not in matcher.names("java-script and javascript")
+    assert matcher.names("Node.js tooling on PostgreSQL") == ["Node.js", "PostgreSQL"]
+    # "spring boot" is one mention of Spring, not "spring" + "spring boot"
+    assert [(h.name, h.count) for h in matcher.extract("Spring Boot services")] == [("Spring", 1)]
+    assert matcher.extract("Python, python and PYTHON")[0].count == 3
+
+
+def test_short_ambiguous_words_are_not_skills(matcher):
+    text = "Added a node to the cluster; py files and ts timestamps in the logs"
+    assert not {"Node.js", "Python", "TypeScript"} & set(matcher.names(text))
+
+
+def test_compiled_taxonomy_is_cached_as_json_and_reused(matcher, cache_dir, monkeypatch):
+    expected = matcher.names("Python, Docker and Kubernetes")
+    files = [f for f in os.listdir(cache_dir) if f.endswith(".json")]
+    assert len(files) == 1
+    with open(os.path.join(cache_dir, files[0]), encoding="utf-8") as f:
+        assert "automaton" in json.load(f)
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+    # A second process loads the automaton instead of building it
+    monkeypatch.setattr(AhoCorasick, "__init__", lambda self, patterns: pytest.fail("rebuilt"))
+    assert SkillMatcher([BUNDLED_TAXONOMY], cache_dir).names("Python, Docker and Kubernetes") == expected
+
+
+def test_unreadable_cache_is_a_miss(matcher, cache_dir):
+    matcher.names("Python")
+    path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"fingerprint": "')  # truncated
+
+    assert SkillMatcher([BUNDLED_TAXONOMY], cache_dir).names("Python and Rust") == ["Python", "Rust"]
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["automaton"]  # rebuilt and rewritten
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_cache_dir_writable_by_others_is_not_used(cache_dir):
+    os.makedirs(cache_dir)
+    os.chmod(cache_dir, 0o777)
+    assert SkillMatcher([BUNDLED_TAXONOMY], cache_dir).names("Python") == ["Python"]
+    assert os.listdir(cache_dir) == []
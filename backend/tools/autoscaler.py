@@ -0,0 +1,39 @@
+# backend/tools/autoscaler.py
+"""
+Queue-aware autoscaler for the Celery worker pools (one instance per deployment).
+
+    python -m backend.tools.autoscaler                        # loop every AUTOSCALE_INTERVAL seconds
+    python -m backend.tools.autoscaler --once --dry-run       # print one round of decisions, change nothing
+
+Resizes the prefork pools of the workers consuming AUTOSCALE_QUEUES with pool_grow /
+pool_shrink broadcasts; see backend.app.core.autoscaler for the policy. To try it
+locally, point LLM_BASE_URL at `python -m backend.tools.mock_ollama --latency 2`,
+start an llm worker with `--concurrency 1`, submit a batch (POST /submit-jobs) and
+watch the pool grow, then shrink once the queue drains and the scale-down delay passes.
+"""
+
+from backend.app.config import settings
+from backend.app.core.autoscaler import autoscaler
+import argparse
+import logging
+import sys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Grow and shrink Celery worker pools from queue depth.")
+    parser.add_argument("--interval", type=float, default=settings.AUTOSCALE_INTERVAL, help="seconds between ticks")
+    parser.add_argument("--once", action="store_true", help="run a single tick and exit")
+    parser.add_argument("--dry-run", action="store_true", help="log decisions without resizing pools")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if not args.once:
+        autoscaler.run(args.interval, dry_run=args.dry_run)
+        return 0
+    for d in autoscaler.tick(dry_run=args.dry_run):
+        print(f"{d.queue}: {d.action} {d.current} -> {d.target} (desired {d.desired}; {d.reason})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# backend/tools/import_budget.py
+"""
+Import-time benchmark and budget check for the API process.
+
+    python -m backend.tools.import_budget                      # backend.app.main, default budget
+    python -m backend.tools.import_budget --budget 1.5 --runs 5 --top 15
+
+Each run imports the module in a fresh interpreter (`-X importtime`), so caches
+from previous runs don't hide the cost. Fails (exit code 1) when the median
+import time exceeds the budget or a worker-only package gets imported.
+"""
+
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Packages only the Celery workers need; the API must never import them at startup
+WORKER_ONLY = ("crewai", "litellm", "reportlab", "PyPDF2")
+
+_PROBE = (
+    "import sys, time, json\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "print(json.dumps({{'seconds': time.perf_counter() - t, 'modules': sorted(sys.modules)}}))\n"
+)
+
+
+def measure(module: str) -> Tuple[float, List[str], Dict[str, int]]:
+    """Import `module` in a fresh interpreter.
+
+    Returns (seconds, loaded module names, cumulative microseconds per top-level package).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    data = json.loads(proc.stdout.strip().splitlines()[-1])
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header or unrelated stderr
+        package = parts[2].strip().split(".")[0]
+        cumulative[package] = max(cumulative.get(package, 0), int(parts[1]))
+    return data["seconds"], data["modules"], cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the API's import time and dependencies.")
+    parser.add_argument("--module", default="backend.app.main")
+    parser.add_argument("--budget", type=float, default=float(os.getenv("IMPORT_BUDGET_SECONDS", "2.0")),
+                        help="max median import time in seconds")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="show the N slowest top-level imports")
+    args = parser.parse_args()
+
+    timings, modules, cumulative = [], [], {}
+    for _ in range(max(1, args.runs)):
+        seconds, modules, cumulative = measure(args.module)
+        timings.append(seconds)
+    median = statistics.median(timings)
+
+    print(f"import {args.module}: median {median:.3f}s over {len(timings)} runs "
+          f"(min {min(timings):.3f}s, max {max(timings):.3f}s), budget {args.budget:.3f}s")
+    print("Slowest packages (cumulative, last run):")
+    own = args.module.split(".")[0]
+    ranked = sorted(((n, us) for n, us in cumulative.items() if n != own), key=lambda kv: kv[1], reverse=True)
+    for name, us in ranked[: args.top]:
+        print(f"  {us / 1e6:8.3f}s  {name}")
+
+    failed = False
+    leaked = [pkg for pkg in WORKER_ONLY if pkg in modules]
+    if leaked:
+        print(f"FAIL: worker-only packages imported: {', '.join(leaked)}")
+        failed = True
+    if median > args.budget:
+        print(f"FAIL: import time {median:.3f}s exceeds budget {args.budget:.3f}s")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
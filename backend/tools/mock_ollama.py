@@ -0,0 +1,145 @@
+# backend/tools/mock_ollama.py
+"""
+Minimal stand-in for Ollama hosts, for exercising the LLM endpoint pool locally.
+
+    python -m backend.tools.mock_ollama --ports 11501,11502,11503 --latency 0.5 --fail-rate 0.1
+    LLM_BASE_URLS=http://127.0.0.1:11501,http://127.0.0.1:11502,http://127.0.0.1:11503 celery -A ... worker -Q llm
+
+Serves /api/ps, /api/tags, /api/generate, /api/chat and /v1/chat/completions.
+A model counts as loaded after its first request (the first call also pays --load-latency),
+so model-affinity routing can be observed through /api/ps and GET /llm-backends.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Set
+import argparse
+import json
+import random
+import threading
+import time
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, models: List[str], latency: float, load_latency: float,
+                 fail_rate: float, reply: str, preload: Set[str]):
+        super().__init__(("127.0.0.1", port), _Handler)  # port 0: any free port (see .url)
+        self.name = f"mock-ollama:{self.server_address[1]}"
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.models = models
+        self.latency = latency
+        self.load_latency = load_latency
+        self.fail_rate = fail_rate
+        self.reply = reply
+        self.loaded: Set[str] = set(preload)
+        self.calls = 0  # completion requests answered (failures included)
+        self.lock = threading.Lock()
+
+    def generate(self, model: str) -> str:
+        model = model if ":" in model else f"{model}:latest"
+        with self.lock:
+            cold = model not in self.loaded
+            self.loaded.add(model)
+        time.sleep(self.latency + (self.load_latency if cold else 0.0))
+        return self.reply.format(name=self.name, model=model)
+
+
+_COMPLETIONS = ("/api/generate", "/api/chat", "/v1/chat/completions")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockOllamaServer
+
+    def do_GET(self):
+        if self.path == "/api/ps":
+            return self._json({"models": [{"name": m, "model": m} for m in sorted(self.server.loaded)]})
+        if self.path == "/api/tags":
+            return self._json({"models": [{"name": m, "model": m} for m in self.server.models]})
+        return self._json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path in _COMPLETIONS:
+            with self.server.lock:
+                self.server.calls += 1
+        if random.random() < self.server.fail_rate:
+            return self._json({"error": "injected failure"}, 503)
+
+        model = body.get("model", "")
+        if self.path == "/api/generate":
+            text = self.server.generate(model)
+            return self._json({"model": model, "response": text, "done": True,
+                               "prompt_eval_count": 1, "eval_count": len(text.split())})
+        if self.path == "/api/chat":
+            text = self.server.generate(model)
+            return self._json({"model": model, "message": {"role": "assistant", "content": text}, "done": True,
+                               "prompt_eval_count": 1, "eval_count": len(text.split())})
+        if self.path == "/v1/chat/completions":
+            text = self.server.generate(model)
+            return self._json({
+                "id": f"mock-{time.time_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": len(text.split()),
+                          "total_tokens": 1 + len(text.split())},
+            })
+        return self._json({"error": "not found"}, 404)
+
+    def _json(self, payload, status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):  # keep the console quiet
+        pass
+
+
+def serve(ports: List[int], **options) -> List[MockOllamaServer]:
+    """Start one mock host per port in background threads; returns the servers (call .shutdown())."""
+    servers = []
+    for port in ports:
+        server = MockOllamaServer(port, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one or more mock Ollama hosts.")
+    parser.add_argument("--ports", default="11501,11502", help="comma-separated ports, one host each")
+    parser.add_argument("--models", default="qwen3:latest,llama3.2:latest", help="models listed by /api/tags")
+    parser.add_argument("--preload", default="", help="models already loaded at start")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--load-latency", type=float, default=2.0, help="extra seconds on a model's first request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--reply", default='{{"reply": "OK from {name} ({model})"}}')
+    args = parser.parse_args()
+
+    servers = serve(
+        [int(p) for p in args.ports.split(",") if p.strip()],
+        models=[m.strip() for m in args.models.split(",") if m.strip()],
+        latency=args.latency,
+        load_latency=args.load_latency,
+        fail_rate=args.fail_rate,
+        reply=args.reply,
+        preload={m.strip() for m in args.preload.split(",") if m.strip()},
+    )
+    print("Mock Ollama hosts: " + ", ".join(s.url for s in servers))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for s in servers:
+            s.shutdown()
+
+
+if __name__ == "__main__":
+    main()
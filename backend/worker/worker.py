@@ -4,17 +4,15 @@ from celery import Celery
 from celery.signals import worker_ready
 from backend.app.config import settings
 
-# Create Celery app
-celery_app = Celery("resume_jd_matcher")
+# Create Celery app. Task modules are imported by the worker at startup (`include`),
+# not here: the API only sends tasks by name and must not pay for crewai/litellm imports.
+celery_app = Celery("resume_jd_matcher", include=["backend.app.core.tasks"])
 celery_app.config_from_object("backend.celeryconfig")
 
-# Ensure tasks are imported on worker start
-import backend.app.core.tasks       # noqa: F401
-
 @worker_ready.connect
 def _warmup_on_ready(sender=None, **kwargs):
     """
-    When the worker starts, auto-warm the active LLM model.
+    When the worker starts, auto-warm the LLM models in use.
     Only the LLM queue worker should do this (to avoid warming multiple times).
     """
     if not settings.WARMUP_ENABLED:
@@ -2,76 +2,353 @@
 
 import os
 import time
-from typing import Optional, Dict, Any
+import random
+import asyncio
+from typing import Optional, Dict, Any, List
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlencode
 
+try:
+    import httpx  # only needed by AsyncBackendClient
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+TERMINAL_STATES = ("SUCCESS", "FAILURE", "REVOKED")
+
+
+def _backoff(delay: float, max_delay: float) -> float:
+    """Next exponential-backoff delay with +/-20% jitter (avoids synchronized pollers)."""
+    return min(max_delay, delay * 2) * random.uniform(0.8, 1.2)
+
+
 class BackendClient:
-    def __init__(self, base_url: Optional[str] = None, timeout: float = 30.0):
+    """
+    Sync client for the FastAPI backend.
+    Uses one pooled keep-alive `requests.Session`; idempotent GETs are retried
+    with backoff on connection errors and 502/503/504, POSTs only on connect errors.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        pool_size: int = 10,
+        retries: int = 3,
+        api_key: Optional[str] = None,
+    ):
         self.base_url = (base_url or os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
         self.timeout = timeout
+        self.session = requests.Session()
+        api_key = api_key or os.getenv("BACKEND_API_KEY")
+        if api_key:
+            self.session.headers["X-API-Key"] = api_key  # the backend schedules jobs fairly per key
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     # -------- Parsing --------
     def parse_pdf(self, file_bytes: bytes, filename: str = "resume.pdf") -> str:
         url = f"{self.base_url}/parse-pdf"
         files = {"file": (filename, file_bytes, "application/pdf")}
-        resp = requests.post(url, files=files, timeout=self.timeout)
+        resp = self.session.post(url, files=files, timeout=self.timeout)
         resp.raise_for_status()
         data = resp.json()
         return data.get("extracted_text", "") or ""
 
     # -------- Jobs --------
-    def submit_job(self, job_type: str, resume: str, jd: str) -> str:
+    def submit_job(self, job_type: str, resume: str, jd: Optional[str] = None, parent_job_id: Optional[str] = None,
+                   jd_id: Optional[str] = None, priority: str = "normal", slo_seconds: Optional[float] = None) -> str:
+        """`parent_job_id`: the previous job for an edited resume, so unchanged sections aren't re-parsed.
+        `jd_id`: a library JD (see register_jd) used instead of `jd` text.
+        `priority`/`slo_seconds`: scheduling class and the time within which the result is still useful."""
         url = f"{self.base_url}/submit-job"
-        payload = {"job_type": job_type, "resume": resume, "jd": jd}
-        resp = requests.post(url, json=payload, timeout=self.timeout)
+        payload = {"job_type": job_type, "resume": resume, "jd": jd, "parent_job_id": parent_job_id, "jd_id": jd_id,
+                   "priority": priority, "slo_seconds": slo_seconds}
+        resp = self.session.post(url, json=payload, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json()["job_id"]
 
+    def submit_jobs(self, items=None, matrix: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Submit a batch in one request. `items` is a list of {job_type, resume, jd};
+        `matrix` is {job_types, resumes, jds}. Returns group_id + per-item job ids/errors.
+        """
+        url = f"{self.base_url}/submit-jobs"
+        payload: Dict[str, Any] = {"items": list(items or [])}
+        if matrix is not None:
+            payload["matrix"] = matrix
+        resp = self.session.post(url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    # -------- JD library --------
+    def register_jd(self, text: str, title: Optional[str] = None, jd_id: Optional[str] = None) -> Dict[str, Any]:
+        """Register a JD (or a new version of `jd_id`); it is pre-parsed in the background."""
+        url = f"{self.base_url}/jds"
+        resp = self.session.post(url, json={"text": text, "title": title, "jd_id": jd_id}, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def list_jds(self, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        url = f"{self.base_url}/jds"
+        resp = self.session.get(url, params={"limit": limit, "offset": offset}, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def group_status(self, group_id: str) -> Dict[str, Any]:
+        url = f"{self.base_url}/group/{group_id}"
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def list_jobs(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> Dict[str, Any]:
+        """One page of job history (newest first); filters: job_type, status, jd_id, since, until, min_score, ..."""
+        url = f"{self.base_url}/jobs"
+        params = {"limit": limit, "cursor": cursor, **filters}
+        resp = self.session.get(url, params={k: v for k, v in params.items() if v is not None}, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
     def job_status(self, job_id: str) -> Dict[str, Any]:
         url = f"{self.base_url}/job-status/{job_id}"
-        resp = requests.get(url, timeout=self.timeout)
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def jobs_status(self, job_ids, since: Optional[float] = None) -> Dict[str, Any]:
+        """Compact statuses for many jobs in one request; pass the returned cursor as `since`."""
+        url = f"{self.base_url}/jobs/status"
+        payload: Dict[str, Any] = {"job_ids": list(job_ids)}
+        if since is not None:
+            payload["since"] = since
+        resp = self.session.post(url, json=payload, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json()
 
     def job_result(self, job_id: str) -> Dict[str, Any]:
         url = f"{self.base_url}/job/{job_id}"
-        resp = requests.get(url, timeout=self.timeout)
+        resp = self.session.get(url, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json()
 
     def job_wait(self, job_id: str, timeout: float = 60.0) -> Dict[str, Any]:
         url = f"{self.base_url}/job-wait/{job_id}"
         params = {"timeout": timeout}
-        resp = requests.get(url, params=params, timeout=timeout + 5)
+        resp = self.session.get(url, params=params, timeout=timeout + 5)
+        resp.raise_for_status()
+        return resp.json()
+
+    def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a queued or running job; `cancelled` is False if it had already finished."""
+        url = f"{self.base_url}/job/{job_id}/cancel"
+        resp = self.session.post(url, timeout=self.timeout)
         resp.raise_for_status()
         return resp.json()
 
-    # -------- Convenience: poll with progress callback --------
+    # -------- Convenience: wait with progress callback --------
     def wait_with_progress(
         self,
         job_id: str,
         total_wait: float = 120.0,
         poll_interval: float = 1.5,
         on_tick=None,
+        long_poll: float = 10.0,
+        max_poll_interval: float = 15.0,
     ) -> Dict[str, Any]:
-        elapsed = 0.0
-        while elapsed < total_wait:
+        """
+        Wait for a job using the server's /job-wait long-poll (one request per
+        `long_poll` seconds). If long-polling fails, fall back to polling /job
+        with exponential backoff starting at `poll_interval`.
+        """
+        start = time.monotonic()
+        use_long_poll = long_poll > 0
+        delay = poll_interval
+        while True:
+            elapsed = time.monotonic() - start
+            remaining = total_wait - elapsed
+            if remaining <= 0:
+                break
+            call_started = time.monotonic()
             try:
-                res = self.job_result(job_id)
+                if use_long_poll:
+                    res = self.job_wait(job_id, timeout=min(long_poll, remaining))
+                else:
+                    res = self.job_result(job_id)
             except Exception as e:
+                use_long_poll = False
                 res = {"status": "UNKNOWN", "error": str(e)}
             if on_tick:
-                on_tick(elapsed, res.get("status"))
-            if res.get("status") in ("SUCCESS", "FAILURE"):
+                on_tick(time.monotonic() - start, res.get("status"))
+            if res.get("status") in TERMINAL_STATES:
                 return res
-            time.sleep(poll_interval)
-            elapsed += poll_interval
+            # A long-poll that returned early (or plain polling) must not spin
+            if not use_long_poll or time.monotonic() - call_started < 1.0:
+                time.sleep(min(delay, max(0.0, total_wait - (time.monotonic() - start))))
+                delay = _backoff(delay, max_poll_interval)
         # Fallback: final status fetch
         return self.job_result(job_id)
-    
+
+    def export_jobs(self, job_ids, formats=("md", "json", "pdf")) -> bytes:
+        """Download a ZIP with the artifacts of several jobs."""
+        url = f"{self.base_url}/jobs/export"
+        payload = {"job_ids": list(job_ids), "formats": list(formats)}
+        resp = self.session.post(url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.content
+
     # -------- Download URLs (for link buttons) --------
     def download_url(self, job_id: str, fmt: str) -> str:
         """Builds the direct backend URL to download artifacts (md/json/pdf)."""
         qs = urlencode({"format": fmt})
         return f"{self.base_url}/job/{job_id}/download?{qs}"
+
+
+class AsyncBackendClient:
+    """
+    httpx-based async client for batch scripts that drive many jobs at once.
+    Shares one connection pool; waiting on many jobs uses the batched
+    /jobs/status endpoint instead of one poll per job.
+
+        async with AsyncBackendClient() as client:
+            sub = await client.submit_jobs(matrix={"resumes": [...], "jds": [...]})
+            results = await client.wait_many([i["job_id"] for i in sub["items"] if i["job_id"]])
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        retries: int = 3,
+        api_key: Optional[str] = None,
+    ):
+        if httpx is None:
+            raise ImportError("AsyncBackendClient requires httpx (pip install httpx)")
+        self.base_url = (base_url or os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
+        self.timeout = timeout
+        api_key = api_key or os.getenv("BACKEND_API_KEY")
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"X-API-Key": api_key} if api_key else None,
+            timeout=timeout,
+            transport=httpx.AsyncHTTPTransport(retries=retries),  # retries connection failures
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # -------- Jobs --------
+    async def submit_job(self, job_type: str, resume: str, jd: Optional[str] = None, parent_job_id: Optional[str] = None,
+                         jd_id: Optional[str] = None, priority: str = "normal",
+                         slo_seconds: Optional[float] = None) -> str:
+        payload = {"job_type": job_type, "resume": resume, "jd": jd, "parent_job_id": parent_job_id, "jd_id": jd_id,
+                   "priority": priority, "slo_seconds": slo_seconds}
+        resp = await self._client.post("/submit-job", json=payload)
+        resp.raise_for_status()
+        return resp.json()["job_id"]
+
+    async def submit_jobs(self, items=None, matrix: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"items": list(items or [])}
+        if matrix is not None:
+            payload["matrix"] = matrix
+        resp = await self._client.post("/submit-jobs", json=payload)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def jobs_status(self, job_ids, since: Optional[float] = None) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"job_ids": list(job_ids)}
+        if since is not None:
+            payload["since"] = since
+        resp = await self._client.post("/jobs/status", json=payload)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def job_result(self, job_id: str) -> Dict[str, Any]:
+        resp = await self._client.get(f"/job/{job_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    async def job_wait(self, job_id: str, timeout: float = 60.0) -> Dict[str, Any]:
+        resp = await self._client.get(f"/job-wait/{job_id}", params={"timeout": timeout}, timeout=timeout + 5)
+        resp.raise_for_status()
+        return resp.json()
+
+    # -------- Waiting --------
+    async def wait(self, job_id: str, total_wait: float = 600.0, long_poll: float = 20.0) -> Dict[str, Any]:
+        """Long-poll a single job until it finishes or `total_wait` elapses."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + total_wait
+        while loop.time() < deadline:
+            res = await self.job_wait(job_id, timeout=min(long_poll, max(0.0, deadline - loop.time())))
+            if res.get("status") in TERMINAL_STATES:
+                return res
+        return await self.job_result(job_id)
+
+    async def wait_many(
+        self,
+        job_ids: List[str],
+        total_wait: float = 1800.0,
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 30.0,
+        max_concurrency: int = 8,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Wait for many jobs with one batched status call per round (backing off
+        while nothing changes), fetching each full result once it finishes.
+        Returns {job_id: result}; unfinished jobs map to their last status.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + total_wait
+        pending = list(dict.fromkeys(job_ids))
+        results: Dict[str, Dict[str, Any]] = {}
+        last_status: Dict[str, str] = {}
+        cursor: Optional[float] = None
+        delay = poll_interval
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(jid: str):
+            async with sem:
+                results[jid] = await self.job_result(jid)
+
+        while pending and loop.time() < deadline:
+            resp = await self.jobs_status(pending, since=cursor)
+            cursor = resp.get("cursor")
+            done = [r["job_id"] for r in resp.get("jobs", []) if r["status"] in TERMINAL_STATES]
+            last_status.update({r["job_id"]: r["status"] for r in resp.get("jobs", [])})
+            if done:
+                await asyncio.gather(*(fetch(jid) for jid in done))
+                pending = [jid for jid in pending if jid not in results]
+                delay = poll_interval
+            else:
+                delay = _backoff(delay, max_poll_interval)
+            if pending:
+                await asyncio.sleep(min(delay, max(0.0, deadline - loop.time())))
+
+        for jid in pending:
+            results[jid] = {"job_id": jid, "status": last_status.get(jid, "UNKNOWN"), "result": None, "error": None}
+        return results
@@ -1,17 +1,32 @@
 # frontend/streamlit_app.py
 
 import os
+import io
 import json
 import time
+import hashlib
+from collections import OrderedDict
 import streamlit as st
 
-from api_client import BackendClient
+from api_client import BackendClient, TERMINAL_STATES
+
+try:
+    from PyPDF2 import PdfReader  # optional: parse PDFs locally, skipping the upload
+except ImportError:
+    PdfReader = None
 
 st.set_page_config(page_title="🧠 Resume ↔ JD Matcher", layout="wide")
 
 # Backend URL (can be set via env BACKEND_URL)
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
-client = BackendClient(base_url=BACKEND_URL)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "50"))
+
+@st.cache_resource
+def _get_client(base_url: str) -> BackendClient:
+    # One pooled keep-alive client per server process, reused across reruns
+    return BackendClient(base_url=base_url)
+
+client = _get_client(BACKEND_URL)
 
 st.title("🧠 AI Resume ↔ Job Description Matcher")
 st.caption(f"Backend: {BACKEND_URL}")
@@ -29,6 +44,28 @@ st.markdown("---")
 if "job_history" not in st.session_state:
     # list of dicts: {"id": str, "type": str, "ts": float}
     st.session_state.job_history = []
+if "result_cache" not in st.session_state:
+    # job_id -> finished result (SUCCESS/FAILURE), LRU-bounded to RESULT_CACHE_SIZE
+    st.session_state.result_cache = OrderedDict()
+
+def _cache_result(job_id: str, result: dict):
+    if result.get("status") not in TERMINAL_STATES:
+        return
+    cache = st.session_state.result_cache
+    cache[job_id] = result
+    cache.move_to_end(job_id)
+    while len(cache) > RESULT_CACHE_SIZE:
+        cache.popitem(last=False)
+
+def _cached_result(job_id: str) -> dict:
+    """Finished result from the local cache; hits the backend at most once per job."""
+    cache = st.session_state.result_cache
+    if job_id in cache:
+        cache.move_to_end(job_id)
+        return cache[job_id]
+    result = client.job_result(job_id)
+    _cache_result(job_id, result)
+    return result
 
 def _push_history(job_id: str, job_type: str):
     # Avoid duplicates; keep most recent first; cap length to 20
@@ -74,11 +111,25 @@ def _render_download(job_id: str, job_type: str):
 # ---------- Inputs ----------
 col1, col2 = st.columns(2)
 
+parse_locally = False
+if PdfReader is not None:
+    parse_locally = st.checkbox("Parse PDFs locally (skip upload to backend)", value=False, key="parse_locally")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _parse_pdf_cached(content_hash: str, local: bool, _data: bytes, _filename: str) -> str:
+    # Keyed by content hash: reruns (typing, button clicks) never re-parse the same file.
+    # Leading-underscore args are excluded from Streamlit's cache key.
+    if local and PdfReader is not None:
+        reader = PdfReader(io.BytesIO(_data))
+        return "\n".join(t for t in (p.extract_text() for p in reader.pages) if t).strip()
+    return client.parse_pdf(_data, filename=_filename)
+
 def extract_text_from_upload(uploaded_file) -> str:
     if not uploaded_file:
         return ""
-    bytes_data = uploaded_file.read()
-    return client.parse_pdf(bytes_data, filename=uploaded_file.name)
+    bytes_data = uploaded_file.getvalue()
+    content_hash = hashlib.sha256(bytes_data).hexdigest()
+    return _parse_pdf_cached(content_hash, parse_locally, bytes_data, uploaded_file.name)
 
 with col1:
     st.subheader("📄 Resume")
@@ -129,7 +180,9 @@ def _run_job(job_type: str, resume: str, jd: str):
     with output.container():
         st.info(f"Submitting **{job_type}** job...")
         try:
-            job_id = client.submit_job(job_type, resume, jd)
+            # Lineage: the previous job of this session, so an edited resume only re-parses changed sections
+            parent = st.session_state.job_history[0]["id"] if st.session_state.job_history else None
+            job_id = client.submit_job(job_type, resume, jd, parent_job_id=parent)
         except Exception as e:
             st.error(f"Failed to submit job: {e}")
             return
@@ -149,6 +202,7 @@ def _run_job(job_type: str, resume: str, jd: str):
         prog.progress(100)
         st.write("")
 
+        _cache_result(job_id, result)
         status = result.get("status")
         if status == "SUCCESS":
             st.success("✅ Job finished")
@@ -183,17 +237,46 @@ if st.session_state.job_history:
     st.markdown("---")
     st.subheader("📜 Job History")
 
+    # One batched lookup for every row; the cursor means finished jobs are only sent once
+    recent = st.session_state.job_history[:10]
+    known = st.session_state.setdefault("history_status", {})
+    cache = st.session_state.result_cache
+    known.update({jid: res["status"] for jid, res in cache.items()})
+    unresolved = [item["id"] for item in recent if item["id"] not in cache]
+    try:
+        resp = client.jobs_status(unresolved, since=st.session_state.get("history_cursor")) if unresolved else {}
+        known.update({rec["job_id"]: rec["status"] for rec in resp.get("jobs", [])})
+        st.session_state.history_cursor = resp.get("cursor", st.session_state.get("history_cursor"))
+    except Exception:
+        pass
+
     # show the most recent 10
-    for i, item in enumerate(st.session_state.job_history[:10], start=1):
+    for i, item in enumerate(recent, start=1):
         job_id = item["id"]
         job_type = item["type"]
         ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(item["ts"]))
         url_pdf = client.download_url(job_id, "pdf")
 
-        c_left, c_mid, c_right = st.columns([4, 2, 2])
+        c_left, c_mid, c_view, c_right = st.columns([4, 2, 1, 2])
         with c_left:
             st.write(f"**{i}.** `{job_id}`  ·  *{job_type}*  ·  {ts}")
         with c_mid:
-            st.write("")  # spacer
+            st.write(f"Status: **{known.get(job_id, 'UNKNOWN')}**")
+        with c_view:
+            show = st.button("👀 View", key=f"view_{job_id}", disabled=known.get(job_id) not in TERMINAL_STATES)
         with c_right:
             st.markdown(_html_button(_label_for_job(job_type), url_pdf), unsafe_allow_html=True)
+        if show:
+            try:
+                cached = _cached_result(job_id)
+                st.json(cached.get("result") or {"error": cached.get("error")})
+            except Exception as e:
+                st.error(f"Could not load result: {e}")
+
+    if st.button("🗜️ Prepare ZIP of recent jobs"):
+        ids = [item["id"] for item in st.session_state.job_history[:10]]
+        try:
+            zip_bytes = client.export_jobs(ids)
+            st.download_button("⬇️ Download ZIP", zip_bytes, file_name="jobs_export.zip", mime="application/zip")
+        except Exception as e:
+            st.error(f"Export failed: {e}")